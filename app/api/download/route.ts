@@ -200,12 +200,21 @@ export async function POST(req: NextRequest) {
       args: [
         actualOriginalFilePath, // 実際のファイルパスを使用
         tempTranslatedFullPath,
-        JSON.stringify(slides),
+        '-', // 翻訳データは標準入力から読み込む
       ],
     };
 
     // Python処理の実行と結果の取得
-    const results = await PythonShell.run(path.basename(pythonScriptPath), options);
+    // 翻訳データは引数（OSの引数長の上限がある）ではなく、標準入力にNDJSON（1行に1スライド）で渡す
+    const results = await new Promise<unknown[]>((resolve, reject) => {
+      const shell = new PythonShell(path.basename(pythonScriptPath), options);
+      const messages: unknown[] = [];
+      shell.on('message', (message) => messages.push(message));
+      for (const slide of slides) {
+        shell.send(slide);
+      }
+      shell.end((error) => (error ? reject(error) : resolve(messages)));
+    });
     const result = results ? results[results.length - 1] : null;
 
     // 生成されたファイルの確認とリトライ処理
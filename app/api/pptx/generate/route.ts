@@ -28,6 +28,9 @@ export async function POST(req: NextRequest) {
     if (!fileId || !translations) {
       return NextResponse.json({ error: 'Missing required parameters' }, { status: 400 });
     }
+    if (!Array.isArray(translations)) {
+      return NextResponse.json({ error: 'translations must be an array' }, { status: 400 });
+    }
 
     // ユーザーIDを取得
     const userId = session.user.id.toString();
@@ -68,7 +71,7 @@ export async function POST(req: NextRequest) {
 
     console.log('Found original file:', actualOriginalFilePath);
 
-    const translationsJsonPath = path.join(uploadsDir, `${fileId}_translations.json`);
+    const translationsJsonPath = path.join(uploadsDir, `${fileId}_translations.ndjson`);
     const outputPath = path.join(uploadsDir, `${fileId}_translated.pptx`);
 
     // ディレクトリの存在確認と作成
@@ -89,8 +92,16 @@ export async function POST(req: NextRequest) {
       return NextResponse.json({ error: 'Original PPTX file not found' }, { status: 404 });
     }
 
-    // 翻訳データをJSONファイルとして保存
-    await fs.writeFile(translationsJsonPath, JSON.stringify(translations));
+    // 翻訳データをNDJSON（1行に1スライド）で保存する
+    // JSON配列の場合、Python側は全体を読み込んでから解析するため、1行ずつ読み込める形式で渡す
+    const translationsFile = await fs.open(translationsJsonPath, 'w');
+    try {
+      for (const slide of translations) {
+        await translationsFile.write(`${JSON.stringify(slide)}\n`);
+      }
+    } finally {
+      await translationsFile.close();
+    }
 
     try {
       // Python スクリプトを実行
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+コンパクト出力スキーマモジュール
+parse_pptxの結果から重複を取り除き、Node側で読み込むペイロードを小さくする
+
+通常の出力との違い
+- elements内のテキスト要素は text_elements のインデックス参照 {"text_ref": n} になる
+- ランのfont・resolved_fontと段落のstyle・resolved_styleは共有のスタイルテーブル (styles) のインデックスになる
+"""
+
+import json
+from typing import Dict, Any, List
+
+SCHEMA_NAME = 'compact'
+SCHEMA_VERSION = 2
+
+# スタイルテーブルに格納するキー（値が辞書の場合のみ）
+# 継承を解決した書式（resolved_*）は同じテンプレートのランで同じ内容が繰り返されるため、特に効果が大きい
+INTERNED_KEYS = ('font', 'style', 'resolved_font', 'resolved_style')
+
+class StyleTable:
+    """同じ内容のフォント・スタイル辞書を1つのエントリにまとめるテーブル"""
+
+    def __init__(self):
+        self.styles: List[Dict[str, Any]] = []
+        self._index: Dict[str, int] = {}
+        self._drained = 0
+
+    def intern(self, style: Dict[str, Any]) -> int:
+        """
+        スタイル辞書を登録する
+
+        Args:
+            style: フォントまたはスタイルの辞書
+
+        Returns:
+            スタイルテーブル内のインデックス
+        """
+        key = _content_key(style)
+        index = self._index.get(key)
+        if index is None:
+            index = len(self.styles)
+            self.styles.append(style)
+            self._index[key] = index
+        return index
+
+    def drain_new(self) -> Dict[int, Dict[str, Any]]:
+        """
+        前回の呼び出し以降に追加されたスタイルを取得する（逐次出力用）
+
+        Returns:
+            インデックス -> スタイル辞書
+        """
+        new_styles = {index: self.styles[index] for index in range(self._drained, len(self.styles))}
+        self._drained = len(self.styles)
+        return new_styles
+
+def _content_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+def _intern_styles(value: Any, table: StyleTable) -> Any:
+    # 元の結果（キャッシュにも保存される）を書き換えないよう、コピーを作りながら置き換える
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if key in INTERNED_KEYS and isinstance(item, dict):
+                compacted[key] = table.intern(item)
+            else:
+                compacted[key] = _intern_styles(item, table)
+        return compacted
+    if isinstance(value, list):
+        return [_intern_styles(item, table) for item in value]
+    return value
+
+def compact_slide(slide_data: Dict[str, Any], table: StyleTable) -> Dict[str, Any]:
+    """
+    1枚のスライドデータをコンパクト形式に変換する
+
+    Args:
+        slide_data: extract_slideなどが返すスライドデータ
+        table: スタイルテーブル（デッキ全体で共有する）
+
+    Returns:
+        コンパクト形式のスライドデータ
+    """
+    text_elements = slide_data.get('text_elements', [])
+    # キャッシュから復元したスライドは同一オブジェクトではないため、内容でも照合する
+    ref_by_id = {id(elem): i for i, elem in enumerate(text_elements)}
+    ref_by_content = None
+
+    elements = []
+    for elem in slide_data.get('elements', []):
+        ref = ref_by_id.get(id(elem))
+        if ref is None and elem.get('type') in ('text', 'table', 'group'):
+            if ref_by_content is None:
+                ref_by_content = {}
+                for i, text_elem in enumerate(text_elements):
+                    ref_by_content.setdefault(_content_key(text_elem), i)
+            ref = ref_by_content.get(_content_key(elem))
+        elements.append({'text_ref': ref} if ref is not None else _intern_styles(elem, table))
+
+    compacted = {key: value for key, value in slide_data.items() if key not in ('elements', 'text_elements')}
+    compacted['elements'] = elements
+    compacted['text_elements'] = _intern_styles(text_elements, table)
+    return compacted
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    parse_pptxの結果全体をコンパクト形式に変換する
+
+    Args:
+        result: parse_pptxの戻り値
+
+    Returns:
+        コンパクト形式の結果（schema, styles を含む）
+    """
+    table = StyleTable()
+    compacted = {key: value for key, value in result.items() if key != 'slides'}
+    compacted['schema'] = {'name': SCHEMA_NAME, 'version': SCHEMA_VERSION}
+    compacted['slides'] = [compact_slide(slide, table) for slide in result.get('slides', [])]
+    compacted['styles'] = table.styles
+    return compacted
+
+def _expand_styles(value: Any, styles: List[Dict[str, Any]]) -> Any:
+    if isinstance(value, dict):
+        return {key: (dict(styles[item]) if key in INTERNED_KEYS and isinstance(item, int) else _expand_styles(item, styles))
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand_styles(item, styles) for item in value]
+    return value
+
+def expand_slide(slide_data: Dict[str, Any], styles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    コンパクト形式のスライドデータを通常の形式に戻す
+
+    Args:
+        slide_data: コンパクト形式のスライドデータ
+        styles: スタイルテーブル
+
+    Returns:
+        通常形式のスライドデータ（elementsとtext_elementsは同じオブジェクトを共有する）
+    """
+    expanded = dict(slide_data)
+    text_elements = _expand_styles(slide_data.get('text_elements', []), styles)
+    expanded['text_elements'] = text_elements
+    expanded['elements'] = [text_elements[elem['text_ref']] if 'text_ref' in elem else _expand_styles(elem, styles)
+                            for elem in slide_data.get('elements', [])]
+    return expanded
+
+def expand_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    コンパクト形式の結果全体を通常の形式に戻す
+
+    Args:
+        result: compact_resultの戻り値
+
+    Returns:
+        parse_pptxと同じ形式の結果
+    """
+    styles = result.get('styles', [])
+    expanded = {key: value for key, value in result.items() if key not in ('schema', 'styles', 'slides')}
+    expanded['slides'] = [expand_slide(slide, styles) for slide in result.get('slides', [])]
+    return expanded
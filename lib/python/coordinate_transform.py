@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+座標変換モジュール
+スライド座標（EMU）から画像座標（ピクセル）への変換と、グループ内座標からスライド座標への変換を
+アフィン変換 (scale_x, scale_y, offset_x, offset_y) として扱い、複数の矩形をまとめて変換する
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from lxml import etree
+
+# NumPyはオプション（インストールされていない環境ではリストで計算する）
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('coordinate_transform')
+
+# (scale_x, scale_y, offset_x, offset_y): x' = x * scale_x + offset_x, y' = y * scale_y + offset_y
+Affine = Tuple[float, float, float, float]
+Box = Tuple[float, float, float, float]
+
+IDENTITY: Affine = (1.0, 1.0, 0.0, 0.0)
+
+# アスペクト比の差がこれ以下なら同じとみなす
+ASPECT_TOLERANCE = 0.01
+
+NAMESPACES = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+              'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'}
+XP_GROUP_XFRM = etree.XPath('./p:grpSpPr/a:xfrm', namespaces=NAMESPACES)
+
+def slide_to_image_affine(slide_width: float, slide_height: float,
+                          image_width: float, image_height: float) -> Affine:
+    """
+    スライド座標（EMU）から画像座標（ピクセル）への変換を求める
+
+    アスペクト比が異なる場合は、画像の中央にスライドを収めた（余白付きの）配置として扱う
+
+    Args:
+        slide_width: スライドの幅（EMU）
+        slide_height: スライドの高さ（EMU）
+        image_width: 画像の幅（ピクセル）
+        image_height: 画像の高さ（ピクセル）
+
+    Returns:
+        アフィン変換 (scale_x, scale_y, offset_x, offset_y)
+    """
+    slide_aspect = slide_width / slide_height
+    image_aspect = image_width / image_height
+    scale_x = image_width / slide_width
+    scale_y = image_height / slide_height
+    offset_x = offset_y = 0.0
+
+    if abs(slide_aspect - image_aspect) > ASPECT_TOLERANCE:
+        logger.debug(f"Aspect ratio adjustment needed: slide={slide_aspect}, image={image_aspect}")
+        if image_aspect > slide_aspect:
+            # 画像がスライドより横長の場合は高さに合わせ、左右を中央揃えにする
+            new_width = image_height * slide_aspect
+            offset_x = (image_width - new_width) / 2
+            scale_x = new_width / slide_width
+        else:
+            # 幅に合わせ、上下を中央揃えにする
+            new_height = image_width / slide_aspect
+            offset_y = (image_height - new_height) / 2
+            scale_y = new_height / slide_height
+
+    return (scale_x, scale_y, offset_x, offset_y)
+
+def compose(outer: Affine, inner: Affine) -> Affine:
+    """
+    2つの変換を合成する（inner を適用してから outer を適用する変換）
+
+    Args:
+        outer: 後に適用する変換
+        inner: 先に適用する変換
+
+    Returns:
+        合成した変換
+    """
+    return (outer[0] * inner[0], outer[1] * inner[1],
+            outer[0] * inner[2] + outer[2], outer[1] * inner[3] + outer[3])
+
+def group_child_affine(group_element, parent: Affine = IDENTITY) -> Affine:
+    """
+    グループ内の座標（chOff/chExt基準）からスライド座標への変換を求める
+
+    Args:
+        group_element: p:grpSp要素
+        parent: 親グループの変換（入れ子のグループ用）
+
+    Returns:
+        グループの子要素の座標に適用する変換
+    """
+    xfrm = next(iter(XP_GROUP_XFRM(group_element)), None)
+    if xfrm is None:
+        return parent
+
+    values = {}
+    for child in xfrm:
+        name = etree.QName(child).localname
+        if name in ('off', 'chOff'):
+            values[name] = (int(child.get('x', 0)), int(child.get('y', 0)))
+        elif name in ('ext', 'chExt'):
+            values[name] = (int(child.get('cx', 0)), int(child.get('cy', 0)))
+
+    off = values.get('off', (0, 0))
+    ext = values.get('ext', (0, 0))
+    ch_off = values.get('chOff', off)
+    ch_ext = values.get('chExt', ext)
+    # 子要素の領域が0の場合は拡大縮小せず、原点のずれのみ補正する
+    scale_x = ext[0] / ch_ext[0] if ch_ext[0] else 1.0
+    scale_y = ext[1] / ch_ext[1] if ch_ext[1] else 1.0
+    return compose(parent, (scale_x, scale_y, off[0] - ch_off[0] * scale_x, off[1] - ch_off[1] * scale_y))
+
+def transform_boxes(boxes: Sequence[Box], affines: Union[Affine, Sequence[Affine]] = IDENTITY) -> List[Tuple[int, int, int, int]]:
+    """
+    複数の矩形をまとめて変換する
+
+    Args:
+        boxes: (x, y, width, height) のリスト
+        affines: 全矩形に共通の変換、または矩形ごとの変換のリスト
+
+    Returns:
+        変換後の (x, y, width, height) のリスト（整数に丸める）
+    """
+    if not boxes:
+        return []
+    per_box = not (len(affines) == 4 and not isinstance(affines[0], (tuple, list)))
+
+    if NUMPY_AVAILABLE:
+        coords = np.asarray(boxes, dtype=np.float64)
+        params = np.asarray(affines, dtype=np.float64)
+        if not per_box:
+            params = params.reshape(1, 4)
+        scale = params[:, 0:2]
+        result = np.empty_like(coords)
+        result[:, 0:2] = coords[:, 0:2] * scale + params[:, 2:4]
+        result[:, 2:4] = coords[:, 2:4] * scale
+        # Pythonのround()と同じ偶数丸め
+        return [tuple(row) for row in np.rint(result).astype(np.int64).tolist()]
+
+    if not per_box:
+        scale_x, scale_y, offset_x, offset_y = affines
+        return [(round(x * scale_x + offset_x), round(y * scale_y + offset_y), round(w * scale_x), round(h * scale_y))
+                for x, y, w, h in boxes]
+    return [(round(x * sx + ox), round(y * sy + oy), round(w * sx), round(h * sy))
+            for (x, y, w, h), (sx, sy, ox, oy) in zip(boxes, affines)]
+
+def to_slide_position(left: Optional[float], top: Optional[float], width: Optional[float], height: Optional[float],
+                      transform: Optional[Affine] = None) -> Dict[str, Optional[int]]:
+    """
+    シェイプの座標をスライド座標（EMU）の位置情報にする
+
+    Args:
+        left, top, width, height: シェイプの座標（グループ内の場合はグループの子座標）
+        transform: グループの子座標からスライド座標への変換（グループ外の場合はNone）
+
+    Returns:
+        {'x', 'y', 'width', 'height'}（値がない項目はNone）
+    """
+    if transform is None or transform == IDENTITY:
+        return {'x': left, 'y': top, 'width': width, 'height': height}
+    scale_x, scale_y, offset_x, offset_y = transform
+    return {
+        'x': round(left * scale_x + offset_x) if left is not None else None,
+        'y': round(top * scale_y + offset_y) if top is not None else None,
+        'width': round(width * scale_x) if width is not None else None,
+        'height': round(height * scale_y) if height is not None else None
+    }
+
+def _collect_boxes(elements: List[Dict[str, Any]], targets: List[Tuple[Dict[str, Any], Box]], seen: set) -> None:
+    for elem in elements:
+        if id(elem) in seen:
+            continue
+        seen.add(id(elem))
+        # テキスト要素はposition、図形情報はトップレベルに座標を持つ
+        source = elem['position'] if isinstance(elem.get('position'), dict) else elem
+        box = tuple(source.get(key) for key in ('x', 'y', 'width', 'height'))
+        if None not in box:
+            targets.append((elem, box))
+        if elem.get('type') == 'group':
+            _collect_boxes(elem.get('elements', []), targets, seen)
+
+def add_pixel_positions(slides: List[Dict[str, Any]], slide_width: float, slide_height: float,
+                        image_width: float, image_height: float) -> int:
+    """
+    全スライドの要素に画像座標 (pixel_position) を追加する
+
+    変換はデッキで1回だけ求め、グループの子要素も含めた全要素の矩形を1回の呼び出しで変換する
+
+    Args:
+        slides: スライドデータのリスト（position はスライド座標のEMU）
+        slide_width: スライドの幅（EMU）
+        slide_height: スライドの高さ（EMU）
+        image_width: 画像の幅（ピクセル）
+        image_height: 画像の高さ（ピクセル）
+
+    Returns:
+        変換した要素の数
+    """
+    if not (slide_width and slide_height and image_width and image_height):
+        return 0
+
+    targets = []
+    seen = set()
+    for slide in slides:
+        # 通常はtext_elementsとelementsが同じ辞書を共有しているため、重複して変換しない
+        _collect_boxes(slide.get('elements', []), targets, seen)
+        _collect_boxes(slide.get('text_elements', []), targets, seen)
+
+    affine = slide_to_image_affine(slide_width, slide_height, image_width, image_height)
+    pixel_boxes = transform_boxes([box for _, box in targets], affine)
+    for (elem, _), (x, y, width, height) in zip(targets, pixel_boxes):
+        elem['pixel_position'] = {'x': x, 'y': y, 'width': width, 'height': height}
+
+    logger.debug(f"Converted {len(targets)} element positions to image coordinates")
+    return len(targets)
@@ -9,6 +9,7 @@
 import os
 import sys
 import io
+import hashlib
 from typing import Tuple, Optional, Dict, Any, List
 from PIL import Image, ImageOps
 import logging
@@ -104,7 +105,54 @@ def convert_format(image: Image.Image, format: str = DEFAULT_FORMAT,
     
     return img_byte_arr.getvalue(), extension, mime_type
 
-def optimize_image(input_path: str, output_path: Optional[str] = None, 
+def encode_image(image: Image.Image, output_path: str,
+                 format: str = DEFAULT_FORMAT, quality: int = DEFAULT_QUALITY,
+                 max_width: int = DEFAULT_MAX_WIDTH,
+                 max_height: int = DEFAULT_MAX_HEIGHT) -> Dict[str, Any]:
+    """
+    メモリ上の画像を直接エンコードして保存する（一時ファイルを経由しない）
+
+    Args:
+        image: 元の画像
+        output_path: 出力画像のパス
+        format: 出力形式 ('PNG', 'WEBP', 'JPEG')
+        quality: 画質 (0-100)
+        max_width: 最大幅
+        max_height: 最大高さ
+
+    Returns:
+        エンコード結果の情報
+    """
+    original_dimensions = (image.width, image.height)
+
+    # 画像の最適化
+    resized = resize_image(image, max_width, max_height)
+
+    # 出力ディレクトリが存在することを確認
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    # 画像を保存
+    img_data, extension, mime_type = convert_format(resized, format, quality)
+    with open(output_path, 'wb') as f:
+        f.write(img_data)
+
+    return {
+        'path': output_path,
+        'format': format,
+        'mime_type': mime_type,
+        'dimensions': {
+            'width': resized.width,
+            'height': resized.height
+        },
+        'original': {
+            'dimensions': original_dimensions
+        },
+        'optimized': {
+            'size': len(img_data)
+        }
+    }
+
+def optimize_image(input_path: str, output_path: Optional[str] = None,
                   format: str = DEFAULT_FORMAT, quality: int = DEFAULT_QUALITY,
                   max_width: int = DEFAULT_MAX_WIDTH, 
                   max_height: int = DEFAULT_MAX_HEIGHT) -> Dict[str, Any]:
@@ -185,6 +233,8 @@ def batch_optimize(input_paths: List[str], output_dir: str,
     """
     複数の画像を一括で最適化する
     
+    内容が同一の入力画像は一度だけエンコードし、結果は同じ出力パスを指す
+    
     Args:
         input_paths: 入力画像のパスリスト
         output_dir: 出力ディレクトリ
@@ -197,9 +247,20 @@ def batch_optimize(input_paths: List[str], output_dir: str,
         最適化結果の情報リスト
     """
     results = []
+    encoded_by_hash = {}  # 入力画像のハッシュ -> 最適化結果
     
     for input_path in input_paths:
         try:
+            with open(input_path, 'rb') as f:
+                content_hash = hashlib.sha1(f.read()).hexdigest()
+            if content_hash in encoded_by_hash:
+                # 既にエンコード済みの画像を共有する
+                result = dict(encoded_by_hash[content_hash])
+                result['duplicate_of'] = result.pop('source', None)
+                logger.info(f"Skipping duplicate image: {input_path} -> {result['path']}")
+                results.append(result)
+                continue
+            
             filename = os.path.splitext(os.path.basename(input_path))[0]
             extension = SUPPORTED_FORMATS[format]['extension']
             output_path = os.path.join(output_dir, f"{filename}{extension}")
@@ -213,6 +274,7 @@ def batch_optimize(input_paths: List[str], output_dir: str,
                 max_height=max_height
             )
             
+            encoded_by_hash[content_hash] = dict(result, source=input_path)
             results.append(result)
             
         except Exception as e:
@@ -286,12 +348,14 @@ if __name__ == "__main__":
             )
             
             # 結果サマリーを表示
-            total_original = sum(r.get('original', {}).get('size', 0) for r in results if 'original' in r)
-            total_optimized = sum(r.get('optimized', {}).get('size', 0) for r in results if 'optimized' in r)
+            encoded = [r for r in results if 'duplicate_of' not in r]
+            total_original = sum(r.get('original', {}).get('size', 0) for r in encoded if 'original' in r)
+            total_optimized = sum(r.get('optimized', {}).get('size', 0) for r in encoded if 'optimized' in r)
             total_saved = total_original - total_optimized
             
             if total_original > 0:
                 logger.info(f"Batch optimization complete: {len(results)} images processed")
+                logger.info(f"Duplicates skipped: {len(results) - len(encoded)}")
                 logger.info(f"Total size reduction: {total_original} -> {total_optimized} bytes")
                 logger.info(f"Total saved: {total_saved} bytes ({total_saved/total_original*100:.2f}%)")
             
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PPTXの遅延読み込みモジュール
+python-pptxはPresentationを開く時点でpptx内の全パーツ（動画や画像を含む）をメモリに読み込むため、
+ZIPをメモリマップし、XMLパーツは最初に参照された時点で解析し、画像・動画などのバイナリパーツは
+参照のたびにZIPから読み出す（保持しない）Presentationを作成する
+"""
+
+import os
+import mmap
+import logging
+import tempfile
+import zipfile
+from typing import Dict, IO, Optional
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.oxml import parse_xml
+from pptx.opc.package import XmlPart, PartFactory, _PackageLoader
+from pptx.opc.packuri import PackURI, PACKAGE_URI
+from pptx.package import Package
+from pptx.util import lazyproperty
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('lazy_package')
+
+# 遅延読み込みを使うか（0で従来どおりpython-pptxで全パーツを読み込む）
+DEFAULT_LAZY_LOADING = os.environ.get('PPTX_LAZY_LOADING', '1') != '0'
+
+class _MappedFile:
+    """メモリマップをZipFileから読めるファイルオブジェクトとして扱う（mmapはseekableを持たないため）"""
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+
+    def read(self, size: int = -1) -> bytes:
+        return self._mapped.read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self._mapped.seek(offset, whence)
+        return self._mapped.tell()
+
+    def tell(self) -> int:
+        return self._mapped.tell()
+
+    def seekable(self) -> bool:
+        return True
+
+class ZipPartSource:
+    """メモリマップしたPPTX（ZIP）からパーツを読み出す"""
+
+    def __init__(self, file_path: str):
+        """
+        コンストラクタ
+
+        Args:
+            file_path: PPTXファイルのパス
+        """
+        self.path = os.path.abspath(file_path)
+        self._file = open(file_path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._zip = zipfile.ZipFile(_MappedFile(self._map))
+        except Exception:
+            self._file.close()
+            raise
+        self._members = {PackURI('/' + name): name for name in self._zip.namelist()}
+
+    def __contains__(self, pack_uri) -> bool:
+        return pack_uri in self._members
+
+    def __getitem__(self, pack_uri) -> bytes:
+        """パーツのバイト列を読み出す（PackageReaderと同じインターフェース）"""
+        if pack_uri not in self._members:
+            raise KeyError(f"no member '{pack_uri}' in package")
+        return self._zip.read(self._members[pack_uri])
+
+    def rels_xml_for(self, partname) -> Optional[bytes]:
+        """パーツのリレーションシップXMLを読み出す（ない場合はNone）"""
+        rels_uri = partname.rels_uri
+        return self[rels_uri] if rels_uri in self._members else None
+
+    def open(self, pack_uri) -> IO[bytes]:
+        """
+        パーツをストリームとして開く（大きなメディアを一度に読み込まずに処理する場合に使う）
+
+        Args:
+            pack_uri: パーツ名
+
+        Returns:
+            読み出し用のファイルオブジェクト
+        """
+        return self._zip.open(self._members[pack_uri])
+
+    def size(self, pack_uri) -> int:
+        """パーツの展開後のサイズ（バイト）"""
+        return self._zip.getinfo(self._members[pack_uri]).file_size
+
+    def checksum(self, pack_uri) -> str:
+        """パーツの内容を識別する値（ZIPに記録されたCRC32と展開後のサイズ。パーツは読み出さない）"""
+        info = self._zip.getinfo(self._members[pack_uri])
+        return f"{info.CRC:08x}:{info.file_size}"
+
+    def close(self) -> None:
+        """ZIPとメモリマップを閉じる（以降、未読み込みのパーツは参照できない）"""
+        self._zip.close()
+        self._map.close()
+        self._file.close()
+
+class _LazyBlobMixin:
+    """バイナリパーツの内容を保持せず、参照のたびにZIPから読み出す"""
+
+    _source: ZipPartSource = None
+
+    @property
+    def _blob(self):
+        blob = self.__dict__.get('_loaded_blob')
+        if blob is None and self._source is not None:
+            return self._source[self.partname]
+        return blob
+
+    @_blob.setter
+    def _blob(self, value):
+        # 書き換えられた内容（Noneの場合は元のパーツ）を保持する
+        self.__dict__['_loaded_blob'] = value
+
+class _LazyXmlMixin:
+    """XMLパーツを最初に参照された時点で解析する"""
+
+    _source: ZipPartSource = None
+
+    @property
+    def _element(self):
+        element = self.__dict__.get('_parsed_element')
+        if element is None and self._source is not None:
+            element = parse_xml(self._source[self.partname])
+            self.__dict__['_parsed_element'] = element
+        return element
+
+    @_element.setter
+    def _element(self, value):
+        self.__dict__['_parsed_element'] = value
+
+    @property
+    def blob(self):
+        # 解析していない（変更のない）パーツは元のバイト列をそのまま書き出す
+        if self.__dict__.get('_parsed_element') is None and self._source is not None:
+            return self._source[self.partname]
+        return super().blob
+
+_lazy_classes: Dict[type, type] = {}
+
+def _lazy_part_class(part_class: type) -> type:
+    lazy_class = _lazy_classes.get(part_class)
+    if lazy_class is None:
+        mixin = _LazyXmlMixin if issubclass(part_class, XmlPart) else _LazyBlobMixin
+        lazy_class = type(f"Lazy{part_class.__name__}", (mixin, part_class), {})
+        _lazy_classes[part_class] = lazy_class
+    return lazy_class
+
+class _LazyPackageLoader(_PackageLoader):
+    """パーツの内容を読み込まずに、パーツとリレーションシップの構造のみを作る"""
+
+    def __init__(self, source: ZipPartSource, package):
+        super().__init__(source.path, package)
+        self._source = source
+
+    @lazyproperty
+    def _package_reader(self):
+        return self._source
+
+    @lazyproperty
+    def _parts(self):
+        content_types = self._content_types
+        parts = {}
+        for partname in self._xml_rels.keys():
+            if partname == '/' or partname not in self._source:
+                continue
+            content_type = content_types[partname]
+            lazy_class = _lazy_part_class(PartFactory._part_cls_for(content_type))
+            # 内容（XMLの要素またはバイト列）はプロパティ経由で読み出すため、コンストラクタには渡さない
+            part = lazy_class(partname, content_type, self._package, None)
+            part._source = self._source
+            parts[partname] = part
+        return parts
+
+class LazyPackage(Package):
+    """ZipPartSourceからパーツを遅延読み込みするパッケージ"""
+
+    def __init__(self, source: ZipPartSource):
+        super().__init__(source.path)
+        self.source = source
+
+    def _load(self):
+        pkg_xml_rels, parts = _LazyPackageLoader.load(self.source, self)
+        self._rels.load_from_xml(PACKAGE_URI, pkg_xml_rels, parts)
+        return self
+
+    def save(self, pkg_file):
+        """
+        パッケージを保存する
+
+        読み込み元と同じファイルに保存する場合は、未読み込みのパーツを読み出している途中で
+        元のファイルが切り詰められないよう、一時ファイルに書き出してから置き換える
+        """
+        if isinstance(pkg_file, (str, os.PathLike)) and os.path.exists(pkg_file) \
+                and os.path.samefile(pkg_file, self.source.path):
+            directory = os.path.dirname(os.path.abspath(pkg_file))
+            fd, temp_path = tempfile.mkstemp(suffix='.pptx', dir=directory)
+            os.close(fd)
+            try:
+                super().save(temp_path)
+                os.replace(temp_path, pkg_file)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            return
+        super().save(pkg_file)
+
+def open_presentation(file_path, lazy: Optional[bool] = None):
+    """
+    PPTXファイルを開く
+
+    遅延読み込みでは、XMLパーツは参照された時点で解析し、メディアはZIPから必要なときだけ読み出すため、
+    メモリ使用量はスライドなどのXMLの大きさ程度に収まる。python-pptxのPresentationと同様に扱える
+
+    Args:
+        file_path: PPTXファイルのパス（ファイルオブジェクトの場合は常に通常の読み込み）
+        lazy: 遅延読み込みを使うか（Noneの場合は既定値 PPTX_LAZY_LOADING）
+
+    Returns:
+        プレゼンテーションオブジェクト
+    """
+    if lazy is None:
+        lazy = DEFAULT_LAZY_LOADING
+    if not lazy or not isinstance(file_path, (str, os.PathLike)):
+        return Presentation(file_path)
+
+    source = ZipPartSource(file_path)
+    try:
+        presentation_part = LazyPackage(source)._load().main_document_part
+    except Exception:
+        source.close()
+        raise
+    if presentation_part.content_type not in (CT.PML_PRESENTATION_MAIN, CT.PML_PRES_MACRO_MAIN):
+        source.close()
+        raise ValueError(f"file '{file_path}' is not a PowerPoint file, "
+                         f"content type is '{presentation_part.content_type}'")
+    return presentation_part.presentation
+
+def close_presentation(presentation) -> None:
+    """
+    遅延読み込みしたプレゼンテーションの読み込み元（メモリマップとファイル）を閉じる
+
+    閉じた後は未読み込みのパーツを参照できないため、保存も含めて処理が終わってから呼ぶ。
+    通常の読み込みの場合やNoneの場合は何もしない
+
+    Args:
+        presentation: プレゼンテーションオブジェクト
+    """
+    source = get_part_source(presentation) if presentation is not None else None
+    if source is not None:
+        source.close()
+
+def get_part_source(presentation) -> Optional[ZipPartSource]:
+    """
+    遅延読み込みしたプレゼンテーションの読み込み元を取得する
+
+    Args:
+        presentation: プレゼンテーションオブジェクト
+
+    Returns:
+        ZipPartSource（通常の読み込みの場合はNone）
+    """
+    package = presentation.part.package
+    return package.source if isinstance(package, LazyPackage) else None
+
+def part_checksum(part) -> Optional[str]:
+    """
+    遅延読み込みしたバイナリパーツの内容を、パーツを読み出さずに識別する値を取得する
+
+    Args:
+        part: パーツ
+
+    Returns:
+        ZIPのCRC32と展開後のサイズ（遅延読み込みでない・内容が書き換えられている場合はNone）
+    """
+    source = getattr(part, '_source', None)
+    if not isinstance(part, _LazyBlobMixin) or source is None or part.__dict__.get('_loaded_blob') is not None:
+        return None
+    return source.checksum(part.partname)
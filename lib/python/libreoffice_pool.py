@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LibreOfficeプールモジュール
+常駐させたヘッドレスLibreOfficeインスタンスを使い回してPPTX→PDF変換を行う
+
+各インスタンスはスロット単位で管理され、スロットごとに専用のユーザープロファイル
+（-env:UserInstallation）とリスナーポートを持つ。スロットはファイルロックで
+排他されるため、複数のパーサープロセスが同時に動いても同時変換数は
+プールサイズを超えない。
+
+常駐インスタンスへの変換依頼にはUNOブリッジを使う。このプロセスのPythonでunoを
+インポートできない場合は、LibreOffice同梱のPython（またはpython3-unoを入れたPython）で
+libreoffice_uno_client.py を実行する。どちらも見つからない場合のみ、スロット専用の
+プロファイルで単発のsofficeを起動して変換する。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import subprocess
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional, Dict, Any, Iterator, Tuple
+from lib.python.libreoffice_uno_client import UNO_AVAILABLE, convert_document
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('libreoffice_pool')
+
+# デフォルト設定（環境変数で上書き可能）
+DEFAULT_POOL_SIZE = int(os.environ.get('LIBREOFFICE_POOL_SIZE', max(1, (os.cpu_count() or 2) // 2)))
+DEFAULT_BASE_PORT = int(os.environ.get('LIBREOFFICE_POOL_BASE_PORT', 2002))
+DEFAULT_POOL_DIR = os.environ.get('LIBREOFFICE_POOL_DIR',
+                                  os.path.join(tempfile.gettempdir(), 'pptx_libreoffice_pool'))
+DEFAULT_MAX_CONVERSIONS = int(os.environ.get('LIBREOFFICE_MAX_CONVERSIONS', 50))    # この回数変換したらインスタンスを再起動
+DEFAULT_MAX_AGE = float(os.environ.get('LIBREOFFICE_MAX_AGE', 30 * 60))               # インスタンスの最大稼働時間（秒）
+DEFAULT_CONVERT_TIMEOUT = float(os.environ.get('LIBREOFFICE_CONVERT_TIMEOUT', 120))   # 1回の変換のタイムアウト（秒）
+DEFAULT_STARTUP_TIMEOUT = float(os.environ.get('LIBREOFFICE_STARTUP_TIMEOUT', 30))    # インスタンス起動待ちのタイムアウト（秒）
+DEFAULT_ACQUIRE_TIMEOUT = float(os.environ.get('LIBREOFFICE_ACQUIRE_TIMEOUT', 300))   # スロット取得待ちのタイムアウト（秒）
+# soffice --version の結果を記録するファイル（実行ファイルが更新されるまで使い回す）
+VERSION_FILE = os.path.join(DEFAULT_POOL_DIR, 'soffice_version.json')
+# unoをインポートできるPython（未指定の場合はLibreOffice同梱のPythonなどを探す）
+DEFAULT_UNO_PYTHON = os.environ.get('LIBREOFFICE_PYTHON')
+UNO_CLIENT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libreoffice_uno_client.py')
+# --convert-to でフィルターのオプションをJSONで指定できるLibreOfficeのバージョン
+JSON_FILTER_OPTIONS_VERSION = (7, 4)
+# 単発変換（JSONのオプションが使えない場合）で非表示スライドを書き出すためのプロファイルの設定
+EXPORT_HIDDEN_SLIDES_ITEM = (
+    '<item oor:path="/org.openoffice.Office.Common/Filter/PDF/Export">'
+    '<prop oor:name="ExportHiddenSlides" oor:op="fuse"><value>true</value></prop></item>'
+)
+REGISTRY_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<oor:items xmlns:oor="http://openoffice.org/2001/registry" '
+    'xmlns:xs="http://www.w3.org/2001/XMLSchema" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n'
+    '</oor:items>\n'
+)
+
+@lru_cache(maxsize=1)
+def find_soffice() -> Optional[str]:
+    """
+    LibreOfficeの実行ファイルを探す（結果はプロセス内でキャッシュ）
+
+    Returns:
+        実行ファイルのパス（見つからない場合はNone）
+    """
+    env_path = os.environ.get('SOFFICE_PATH')
+    if env_path and os.path.exists(env_path):
+        return env_path
+
+    for name in ('soffice', 'libreoffice'):
+        path = shutil.which(name)
+        if path:
+            return path
+
+    if sys.platform == "darwin":  # macOS
+        app_path = "/Applications/LibreOffice.app/Contents/MacOS/soffice"
+        if os.path.exists(app_path):
+            return app_path
+
+    return None
+
+def _uno_python_candidates(soffice: Optional[str]) -> Iterator[str]:
+    if DEFAULT_UNO_PYTHON:
+        yield DEFAULT_UNO_PYTHON
+    if soffice:
+        # LibreOffice同梱のPython（Windows: program/python.exe、macOS: Contents/Resources/python）
+        program_dir = os.path.dirname(os.path.realpath(soffice))
+        for candidate in (os.path.join(program_dir, 'python'),
+                          os.path.join(program_dir, 'python.exe'),
+                          os.path.join(os.path.dirname(program_dir), 'Resources', 'python')):
+            yield candidate
+    # Linuxのディストリビューション版はpython3-unoをシステムのPythonに入れる
+    for name in ('python3', 'python'):
+        path = shutil.which(name)
+        if path:
+            yield path
+
+@lru_cache(maxsize=1)
+def find_uno_python() -> Optional[str]:
+    """
+    unoモジュールをインポートできるPythonを探す（結果はプロセス内でキャッシュ）
+
+    Returns:
+        Pythonの実行ファイルのパス（見つからない場合はNone）
+    """
+    checked = set()
+    for candidate in _uno_python_candidates(find_soffice()):
+        if candidate in checked or not os.path.isfile(candidate) or not os.access(candidate, os.X_OK):
+            continue
+        checked.add(candidate)
+        try:
+            result = subprocess.run([candidate, '-c', 'import uno'], stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=15)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if result.returncode == 0:
+            logger.info(f"Using {candidate} as the UNO client interpreter")
+            return candidate
+    return None
+
+@lru_cache(maxsize=1)
+def get_soffice_version_string() -> Optional[str]:
+    """
+    soffice --version の出力を取得する（結果はプロセス内でキャッシュ）
+
+    実行ファイルのパスと更新時刻ごとにディスクへ記録し、
+    プロセスを起動するたびに soffice --version を実行しないようにする
+
+    Returns:
+        バージョン文字列（例: "LibreOffice 7.3.7.2 30(Build:2)"）、取得できない場合はNone
+    """
+    soffice = find_soffice()
+    if not soffice:
+        return None
+
+    try:
+        binary_id = f"{os.path.realpath(soffice)}:{os.path.getmtime(soffice)}"
+    except OSError:
+        binary_id = soffice
+    try:
+        with open(VERSION_FILE, 'r', encoding='utf-8') as f:
+            recorded = json.load(f)
+        if recorded.get('binary') == binary_id and recorded.get('version'):
+            return recorded['version']
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        result = subprocess.run([soffice, '--version'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Could not get LibreOffice version: {str(e)}")
+        return None
+    version = (result.stdout or '').strip()
+    if not version:
+        return None
+
+    try:
+        os.makedirs(os.path.dirname(VERSION_FILE), exist_ok=True)
+        # 他のプロセスが読み込み途中のファイルを見ないよう、一時ファイルから置き換える
+        temp_file = f"{VERSION_FILE}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'binary': binary_id, 'version': version}, f)
+        os.replace(temp_file, VERSION_FILE)
+    except OSError:
+        pass
+    return version
+
+def get_soffice_version() -> Optional[Tuple[int, ...]]:
+    """
+    LibreOfficeのバージョンを取得する（get_soffice_version_stringの結果を解析する）
+
+    Returns:
+        バージョン（例: (7, 6, 4)）、取得できない場合はNone
+    """
+    # 例: "LibreOffice 7.3.7.2 30(Build:2)"
+    match = re.search(r'(\d+)\.(\d+)(?:\.(\d+))?', get_soffice_version_string() or '')
+    if not match:
+        return None
+    return tuple(int(part) for part in match.groups() if part is not None)
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    """プロセスが生存しているか確認"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except (OSError, ProcessLookupError):
+        return False
+
+def _port_open(port: int) -> bool:
+    """リスナーソケットが接続を受け付けるか確認"""
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+def _kill_process_group(pid: Optional[int]) -> None:
+    """プロセスグループごと強制終了"""
+    if not pid:
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (OSError, ProcessLookupError):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (OSError, ProcessLookupError):
+            pass
+
+class LibreOfficePool:
+    """常駐LibreOfficeインスタンスのプール"""
+
+    def __init__(self, options: Dict[str, Any] = None):
+        """
+        コンストラクタ
+
+        Args:
+            options: プールオプション
+        """
+        # デフォルトオプション
+        self.default_options = {
+            'pool_size': DEFAULT_POOL_SIZE,
+            'base_port': DEFAULT_BASE_PORT,
+            'pool_dir': DEFAULT_POOL_DIR,
+            'max_conversions': DEFAULT_MAX_CONVERSIONS,
+            'max_age': DEFAULT_MAX_AGE,
+            'convert_timeout': DEFAULT_CONVERT_TIMEOUT,
+            'startup_timeout': DEFAULT_STARTUP_TIMEOUT,
+            'acquire_timeout': DEFAULT_ACQUIRE_TIMEOUT,
+            # Noneの場合、unoが使える（またはunoを使えるPythonがある）ときに常駐インスタンスを使う
+            'use_listener': None
+        }
+
+        # オプションをマージ
+        self.options = self.default_options.copy()
+        if options:
+            self.options.update(options)
+
+        if self.options['use_listener'] is None:
+            self.options['use_listener'] = UNO_AVAILABLE or find_uno_python() is not None
+        if not self.options['use_listener']:
+            logger.warning("No Python with the uno module was found; each conversion starts a one-shot LibreOffice "
+                           "(install python3-uno or set LIBREOFFICE_PYTHON to keep instances warm)")
+
+        os.makedirs(self.options['pool_dir'], exist_ok=True)
+
+    def _slot_path(self, slot: int, suffix: str) -> str:
+        return os.path.join(self.options['pool_dir'], f"slot-{slot}.{suffix}")
+
+    def _profile_url(self, slot: int) -> str:
+        profile_dir = os.path.join(self.options['pool_dir'], f"profile-{slot}")
+        return 'file://' + os.path.abspath(profile_dir)
+
+    @contextmanager
+    def _acquire_slot(self) -> Iterator[int]:
+        """
+        空いているスロットをプロセス間ロックで確保する
+
+        Yields:
+            確保したスロット番号
+        """
+        deadline = time.monotonic() + self.options['acquire_timeout']
+        pool_size = max(1, self.options['pool_size'])
+        # プロセスごとに探索開始位置をずらして競合を減らす
+        start = os.getpid() % pool_size
+
+        while True:
+            for offset in range(pool_size):
+                slot = (start + offset) % pool_size
+                lock_file = open(self._slot_path(slot, 'lock'), 'a+')
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    continue
+
+                try:
+                    logger.debug(f"Acquired LibreOffice slot {slot}")
+                    yield slot
+                    return
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                    lock_file.close()
+
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No LibreOffice slot became free within {self.options['acquire_timeout']}s")
+            time.sleep(0.1)
+
+    def _read_state(self, slot: int) -> Dict[str, Any]:
+        try:
+            with open(self._slot_path(slot, 'json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, slot: int, state: Dict[str, Any]) -> None:
+        path = self._slot_path(slot, 'json')
+        if not state:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+    def _stop_instance(self, slot: int, state: Dict[str, Any], reason: str) -> None:
+        """スロットのインスタンスを停止する"""
+        pid = state.get('pid')
+        if pid:
+            logger.info(f"Stopping LibreOffice instance on slot {slot} (pid={pid}): {reason}")
+            _kill_process_group(pid)
+        self._write_state(slot, {})
+
+    def _start_instance(self, slot: int) -> Dict[str, Any]:
+        """スロット用の常駐インスタンスを起動する"""
+        soffice = find_soffice()
+        if not soffice:
+            raise FileNotFoundError("LibreOffice (soffice) executable not found")
+
+        port = self.options['base_port'] + slot
+        cmd = [
+            soffice,
+            f"-env:UserInstallation={self._profile_url(slot)}",
+            "--headless", "--invisible", "--nologo", "--nodefault",
+            "--norestore", "--nolockcheck",
+            f"--accept=socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+        ]
+        logger.info(f"Starting LibreOffice instance on slot {slot} (port={port})")
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True  # パーサープロセス終了後も常駐させる
+        )
+
+        deadline = time.monotonic() + self.options['startup_timeout']
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"LibreOffice exited during startup with code {process.returncode}")
+            if _port_open(port):
+                state = {
+                    'pid': process.pid,
+                    'port': port,
+                    'started_at': time.time(),
+                    'conversions': 0
+                }
+                self._write_state(slot, state)
+                return state
+            time.sleep(0.1)
+
+        _kill_process_group(process.pid)
+        raise TimeoutError(f"LibreOffice did not open port {port} within {self.options['startup_timeout']}s")
+
+    def _ensure_instance(self, slot: int) -> Dict[str, Any]:
+        """スロットのインスタンスが健全であることを保証する（必要なら再起動）"""
+        state = self._read_state(slot)
+        if state:
+            if not _pid_alive(state.get('pid')) or not _port_open(state.get('port', 0)):
+                self._stop_instance(slot, state, 'not responding')
+                state = {}
+            elif time.time() - state.get('started_at', 0) > self.options['max_age']:
+                self._stop_instance(slot, state, 'max age reached')
+                state = {}
+
+        if not state:
+            state = self._start_instance(slot)
+        return state
+
+    def _convert_via_client(self, state: Dict[str, Any], pptx_path: str, pdf_path: str,
+                            page_range: Optional[str]) -> None:
+        """unoを使えるPythonでUNOクライアントを実行し、常駐インスタンスに変換させる"""
+        uno_python = find_uno_python()
+        if not uno_python:
+            raise RuntimeError("No Python interpreter with the uno module was found")
+        cmd = [uno_python, UNO_CLIENT_SCRIPT, '--port', str(state['port'])]
+        if page_range:
+            cmd.extend(['--page-range', page_range])
+        cmd.extend([os.path.abspath(pptx_path), os.path.abspath(pdf_path)])
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            _, stderr = process.communicate(timeout=self.options['convert_timeout'])
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise TimeoutError(f"LibreOffice conversion timed out after {self.options['convert_timeout']}s")
+        if process.returncode != 0:
+            raise RuntimeError(f"UNO client failed with code {process.returncode}: {stderr.strip()}")
+
+    def _convert_via_listener(self, state: Dict[str, Any], pptx_path: str, pdf_path: str,
+                              page_range: Optional[str]) -> None:
+        """UNOブリッジ経由で常駐インスタンスに変換させる"""
+        if not UNO_AVAILABLE:
+            self._convert_via_client(state, pptx_path, pdf_path, page_range)
+            return
+
+        # 変換はスレッドで実行し、タイムアウトしたら呼び出し元でインスタンスごと終了させる
+        errors = []
+
+        def run():
+            try:
+                convert_document(state['port'], pptx_path, pdf_path, page_range)
+            except Exception as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(self.options['convert_timeout'])
+        if worker.is_alive():
+            raise TimeoutError(f"LibreOffice conversion timed out after {self.options['convert_timeout']}s")
+        if errors:
+            raise errors[0]
+
+    def _enable_hidden_slide_export(self, slot: int) -> None:
+        """スロットのプロファイルで、PDFの書き出しに非表示スライドを含める設定を有効にする"""
+        profile_dir = os.path.join(self.options['pool_dir'], f"profile-{slot}", 'user')
+        registry_path = os.path.join(profile_dir, 'registrymodifications.xcu')
+        try:
+            with open(registry_path, 'r', encoding='utf-8') as f:
+                registry = f.read()
+        except OSError:
+            registry = REGISTRY_TEMPLATE
+        if 'ExportHiddenSlides' in registry:
+            return
+        os.makedirs(profile_dir, exist_ok=True)
+        registry = registry.replace('</oor:items>', EXPORT_HIDDEN_SLIDES_ITEM + '\n</oor:items>', 1)
+        with open(registry_path, 'w', encoding='utf-8') as f:
+            f.write(registry)
+
+    def _convert_via_cli(self, slot: int, pptx_path: str, output_dir: str,
+                         page_range: Optional[str]) -> None:
+        """UNOが使えない環境向け: スロット専用プロファイルで単発変換する"""
+        soffice = find_soffice()
+        if not soffice:
+            raise FileNotFoundError("LibreOffice (soffice) executable not found")
+
+        # 非表示スライドも書き出し、PDFのページ番号とスライド番号を一致させる
+        if supports_filter_options():
+            filter_data = {'ExportHiddenSlides': {'type': 'boolean', 'value': 'true'}}
+            if page_range:
+                filter_data['PageRange'] = {'type': 'string', 'value': page_range}
+            convert_filter = 'pdf:impress_pdf_Export:' + json.dumps(filter_data, separators=(',', ':'))
+        else:
+            # 7.4未満はJSONのオプションを解釈しないため、プロファイルの設定で非表示スライドを書き出す
+            if page_range:
+                raise ValueError(f"LibreOffice {get_soffice_version()} cannot export a page range without UNO")
+            self._enable_hidden_slide_export(slot)
+            convert_filter = 'pdf'
+
+        cmd = [
+            soffice,
+            f"-env:UserInstallation={self._profile_url(slot)}",
+            "--headless", "--norestore", "--nolockcheck",
+            "--convert-to", convert_filter, "--outdir", output_dir, pptx_path
+        ]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, start_new_session=True)
+        try:
+            stdout, stderr = process.communicate(timeout=self.options['convert_timeout'])
+        except subprocess.TimeoutExpired:
+            _kill_process_group(process.pid)
+            process.communicate()
+            raise TimeoutError(f"LibreOffice conversion timed out after {self.options['convert_timeout']}s")
+
+        logger.info(f"LibreOffice conversion result: returncode={process.returncode}")
+        logger.debug(f"LibreOffice stdout: {stdout}")
+        logger.debug(f"LibreOffice stderr: {stderr}")
+        if process.returncode != 0:
+            raise RuntimeError(f"LibreOffice conversion failed with code {process.returncode}")
+
+    def convert_to_pdf(self, pptx_path: str, output_dir: str,
+                       page_range: Optional[str] = None) -> Optional[str]:
+        """
+        PPTXをPDFに変換する
+
+        Args:
+            pptx_path: PPTXファイルのパス
+            output_dir: 出力ディレクトリ
+            page_range: 出力するページ範囲（例: "3-5"）。Noneの場合は全ページ
+
+        Returns:
+            生成されたPDFのパス（失敗した場合はNone）
+        """
+        pptx_name = os.path.splitext(os.path.basename(pptx_path))[0]
+        suffix = f"_p{page_range}" if page_range else ""
+        pdf_path = os.path.join(output_dir, f"{pptx_name}{suffix}.pdf")
+
+        # 同じ出力先で並行して変換しても衝突しないよう、専用の作業ディレクトリに書き出す
+        os.makedirs(output_dir, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix='.libreoffice-', dir=output_dir)
+        work_pdf_path = os.path.join(work_dir, f"{pptx_name}.pdf")
+
+        try:
+            with self._acquire_slot() as slot:
+                if not self.options['use_listener']:
+                    self._convert_via_cli(slot, pptx_path, work_dir, page_range)
+                else:
+                    state = self._ensure_instance(slot)
+                    try:
+                        self._convert_via_listener(state, pptx_path, work_pdf_path, page_range)
+                    except TimeoutError:
+                        self._stop_instance(slot, state, 'conversion hung')
+                        raise
+                    except Exception as e:
+                        self._stop_instance(slot, state, f"conversion error: {e}")
+                        raise
+
+                    # 変換回数が上限に達したらリサイクル
+                    state['conversions'] = state.get('conversions', 0) + 1
+                    if state['conversions'] >= self.options['max_conversions']:
+                        self._stop_instance(slot, state, 'max conversions reached')
+                    else:
+                        self._write_state(slot, state)
+
+            if not os.path.exists(work_pdf_path):
+                logger.error(f"PDF file not found at {work_pdf_path}")
+                return None
+
+            os.replace(work_pdf_path, pdf_path)
+        except Exception as e:
+            logger.error(f"LibreOffice conversion failed: {str(e)}")
+            return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        return pdf_path
+
+    def shutdown(self) -> None:
+        """プール内のすべての常駐インスタンスを停止する"""
+        for slot in range(max(1, self.options['pool_size'])):
+            state = self._read_state(slot)
+            if state:
+                self._stop_instance(slot, state, 'shutdown')
+
+_default_pool: Optional[LibreOfficePool] = None
+
+def supports_filter_options() -> bool:
+    """単発変換（--convert-to）でフィルターのオプションをJSONで指定できるか（LibreOffice 7.4以降）"""
+    version = get_soffice_version()
+    return version is not None and version >= JSON_FILTER_OPTIONS_VERSION
+
+def supports_page_range() -> bool:
+    """
+    デフォルトプールでページ範囲を指定して変換できるか
+
+    Returns:
+        常駐インスタンスを使う場合、またはLibreOffice 7.4以降の場合はTrue
+    """
+    return bool(get_pool().options['use_listener']) or supports_filter_options()
+
+def get_pool() -> LibreOfficePool:
+    """プロセス共通のデフォルトプールを取得する"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = LibreOfficePool()
+    return _default_pool
+
+def convert_to_pdf(pptx_path: str, output_dir: str, page_range: Optional[str] = None) -> Optional[str]:
+    """
+    デフォルトプールを使ってPPTXをPDFに変換する
+
+    Args:
+        pptx_path: PPTXファイルのパス
+        output_dir: 出力ディレクトリ
+        page_range: 出力するページ範囲（例: "3-5"）
+
+    Returns:
+        生成されたPDFのパス（失敗した場合はNone）
+    """
+    return get_pool().convert_to_pdf(pptx_path, output_dir, page_range)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='LibreOfficeプール管理ツール')
+    parser.add_argument('input', nargs='?', help='変換するPPTXファイル')
+    parser.add_argument('--output', '-o', default='.', help='出力ディレクトリ')
+    parser.add_argument('--shutdown', action='store_true', help='常駐インスタンスをすべて停止')
+
+    args = parser.parse_args()
+
+    pool = get_pool()
+    if args.shutdown:
+        pool.shutdown()
+    elif args.input:
+        result = pool.convert_to_pdf(args.input, args.output)
+        if not result:
+            sys.exit(1)
+        logger.info(f"Converted: {result}")
+    else:
+        parser.print_help()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LibreOffice UNOクライアント
+常駐させたLibreOfficeのリスナーに接続し、PPTXをPDFに変換させる（unoconvと同様のクライアント）
+
+unoモジュールはLibreOffice同梱のPython（またはpython3-unoを入れたシステムのPython）でしか
+インポートできないため、libreoffice_poolはunoが使えない場合、このスクリプトをそのPythonで実行する。
+そのため、このモジュールは標準ライブラリとuno以外に依存しない
+"""
+
+import os
+import sys
+import argparse
+from typing import Optional
+
+# UNOブリッジはLibreOffice同梱のPython（またはpython3-uno）でのみ利用可能
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    UNO_AVAILABLE = True
+except ImportError:
+    uno = None
+    PropertyValue = None
+    UNO_AVAILABLE = False
+
+def _prop(name, value):
+    p = PropertyValue()
+    p.Name = name
+    p.Value = value
+    return p
+
+def convert_document(port: int, pptx_path: str, pdf_path: str, page_range: Optional[str] = None) -> None:
+    """
+    常駐インスタンスにPPTXをPDFに変換させる
+
+    Args:
+        port: リスナーのポート
+        pptx_path: PPTXファイルのパス
+        pdf_path: 出力するPDFのパス
+        page_range: 出力するページ範囲（例: "3-5"）。Noneの場合は全ページ
+    """
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext(
+        'com.sun.star.bridge.UnoUrlResolver', local_ctx)
+    ctx = resolver.resolve(
+        f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext")
+    desktop = ctx.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', ctx)
+
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(os.path.abspath(pptx_path)), '_blank', 0,
+        (_prop('Hidden', True), _prop('ReadOnly', True)))
+    try:
+        # 非表示スライドも書き出し、PDFのページ番号とスライド番号を一致させる
+        filter_data = [_prop('ExportHiddenSlides', True)]
+        if page_range:
+            filter_data.append(_prop('PageRange', page_range))
+        document.storeToURL(
+            uno.systemPathToFileUrl(os.path.abspath(pdf_path)),
+            (_prop('FilterName', 'impress_pdf_Export'),
+             _prop('FilterData', uno.Any('[]com.sun.star.beans.PropertyValue', tuple(filter_data)))))
+    finally:
+        document.close(True)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='常駐LibreOfficeでPPTXをPDFに変換する')
+    parser.add_argument('--port', type=int, required=True, help='リスナーのポート')
+    parser.add_argument('--page-range', help='出力するページ範囲（例: 3-5）')
+    parser.add_argument('input', help='変換するPPTXファイル')
+    parser.add_argument('output', help='出力するPDFファイル')
+    args = parser.parse_args()
+
+    if not UNO_AVAILABLE:
+        print("The uno module is not available in this Python interpreter", file=sys.stderr)
+        return 2
+    try:
+        convert_document(args.port, args.input, args.output, args.page_range)
+    except Exception as e:
+        print(f"Conversion failed: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+埋め込みメディアの一覧モジュール
+ppt/media 内の画像・動画・音声を1回ずつ読み出してハッシュを計算し、サイズ・画像の寸法・参照元のスライドを
+まとめた一覧を作る。同じ内容のメディア（複数のスライドで使われるロゴや背景など）は1つのエントリにまとめる
+"""
+
+import os
+import hashlib
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from lib.python.lazy_package import get_part_source
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('media_inventory')
+
+MEDIA_PREFIX = '/ppt/media/'
+# ハッシュ計算時に一度に読み出すサイズ
+READ_CHUNK_SIZE = 1024 * 1024
+# メディアIDに使うハッシュの長さ（16進数の文字数）
+MEDIA_ID_LENGTH = 16
+# 抽出したメディアを書き出すディレクトリ（出力ディレクトリからの相対パス）
+MEDIA_DIR = 'media'
+
+def _open_part(part, source):
+    # 遅延読み込みの場合はZIPからストリームで読み、それ以外は読み込み済みのバイト列を使う
+    if source is not None:
+        return source.open(part.partname)
+    from io import BytesIO
+    return BytesIO(part.blob)
+
+def _hash_part(part, source) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with _open_part(part, source) as stream:
+        for chunk in iter(lambda: stream.read(READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+def _image_size(part, source) -> Optional[Tuple[int, int]]:
+    if not part.content_type.startswith('image/'):
+        return None
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        # PILはヘッダーのみを読むため、画像全体は展開しない
+        with _open_part(part, source) as stream, Image.open(stream) as image:
+            return image.size
+    except Exception as e:
+        logger.debug(f"Could not read image size of {part.partname}: {str(e)}")
+        return None
+
+def _media_rels(part) -> List[Tuple[str, Any]]:
+    return [(rId, rel.target_part) for rId, rel in part.rels.items()
+            if not rel.is_external and str(rel.target_part.partname).startswith(MEDIA_PREFIX)]
+
+def build_media_inventory(presentation, output_dir: Optional[str] = None,
+                          extract: bool = False) -> Dict[str, Any]:
+    """
+    デッキ全体の埋め込みメディアの一覧を作る
+
+    Args:
+        presentation: プレゼンテーションオブジェクト（lazy_package.open_presentationで開いた場合はストリームで読む）
+        output_dir: 抽出したメディアを書き出す出力ディレクトリ
+        extract: 重複を除いたメディアを output_dir/media に1回ずつ書き出すか
+
+    Returns:
+        {
+            'items': [{id, sha256, size, content_type, ext, width, height, partnames, slides, layouts, masters, path}],
+            'slides': {スライドのインデックス: [{'id', 'rId'}]},
+            'total_bytes', 'unique_bytes', 'duplicate_parts'
+        }
+    """
+    source = get_part_source(presentation)
+
+    # 参照元（スライド・レイアウト・マスター）ごとのメディアパーツ
+    referrers = []
+    for index, slide in enumerate(presentation.slides):
+        referrers.append(('slides', index, slide.part))
+    for master_index, master in enumerate(presentation.slide_masters):
+        referrers.append(('masters', master_index, master.part))
+        for layout in master.slide_layouts:
+            referrers.append(('layouts', str(layout.part.partname), layout.part))
+
+    items: Dict[str, Dict[str, Any]] = {}
+    part_ids: Dict[str, str] = {}
+    slide_media: Dict[int, List[Dict[str, str]]] = {}
+    total_bytes = 0
+
+    for kind, key, referrer in referrers:
+        for rId, part in _media_rels(referrer):
+            partname = str(part.partname)
+            media_id = part_ids.get(partname)
+            if media_id is None:
+                # 各メディアパーツは1回だけ読み出す
+                sha256, size = _hash_part(part, source)
+                total_bytes += size
+                media_id = sha256[:MEDIA_ID_LENGTH]
+                part_ids[partname] = media_id
+                item = items.get(media_id)
+                if item is None:
+                    dimensions = _image_size(part, source)
+                    item = items[media_id] = {
+                        'id': media_id,
+                        'sha256': sha256,
+                        'size': size,
+                        'content_type': part.content_type,
+                        'ext': os.path.splitext(partname)[1].lstrip('.').lower(),
+                        'width': dimensions[0] if dimensions else None,
+                        'height': dimensions[1] if dimensions else None,
+                        'partnames': [],
+                        'slides': [],
+                        'layouts': [],
+                        'masters': [],
+                        'path': None
+                    }
+                    if extract and output_dir:
+                        item['path'] = _extract_part(part, source, output_dir, media_id, item['ext'])
+                item['partnames'].append(partname)
+
+            item = items[media_id]
+            if key not in item[kind]:
+                item[kind].append(key)
+            if kind == 'slides':
+                slide_media.setdefault(key, []).append({'id': media_id, 'rId': rId})
+
+    unique_bytes = sum(item['size'] for item in items.values())
+    duplicate_parts = len(part_ids) - len(items)
+    if duplicate_parts:
+        logger.info(f"Found {duplicate_parts} duplicate media parts ({total_bytes - unique_bytes} bytes)")
+    return {
+        'items': list(items.values()),
+        'slides': slide_media,
+        'total_bytes': total_bytes,
+        'unique_bytes': unique_bytes,
+        'duplicate_parts': duplicate_parts
+    }
+
+def _extract_part(part, source, output_dir: str, media_id: str, ext: str) -> Optional[str]:
+    relative_path = os.path.join(MEDIA_DIR, f"{media_id}.{ext}" if ext else media_id)
+    destination = os.path.join(output_dir, relative_path)
+    try:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        if not os.path.exists(destination):
+            with _open_part(part, source) as stream, open(destination, 'wb') as f:
+                for chunk in iter(lambda: stream.read(READ_CHUNK_SIZE), b''):
+                    f.write(chunk)
+        return relative_path
+    except OSError as e:
+        logger.warning(f"Failed to extract media {part.partname}: {str(e)}")
+        return None
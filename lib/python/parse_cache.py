@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+解析結果キャッシュモジュール
+parse_pptxの結果をディスクに保存し、ワーカーの再起動後や別ノードからも再利用できるようにする
+
+キャッシュは2段構成になっている
+- デッキ単位: PPTXファイルのハッシュ + 解析オプション -> 解析結果全体
+- スライド単位: スライドXMLとその参照先パーツのハッシュ + 解析オプション -> スライドデータと画像
+  編集されたデッキを再アップロードした場合も、変更のないスライドは抽出も画像化も行わない
+"""
+
+import os
+import json
+import fcntl
+import shutil
+import hashlib
+import tempfile
+import zlib
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+from lxml import etree
+from lib.python.lazy_package import part_checksum
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('parse_cache')
+
+# デフォルト設定（環境変数で上書き可能）
+DEFAULT_CACHE_DIR = os.environ.get('PARSE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'pptx_parse_cache'))
+DEFAULT_MAX_BYTES = int(os.environ.get('PARSE_CACHE_MAX_BYTES', 1024 * 1024 * 1024))  # 1GB（0で無効）
+# 出力形式が変わった場合に古いエントリを使わないよう、キーに含める
+CACHE_FORMAT_VERSION = '5'
+
+# スライドの見た目や内容に影響しない参照先
+IGNORED_RELATIONSHIPS = (
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide',
+)
+
+def _options_digest(options: Dict[str, Any]) -> str:
+    return json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+
+def _hash_text(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class SlideFingerprinter:
+    """スライドごとの内容ハッシュを計算する（共有パーツのハッシュはデッキ内で使い回す）"""
+
+    def __init__(self, presentation):
+        """
+        コンストラクタ
+
+        Args:
+            presentation: プレゼンテーションオブジェクト
+        """
+        self._part_hashes = {}
+        self._layout_materials = {}
+        self.deck_fingerprint = self._deck_fingerprint(presentation)
+
+    def _part_hash(self, part) -> str:
+        partname = str(part.partname)
+        if partname not in self._part_hashes:
+            element = getattr(part, '_element', None)
+            # XMLパーツは読み込み済みの要素をシリアライズする
+            if element is not None:
+                self._part_hashes[partname] = hashlib.sha256(etree.tostring(element)).hexdigest()
+            else:
+                # 画像などはCRC32とサイズで識別する（遅延読み込みの場合はメディアを読み出さずにZIPの記録を使う）
+                checksum = part_checksum(part)
+                if checksum is None:
+                    blob = part.blob
+                    checksum = f"{zlib.crc32(blob):08x}:{len(blob)}"
+                self._part_hashes[partname] = _hash_text('media', part.content_type, checksum)
+        return self._part_hashes[partname]
+
+    def _rels_material(self, part) -> List[str]:
+        material = []
+        for rId, rel in sorted(part.rels.items()):
+            if rel.reltype in IGNORED_RELATIONSHIPS:
+                continue
+            if rel.is_external:
+                material.append(f"{rId}:{rel.reltype}:{rel.target_ref}")
+            else:
+                material.append(f"{rId}:{rel.reltype}:{self._part_hash(rel.target_part)}")
+        return material
+
+    def _layout_material(self, layout_part) -> List[str]:
+        # レイアウトの画像や背景はスライドの参照先（レイアウトXML）のハッシュには現れないため、
+        # レイアウト自身の参照先も含める（同じレイアウトを使うスライド間で使い回す）
+        partname = str(layout_part.partname)
+        if partname not in self._layout_materials:
+            self._layout_materials[partname] = self._rels_material(layout_part)
+        return self._layout_materials[partname]
+
+    def _deck_fingerprint(self, presentation) -> str:
+        # マスターとテーマはレイアウト経由で全スライドの見た目に影響する
+        material = [f"{presentation.slide_width}x{presentation.slide_height}"]
+        for master in presentation.slide_masters:
+            material.append(self._part_hash(master.part))
+            material.extend(self._rels_material(master.part))
+        return _hash_text(*material)
+
+    def fingerprint(self, slide) -> str:
+        """
+        スライドの内容ハッシュを計算する
+
+        Args:
+            slide: スライドオブジェクト
+
+        Returns:
+            スライドXML・参照先パーツ・デッキ共通パーツから計算したハッシュ
+        """
+        return _hash_text(
+            self.deck_fingerprint,
+            hashlib.sha256(etree.tostring(slide._element)).hexdigest(),
+            *self._rels_material(slide.part),
+            *self._layout_material(slide.slide_layout.part)
+        )
+
+class ParseCache:
+    """サイズ上限付きLRUの解析結果キャッシュ（複数プロセスから同時に使用可能）"""
+
+    def __init__(self, options: Dict[str, Any] = None):
+        """
+        コンストラクタ
+
+        Args:
+            options: キャッシュオプション
+        """
+        # デフォルトオプション
+        self.default_options = {
+            'cache_dir': DEFAULT_CACHE_DIR,
+            'max_bytes': DEFAULT_MAX_BYTES
+        }
+
+        # オプションをマージ
+        self.options = self.default_options.copy()
+        if options:
+            self.options.update(options)
+
+        if self.enabled:
+            os.makedirs(os.path.join(self.options['cache_dir'], 'decks'), exist_ok=True)
+            os.makedirs(os.path.join(self.options['cache_dir'], 'slides'), exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.options['cache_dir']) and self.options['max_bytes'] > 0
+
+    def deck_key(self, deck_hash: str, parse_options: Dict[str, Any]) -> str:
+        """
+        デッキ単位のキャッシュキーを生成する
+
+        Args:
+            deck_hash: PPTXファイルのハッシュ
+            parse_options: 結果に影響する解析オプション
+
+        Returns:
+            キャッシュキー
+        """
+        return _hash_text(CACHE_FORMAT_VERSION, 'deck', deck_hash, _options_digest(parse_options))
+
+    def slide_key(self, slide_fingerprint: str, parse_options: Dict[str, Any]) -> str:
+        """
+        スライド単位のキャッシュキーを生成する
+
+        Args:
+            slide_fingerprint: SlideFingerprinterで計算したハッシュ
+            parse_options: 結果に影響する解析オプション（スライド範囲は含めない）
+
+        Returns:
+            キャッシュキー
+        """
+        return _hash_text(CACHE_FORMAT_VERSION, 'slide', slide_fingerprint, _options_digest(parse_options))
+
+    def _deck_path(self, key: str) -> str:
+        return os.path.join(self.options['cache_dir'], 'decks', f"{key}.json")
+
+    def _slide_dir(self, key: str) -> str:
+        return os.path.join(self.options['cache_dir'], 'slides', key)
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        try:
+            # LRU判定のため最終利用時刻として更新時刻を進める
+            os.utime(path, None)
+            return True
+        except OSError:
+            return False
+
+    def _write_json_atomic(self, path: str, data: Any) -> None:
+        # 別プロセスから書きかけのファイルが見えないよう、同じディレクトリに書いてから置き換える
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def lookup_slide(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        スライド単位のキャッシュを探す
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            {'slide': スライドデータ, 'image_path': キャッシュ内の画像パス（画像なしはNone）,
+             'image_size': (幅, 高さ)} または None
+        """
+        if not self.enabled:
+            return None
+
+        entry_dir = self._slide_dir(key)
+        if not self._touch(entry_dir):
+            return None
+        try:
+            with open(os.path.join(entry_dir, 'slide.json'), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        image_path = None
+        if entry.get('image_file'):
+            image_path = os.path.join(entry_dir, entry['image_file'])
+            if not os.path.exists(image_path):
+                return None
+        return {
+            'slide': entry['slide'],
+            'image_path': image_path,
+            'image_size': tuple(entry.get('image_size') or (0, 0))
+        }
+
+    def store_slide(self, key: str, slide_data: Dict[str, Any], image_path: Optional[str] = None,
+                    image_size: Tuple[int, int] = (0, 0)) -> None:
+        """
+        スライド単位のキャッシュに保存する
+
+        Args:
+            key: キャッシュキー
+            slide_data: スライドデータ
+            image_path: スライド画像のパス（画像がない場合はNone）
+            image_size: スライド画像のサイズ (幅, 高さ)
+        """
+        if not self.enabled:
+            return
+
+        entry_dir = self._slide_dir(key)
+        if os.path.isdir(entry_dir):
+            self._touch(entry_dir)
+            return
+
+        # 一時ディレクトリに書いてからディレクトリごと置き換える（先に書かれていればそちらを使う）
+        work_dir = tempfile.mkdtemp(prefix='.tmp-', dir=os.path.dirname(entry_dir))
+        try:
+            entry = {'slide': slide_data, 'image_file': None, 'image_size': list(image_size)}
+            if image_path:
+                entry['image_file'] = 'image' + os.path.splitext(image_path)[1]
+                shutil.copyfile(image_path, os.path.join(work_dir, entry['image_file']))
+            with open(os.path.join(work_dir, 'slide.json'), 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            try:
+                os.rename(work_dir, entry_dir)
+            except OSError:
+                # 別プロセスが同じスライドを先に保存した
+                pass
+        finally:
+            if os.path.isdir(work_dir):
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def lookup_deck(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        デッキ単位のキャッシュを探す
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            {'result': 解析結果, 'slide_keys': {スライドインデックス: スライド単位のキー}} または None
+        """
+        if not self.enabled:
+            return None
+
+        path = self._deck_path(key)
+        if not self._touch(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store_deck(self, key: str, result: Dict[str, Any], slide_keys: Dict[int, str]) -> None:
+        """
+        デッキ単位のキャッシュに保存する
+
+        Args:
+            key: キャッシュキー
+            result: 解析結果
+            slide_keys: スライドインデックス -> スライド単位のキー（画像の取り出しに使う）
+        """
+        if not self.enabled:
+            return
+
+        self._write_json_atomic(self._deck_path(key), {
+            'result': result,
+            'slide_keys': {str(index): slide_key for index, slide_key in slide_keys.items()}
+        })
+        self.evict()
+
+    def evict(self) -> None:
+        """サイズ上限を超えた分を古い順に削除する"""
+        if not self.enabled:
+            return
+
+        lock_path = os.path.join(self.options['cache_dir'], 'evict.lock')
+        with open(lock_path, 'a+') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                entries = []
+                total = 0
+                for tier in ('decks', 'slides'):
+                    tier_dir = os.path.join(self.options['cache_dir'], tier)
+                    for name in os.listdir(tier_dir):
+                        if name.startswith('.'):
+                            continue
+                        path = os.path.join(tier_dir, name)
+                        try:
+                            mtime = os.stat(path).st_mtime
+                            if os.path.isdir(path):
+                                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                            else:
+                                size = os.path.getsize(path)
+                        except OSError:
+                            continue
+                        entries.append((mtime, size, path))
+                        total += size
+
+                if total <= self.options['max_bytes']:
+                    return
+
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= self.options['max_bytes']:
+                        break
+                    try:
+                        if os.path.isdir(path):
+                            shutil.rmtree(path)
+                        else:
+                            os.remove(path)
+                        total -= size
+                        logger.info(f"Evicted cache entry: {path}")
+                    except OSError:
+                        pass
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+_default_cache: Optional[ParseCache] = None
+
+def get_parse_cache() -> ParseCache:
+    """プロセス共通のデフォルトキャッシュを取得する"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+    return _default_cache
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻訳データの読み込みモジュール
+pptx_translator.py と pptx_generator.py に渡すスライドごとの翻訳データを、標準入力・ファイルから読み込む
+
+- NDJSON（1行に1スライドのJSONオブジェクト）: 1行ずつ読み込んで返すため、デッキの大きさに関係なくメモリ使用量が一定
+- JSON配列（従来の形式）: 全体を読み込んでから1スライドずつ返す
+"""
+
+import io
+import sys
+import json
+import logging
+from typing import Any, Dict, Iterator, TextIO
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('payload_reader')
+
+# 標準入力から読み込むことを示す引数
+STDIN_ARGUMENT = '-'
+# スライド以外のレコード（pptx_parserのNDJSON出力のヘッダーなど）の type
+NON_SLIDE_RECORD_TYPES = ('header', 'trailer', 'image', 'media')
+
+def _iter_stream(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    # 先頭の空白を読み飛ばして形式を判定する
+    first = stream.read(1)
+    while first and first.isspace():
+        first = stream.read(1)
+    if not first:
+        return
+
+    if first == '[':
+        # 従来のJSON配列
+        slides = json.loads(first + stream.read())
+        if not isinstance(slides, list):
+            raise ValueError("Translation payload must be a JSON array or NDJSON")
+        yield from slides
+        return
+
+    # NDJSON: 1行に1スライド
+    line_number = 0
+    for line in _prepend(first, stream):
+        line_number += 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid NDJSON at line {line_number}: {str(e)}")
+        if not isinstance(record, dict):
+            raise ValueError(f"NDJSON line {line_number} is not a JSON object")
+        if record.get('type') in NON_SLIDE_RECORD_TYPES:
+            continue
+        yield record
+
+def _prepend(first: str, stream: TextIO) -> Iterator[str]:
+    # 形式の判定に読んだ1文字を最初の行に戻す
+    yield first + stream.readline()
+    yield from stream
+
+def iter_slide_payload(source: str) -> Iterator[Dict[str, Any]]:
+    """
+    スライドごとの翻訳データを1件ずつ読み込む
+
+    Args:
+        source: '-'（標準入力）またはファイルのパス
+
+    Yields:
+        スライドの翻訳データ（texts, translations, index などを含む辞書）
+    """
+    if source == STDIN_ARGUMENT:
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+        yield from _iter_stream(stream)
+        return
+
+    with open(source, 'r', encoding='utf-8') as f:
+        yield from _iter_stream(f)
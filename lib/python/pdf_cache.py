@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+中間PDFキャッシュモジュール
+LibreOfficeで生成したPDFを入力ファイルのハッシュとLibreOfficeのバージョンをキーに保存し、
+別サイズ・別形式での再ラスタライズ時にPPTX→PDF変換を省略できるようにする
+"""
+
+import os
+import fcntl
+import shutil
+import hashlib
+import tempfile
+import logging
+from typing import Optional, Dict, Any, Tuple
+
+from lib.python.libreoffice_pool import get_soffice_version_string
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('pdf_cache')
+
+# デフォルト設定（環境変数で上書き可能）
+DEFAULT_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'pptx_pdf_cache'))
+DEFAULT_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))  # 2GB（0で無効）
+HASH_CHUNK_SIZE = 1024 * 1024
+# PDF書き出し設定が変わった場合に古いキャッシュを使わないよう、キーに含める
+EXPORT_VARIANT = 'impress_pdf_Export:ExportHiddenSlides'
+
+def hash_file(path: str) -> str:
+    """
+    ファイル内容のSHA-256を計算する（チャンク単位で読み込む）
+
+    Args:
+        path: ファイルのパス
+
+    Returns:
+        16進数のハッシュ値
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class PDFCache:
+    """サイズ上限付きLRUの中間PDFキャッシュ"""
+
+    def __init__(self, options: Dict[str, Any] = None):
+        """
+        コンストラクタ
+
+        Args:
+            options: キャッシュオプション
+        """
+        # デフォルトオプション
+        self.default_options = {
+            'cache_dir': DEFAULT_CACHE_DIR,
+            'max_bytes': DEFAULT_MAX_BYTES
+        }
+
+        # オプションをマージ
+        self.options = self.default_options.copy()
+        if options:
+            self.options.update(options)
+
+        if self.enabled:
+            os.makedirs(self.options['cache_dir'], exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.options['cache_dir']) and self.options['max_bytes'] > 0
+
+    def libreoffice_version(self) -> str:
+        """
+        LibreOfficeのバージョン文字列を取得する（libreoffice_poolでプロセス内とディスクに記録される）
+        """
+        return get_soffice_version_string() or 'unknown'
+
+    def make_key(self, deck_hash: str, page_range: Optional[str] = None) -> str:
+        """
+        キャッシュキーを生成する
+
+        Args:
+            deck_hash: PPTXファイルのハッシュ
+            page_range: ページ範囲（全ページの場合はNone）
+
+        Returns:
+            キャッシュキー
+        """
+        material = f"{deck_hash}\0{self.libreoffice_version()}\0{EXPORT_VARIANT}\0{page_range or 'all'}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.options['cache_dir'], key[:2], f"{key}.pdf")
+
+    def _pin(self, path: str, pin_dir: str) -> str:
+        """
+        キャッシュのPDFを作業ディレクトリにハードリンクする（別プロセスのevictで削除されても読み続けられる）
+
+        ハードリンクできない場合（別のファイルシステムなど）はコピーする
+        """
+        os.makedirs(pin_dir, exist_ok=True)
+        fd, pinned_path = tempfile.mkstemp(prefix='.pdf-cache-', suffix='.pdf', dir=pin_dir)
+        os.close(fd)
+        os.remove(pinned_path)
+        try:
+            os.link(path, pinned_path)
+        except OSError:
+            shutil.copyfile(path, pinned_path)
+        return pinned_path
+
+    def lookup(self, key: str, pin_dir: Optional[str] = None) -> Optional[str]:
+        """
+        キャッシュからPDFを探す
+
+        Args:
+            key: キャッシュキー
+            pin_dir: 指定した場合、PDFをこのディレクトリにハードリンクしてそのパスを返す
+                （ラスタライズ中にevictで削除されないよう、使い終わるまで固定する。呼び出し元で削除する）
+
+        Returns:
+            PDFのパス（存在しない場合はNone）
+        """
+        if not self.enabled:
+            return None
+
+        path = self._entry_path(key)
+        try:
+            # LRU判定のため最終利用時刻として更新時刻を進める
+            os.utime(path, None)
+            if pin_dir:
+                path = self._pin(path, pin_dir)
+        except OSError:
+            return None
+
+        logger.info(f"PDF cache hit: {self._entry_path(key)}")
+        return path
+
+    def store(self, key: str, pdf_path: str) -> str:
+        """
+        PDFをキャッシュに保存する（キャッシュにはハードリンクを置き、元のファイルは呼び出し元が使い続ける）
+
+        Args:
+            key: キャッシュキー
+            pdf_path: 保存するPDFのパス（使い終わったら呼び出し元で削除する）
+
+        Returns:
+            キャッシュ内のPDFのパス（無効時は元のパス）
+        """
+        if not self.enabled:
+            return pdf_path
+
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # 別プロセスから不完全なファイルが見えないよう、同じディレクトリに書いてから置き換える
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            os.remove(temp_path)
+            try:
+                os.link(pdf_path, temp_path)
+            except OSError:
+                shutil.copyfile(pdf_path, temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        # 保存したばかりのエントリは削除対象から外す
+        self.evict(keep=(path,))
+        return path
+
+    def evict(self, keep: Tuple[str, ...] = ()) -> None:
+        """
+        サイズ上限を超えた分を古い順に削除する
+
+        Args:
+            keep: 削除しないPDFのパス（保存したばかりのエントリなど）
+        """
+        if not self.enabled:
+            return
+
+        lock_path = os.path.join(self.options['cache_dir'], 'evict.lock')
+        with open(lock_path, 'a+') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                entries = []
+                total = 0
+                for root, _, files in os.walk(self.options['cache_dir']):
+                    for name in files:
+                        if not name.endswith('.pdf'):
+                            continue
+                        path = os.path.join(root, name)
+                        try:
+                            stat = os.stat(path)
+                        except OSError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, path))
+                        total += stat.st_size
+
+                if total <= self.options['max_bytes']:
+                    return
+
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= self.options['max_bytes']:
+                        break
+                    if path in keep:
+                        continue
+                    try:
+                        os.remove(path)
+                        total -= size
+                        logger.info(f"Evicted cached PDF: {path}")
+                    except OSError:
+                        pass
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+_default_cache: Optional[PDFCache] = None
+
+def get_pdf_cache() -> PDFCache:
+    """プロセス共通のデフォルトキャッシュを取得する"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PDFCache()
+    return _default_cache
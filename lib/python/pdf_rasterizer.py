@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PDFラスタライズモジュール
+PDFをページ範囲に分割し、複数のpdftoppmプロセスで並列に画像化する
+画像はページ順にストリームとして取り出せるため、メモリ上に保持するページ数は
+同時に処理中のチャンク分に制限される
+"""
+
+import os
+import re
+import sys
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Tuple, Optional, Iterator, Dict, Any
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('pdf_rasterizer')
+
+# デフォルト設定
+DEFAULT_WORKERS = int(os.environ.get('PDF_RASTER_WORKERS', os.cpu_count() or 1))
+DEFAULT_DPI = 300
+DEFAULT_SUPERSAMPLE = float(os.environ.get('PDF_RASTER_SUPERSAMPLE', 1.0))
+POINTS_PER_INCH = 72
+DEFAULT_CHUNK_SIZE = 4  # 1回のpdftoppm呼び出しで処理するページ数
+
+@lru_cache(maxsize=1)
+def find_poppler_path() -> Optional[str]:
+    """
+    popplerのコマンドがあるディレクトリを探す（結果はプロセス内でキャッシュ）
+
+    Returns:
+        popplerのディレクトリ（PATH上のものを使う場合はNone）
+    """
+    if sys.platform != "darwin":  # macOS以外はPATH上のpopplerを使用
+        return None
+
+    # Homebrewでインストールされたpopplerのパスを使用
+    poppler_path = "/opt/homebrew/bin"
+    if not os.path.exists(poppler_path):
+        poppler_path = "/usr/local/bin"
+
+    # パスの存在確認
+    logger.debug(f"Checking poppler path: {poppler_path}")
+    if os.path.exists(os.path.join(poppler_path, "pdftoppm")):
+        logger.debug(f"pdftoppm found at {os.path.join(poppler_path, 'pdftoppm')}")
+    else:
+        logger.warning(f"pdftoppm NOT found at {os.path.join(poppler_path, 'pdftoppm')}")
+        # 環境変数PATHからpoppler関連コマンドを探す
+        for path_dir in os.environ.get('PATH', '').split(':'):
+            if os.path.exists(os.path.join(path_dir, 'pdftoppm')):
+                poppler_path = path_dir
+                logger.info(f"Found pdftoppm in PATH: {os.path.join(path_dir, 'pdftoppm')}")
+                break
+
+    return poppler_path
+
+def get_pdf_info(pdf_path: str, poppler_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    PDFのページ数とページサイズを取得する
+
+    Args:
+        pdf_path: PDFファイルのパス
+        poppler_path: popplerのディレクトリ
+
+    Returns:
+        {'pages': ページ数, 'page_size': (幅, 高さ)（ポイント、取得できない場合はNone）}
+    """
+    info = pdfinfo_from_path(pdf_path, poppler_path=poppler_path)
+
+    # 例: "720 x 405 pts" / "612 x 792 pts (letter)"
+    page_size = None
+    match = re.match(r'\s*([\d.]+)\s*x\s*([\d.]+)', str(info.get('Page size', '')))
+    if match:
+        page_size = (float(match.group(1)), float(match.group(2)))
+
+    return {
+        'pages': int(info.get('Pages', 0)),
+        'page_size': page_size
+    }
+
+def get_page_count(pdf_path: str, poppler_path: Optional[str] = None) -> int:
+    """
+    PDFのページ数を取得する
+
+    Args:
+        pdf_path: PDFファイルのパス
+        poppler_path: popplerのディレクトリ
+
+    Returns:
+        ページ数
+    """
+    return get_pdf_info(pdf_path, poppler_path)['pages']
+
+def compute_render_dpi(page_size: Optional[Tuple[float, float]], max_width: int, max_height: int,
+                       supersample: float = DEFAULT_SUPERSAMPLE) -> float:
+    """
+    出力サイズに収まるちょうどの解像度を計算する
+
+    Args:
+        page_size: ページサイズ (幅, 高さ)（ポイント）
+        max_width: 出力の最大幅（ピクセル）
+        max_height: 出力の最大高さ（ピクセル）
+        supersample: 品質確保のためのオーバーサンプリング倍率（1.0で等倍）
+
+    Returns:
+        レンダリング解像度（DPI）
+    """
+    if not page_size or page_size[0] <= 0 or page_size[1] <= 0:
+        return DEFAULT_DPI
+
+    width_in = page_size[0] / POINTS_PER_INCH
+    height_in = page_size[1] / POINTS_PER_INCH
+    dpi = min(max_width / width_in, max_height / height_in) * max(1.0, supersample)
+    return round(dpi, 2)
+
+def split_page_chunks(first_page: int, last_page: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    ページ範囲を一定ページ数ごとのチャンクに分割する
+
+    Args:
+        first_page: 最初のページ（1始まり）
+        last_page: 最後のページ（この値を含む）
+        chunk_size: 1チャンクあたりのページ数
+
+    Returns:
+        (開始ページ, 終了ページ) のリスト
+    """
+    chunk_size = max(1, chunk_size)
+    return [(start, min(start + chunk_size - 1, last_page))
+            for start in range(first_page, last_page + 1, chunk_size)]
+
+def split_page_list(pages: List[int], chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    任意のページ番号の集合を、連続するページごとのチャンクに分割する
+
+    Args:
+        pages: ページ番号のリスト（1始まり）
+        chunk_size: 1チャンクあたりの最大ページ数
+
+    Returns:
+        (開始ページ, 終了ページ) のリスト
+    """
+    chunks = []
+    run_start = run_end = None
+    for page in sorted(set(pages)):
+        if run_start is not None and page == run_end + 1:
+            run_end = page
+            continue
+        if run_start is not None:
+            chunks.extend(split_page_chunks(run_start, run_end, chunk_size))
+        run_start = run_end = page
+    if run_start is not None:
+        chunks.extend(split_page_chunks(run_start, run_end, chunk_size))
+    return chunks
+
+def iter_rasterized_pages(pdf_path: str, size: Optional[Tuple[int, int]] = None,
+                          dpi: int = DEFAULT_DPI, workers: int = DEFAULT_WORKERS,
+                          first_page: Optional[int] = None, last_page: Optional[int] = None,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          poppler_path: Optional[str] = None,
+                          page_count: Optional[int] = None,
+                          skip_pages: Optional[List[int]] = None) -> Iterator[Tuple[int, object]]:
+    """
+    PDFをチャンク単位で並列にラスタライズし、ページ順に1枚ずつ返す
+
+    先読みするチャンク数はワーカー数までに制限されるため、
+    スライド数に関係なくメモリ使用量はほぼ一定になる。
+
+    Args:
+        pdf_path: PDFファイルのパス
+        size: 出力サイズ (幅, 高さ)
+        dpi: レンダリング解像度
+        workers: 並列で起動するpdftoppmの数
+        first_page: 最初のページ（1始まり、Noneの場合は先頭）
+        last_page: 最後のページ（Noneの場合は末尾）
+        chunk_size: 1回のpdftoppm呼び出しで処理するページ数
+        poppler_path: popplerのディレクトリ（Noneの場合は自動検出）
+        page_count: ページ数（取得済みの場合。Noneの場合はpdfinfoで取得）
+        skip_pages: ラスタライズしないページ番号のリスト（1始まり）
+
+    Yields:
+        (ページ番号, PIL画像)
+    """
+    if poppler_path is None:
+        poppler_path = find_poppler_path()
+
+    if page_count is None:
+        page_count = get_page_count(pdf_path, poppler_path)
+    first = max(1, first_page or 1)
+    last = min(page_count, last_page or page_count)
+    if skip_pages:
+        skipped = set(skip_pages)
+        chunks = split_page_list([page for page in range(first, last + 1) if page not in skipped], chunk_size)
+    else:
+        chunks = split_page_chunks(first, last, chunk_size) if last >= first else []
+    workers = max(1, min(workers, len(chunks) or 1))
+
+    logger.info(f"Rasterizing pages {first}-{last} of {pdf_path} in {len(chunks)} chunks with {workers} workers"
+                + (f" (skipping {len(skip_pages)} pages)" if skip_pages else ""))
+
+    def render_chunk(page_range: Tuple[int, int]) -> list:
+        # PPM（無圧縮）で標準出力から受け取るため、中間のPNG圧縮・展開は行わない（圧縮はencode_imageで1回だけ）
+        return convert_from_path(
+            pdf_path,
+            size=size,
+            poppler_path=poppler_path,
+            dpi=dpi,
+            fmt="ppm",
+            first_page=page_range[0],
+            last_page=page_range[1],
+            transparent=False,
+            use_cropbox=True,
+            strict=False
+        )
+
+    # pdftoppmは別プロセスで動くため、スレッドで待ち合わせれば十分に並列化される
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        next_chunk = 0
+
+        while next_chunk < len(chunks) or pending:
+            # 先読みはワーカー数までに制限する
+            while next_chunk < len(chunks) and len(pending) < workers:
+                pending.append((chunks[next_chunk], executor.submit(render_chunk, chunks[next_chunk])))
+                next_chunk += 1
+
+            page_range, future = pending.popleft()
+            images = future.result()
+            page_number = page_range[0]
+            while images:
+                # 渡したページの参照はすぐに手放す
+                yield page_number, images.pop(0)
+                page_number += 1
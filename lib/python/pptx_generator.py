@@ -1,21 +1,27 @@
 #!/usr/bin/env python3
+import os
 import sys
 import json
-from pptx import Presentation
 from pptx.util import Pt, Inches, Emu
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_SHAPE
 from pptx.dml.color import RGBColor
 from pptx.oxml.xmlchemy import OxmlElement
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterable
 import math
 import logging
+from lazy_package import open_presentation, close_presentation
+from payload_reader import iter_slide_payload
+from text_metrics import measure_text
 
 # ロギングの設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('pptx_generator')
 
 # EMUからピクセル、ピクセルからEMUへの変換関数
+# 1ピクセル（96dpi）あたりのポイント数
+POINTS_PER_PIXEL = 72 / 96
+
 def emu_to_pixels(emu: int) -> float:
     """EMU単位をピクセルに変換"""
     return emu / 9525  # 1 pixel = 9525 EMU
@@ -57,77 +63,23 @@ def get_alignment(alignment_str: str) -> PP_ALIGN:
     }
     return alignment_map.get(alignment_str.lower(), PP_ALIGN.LEFT)
 
-def estimate_text_height(text: str, font_size: float, width: float, lang: str = "en") -> float:
-    """テキストの高さをより正確に推定"""
-    # 言語ごとの文字幅係数
-    char_width_factors = {
-        "en": 0.6,  # 英語（基準）
-        "ja": 1.0,  # 日本語
-        "zh": 1.0,  # 中国語
-        "ko": 0.9,  # 韓国語
-        "ru": 0.7,  # ロシア語
-        "ar": 0.8,  # アラビア語
-        "de": 0.65, # ドイツ語
-        "fr": 0.65, # フランス語
-        "es": 0.65, # スペイン語
-    }
-    
-    # 言語ごとの行高係数
-    line_height_factors = {
-        "en": 1.2,  # 英語（基準）
-        "ja": 1.5,  # 日本語
-        "zh": 1.5,  # 中国語
-        "ko": 1.4,  # 韓国語
-        "ru": 1.3,  # ロシア語
-        "ar": 1.4,  # アラビア語
-        "de": 1.2,  # ドイツ語
-        "fr": 1.2,  # フランス語
-        "es": 1.2,  # スペイン語
-    }
-    
-    # 言語に応じた係数を取得
-    char_width_factor = char_width_factors.get(lang, 0.6)
-    line_height_factor = line_height_factors.get(lang, 1.2)
-    
-    # 改行文字で分割して行数を計算
-    explicit_lines = text.split('\n')
-    total_lines = 0
-    
-    for line in explicit_lines:
-        if not line:  # 空行の場合
-            total_lines += 1
-            continue
-            
-        # 各行の文字数から必要な行数を計算
-        avg_char_width = font_size * char_width_factor
-        chars_per_line = max(1, int(width / avg_char_width))
-        
-        # 単語単位で折り返すことを考慮
-        if lang in ["en", "de", "fr", "es", "ru"]:
-            # スペースで分割して単語ごとに処理
-            words = line.split(' ')
-            current_line_length = 0
-            line_count = 1
-            
-            for word in words:
-                word_length = len(word) + 1  # スペースを含む
-                if current_line_length + word_length > chars_per_line:
-                    line_count += 1
-                    current_line_length = word_length
-                else:
-                    current_line_length += word_length
-            
-            total_lines += line_count
-        else:
-            # CJK言語などは文字単位で折り返し
-            line_count = math.ceil(len(line) / chars_per_line)
-            total_lines += line_count
-    
-    # 行の高さを計算
-    line_height = font_size * line_height_factor
-    
-    # 最終的な高さを返す
-    return total_lines * line_height
+def estimate_text_height(text: str, font_size: float, width: float, lang: str = "en",
+                         font_name: Optional[str] = None) -> float:
+    """
+    テキストの高さを推定する（実際のフォントのグリフの送り幅で折り返しを計算する）
+
+    Args:
+        text: テキスト
+        font_size: フォントサイズ（pt）
+        width: 折り返す幅（ピクセル）
+        lang: テキストの言語（代替フォントの選択に使う）
+        font_name: フォント名
+
+    Returns:
+        高さ（ピクセル）
+    """
+    measured = measure_text(text, font_size, width * POINTS_PER_PIXEL, font_name, lang)
+    return measured['height'] / POINTS_PER_PIXEL
 
 def adjust_text_box_size(shape, text: str, style: Dict, lang: str = "en", source_lang: str = "ja") -> None:
     """テキストボックスのサイズと位置を調整（改良版）"""
@@ -238,7 +190,10 @@ def adjust_text_box_size(shape, text: str, style: Dict, lang: str = "en", source
         logger.info(f"標準的な自動調整: 幅を{lang_factor:.2f}倍に調整")
     
     # テキストの推定高さを計算し、必要に応じて高さを調整
-    estimated_height = estimate_text_height(text, font_size, emu_to_pixels(shape.width), lang)
+    text_frame = shape.text_frame
+    text_width = emu_to_pixels(shape.width - (text_frame.margin_left or 0) - (text_frame.margin_right or 0))
+    estimated_height = estimate_text_height(text, font_size, text_width, lang,
+                                            style.get("fontName") or style.get("fontFamily"))
     current_height = emu_to_pixels(shape.height)
     
     # 推定高さが現在の高さを超える場合、高さを調整
@@ -340,13 +295,19 @@ def set_rtl_text_direction(text_frame) -> None:
     except Exception as e:
         logger.warning(f"RTL設定エラー: {e}")
 
-def create_translated_pptx(original_pptx_path: str, translations: List[Dict], output_path: str):
-    """翻訳済みのPPTXファイルを生成"""
+def create_translated_pptx(original_pptx_path: str, translations: Iterable[Dict], output_path: str):
+    """
+    翻訳済みのPPTXファイルを生成
+
+    translationsはリストのほか、iter_slide_payloadのようにスライドを1件ずつ返すイテレータでもよい
+    （読み込んだスライドから順に適用する）。スライドの位置は index があればそれを、なければ順番を使う
+    """
+    prs = None
     try:
         logger.info(f"翻訳PPTXの生成開始: {original_pptx_path} -> {output_path}")
         
         # 元のプレゼンテーションを読み込み
-        prs = Presentation(original_pptx_path)
+        prs = open_presentation(original_pptx_path)
         
         # プレゼンテーションのメタデータを更新
         if hasattr(prs, 'core_properties'):
@@ -354,14 +315,19 @@ def create_translated_pptx(original_pptx_path: str, translations: List[Dict], ou
                 prs.core_properties.title += " (Translated)"
         
         # 翻訳データの検証
-        if not isinstance(translations, list):
+        if isinstance(translations, (dict, str, bytes)):
             logger.error("翻訳データが無効です: リスト形式ではありません")
             raise ValueError("翻訳データは配列である必要があります")
         
-        logger.info(f"スライド数: 元={len(prs.slides)}, 翻訳={len(translations)}")
+        logger.info(f"スライド数: 元={len(prs.slides)}")
         
         # 各スライドの翻訳を適用
-        for slide_idx, slide_data in enumerate(translations):
+        applied_slides = 0
+        for position, slide_data in enumerate(translations):
+            applied_slides += 1
+            slide_idx = slide_data.get("index")
+            if not isinstance(slide_idx, int):
+                slide_idx = position
             if slide_idx >= len(prs.slides):
                 logger.warning(f"スライド {slide_idx + 1} が元のプレゼンテーションに存在しません")
                 continue
@@ -440,6 +406,8 @@ def create_translated_pptx(original_pptx_path: str, translations: List[Dict], ou
                     
                     shape_index += 1
         
+        logger.info(f"翻訳を適用したスライド数: {applied_slides}")
+        
         # 保存
         prs.save(output_path)
         logger.info(f"翻訳PPTXが生成されました: {output_path}")
@@ -457,24 +425,24 @@ def create_translated_pptx(original_pptx_path: str, translations: List[Dict], ou
             "message": f"Failed to generate PPTX: {str(e)}",
             "error": str(e)
         }
+    finally:
+        close_presentation(prs)
 
 if __name__ == "__main__":
     # コマンドライン引数からパスを取得
     if len(sys.argv) != 4:
-        print("Usage: python pptx_generator.py <original_pptx_path> <translations_json_path> <output_path>")
+        print("Usage: python pptx_generator.py <original_pptx_path> <translations_json_path | -> <output_path>")
         sys.exit(1)
     
     original_pptx_path = sys.argv[1]
     translations_json_path = sys.argv[2]
     output_path = sys.argv[3]
     
-    # JSONファイルから翻訳データを読み込む
-    try:
-        with open(translations_json_path, 'r', encoding='utf-8') as f:
-            translations = json.load(f)
-    except Exception as e:
-        print(f"Error loading translations JSON: {e}")
+    # 翻訳データ（JSON配列またはNDJSON、'-' の場合は標準入力）は、PPTXの生成中に1スライドずつ読み込む
+    if translations_json_path != '-' and not os.path.isfile(translations_json_path):
+        print(f"Error loading translations JSON: {translations_json_path} does not exist")
         sys.exit(1)
+    translations = iter_slide_payload(translations_json_path)
     
     # PPTXを生成
     result = create_translated_pptx(original_pptx_path, translations, output_path)
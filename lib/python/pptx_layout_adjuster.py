@@ -17,7 +17,6 @@ import math
 import re
 from datetime import datetime
 
-from pptx import Presentation
 from pptx.shapes.autoshape import Shape
 from pptx.shapes.group import GroupShape
 from pptx.shapes.graphfrm import GraphicFrame
@@ -30,6 +29,7 @@ from layout_utils import (
     TextBoxInfo, AdjustedTextBoxInfo, adjust_layout,
     get_expansion_ratio, LANGUAGE_OFFSETS
 )
+from lazy_package import open_presentation, close_presentation
 
 # ロギング設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -107,6 +107,7 @@ class PPTXLayoutAdjuster:
             'collision_count': 0
         }
         
+        prs = None
         try:
             # 入力ファイルの存在確認
             if not os.path.exists(input_file_path):
@@ -141,7 +142,7 @@ class PPTXLayoutAdjuster:
             
             # PPTXファイルを読み込む
             logger.info(f"PPTXファイルを読み込んでいます: {input_file_path}")
-            prs = Presentation(input_file_path)
+            prs = open_presentation(input_file_path)
             
             # 各スライドを処理
             for slide_index, slide in enumerate(prs.slides):
@@ -249,6 +250,8 @@ class PPTXLayoutAdjuster:
             logger.error(f"PPTXレイアウト調整中にエラーが発生しました: {error_message}", exc_info=True)
             
             return self.result
+        finally:
+            close_presentation(prs)
     
     def _extract_text_box_info(
         self,
@@ -4,29 +4,93 @@
 import os
 import sys
 import json
+import shutil
+import hashlib
 import argparse
-from pdf2image import convert_from_path
-import subprocess
 import logging
-from typing import List, Dict, Any, Tuple, Optional, Union
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import List, Dict, Any, Tuple, Optional, Union, Callable
 from pptx import Presentation
+from pptx.enum.dml import MSO_COLOR_TYPE, MSO_FILL
 from pptx.shapes.autoshape import Shape
 from pptx.shapes.group import GroupShape
 from pptx.shapes.picture import Picture
 from pptx.shapes.placeholder import PlaceholderGraphicFrame
-# 同じディレクトリにあるimage_optimizerモジュールをインポート
-from lib.python.image_optimizer import optimize_image, batch_optimize, get_optimal_format
+from lib.python.libreoffice_pool import convert_to_pdf, supports_page_range
+from lib.python import serializer
+from lib.python import compact_schema
+from lib.python.style_resolver import StyleResolver, paragraph_style_summary
+from lib.python.reading_order import order_text_elements, is_vertical_text
+from lib.python.lazy_package import open_presentation, close_presentation
+from lib.python.text_normalizer import normalize_text_element
+from lib.python.media_inventory import build_media_inventory
+from lib.python.coordinate_transform import (
+    IDENTITY, add_pixel_positions, group_child_affine, slide_to_image_affine, to_slide_position, transform_boxes
+)
+# 画像処理系のモジュール（PIL/pdf2image）はテキストのみのモードで読み込まないよう、
+# 必要になった時点でインポートする
 
 # ロギング設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('pptx_parser')
 
+# サムネイルの出力サイズ
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_HEIGHT = 180
+
+# 非表示スライドの扱い
+# skip: 結果から除外 / placeholder: インデックスのみの空データ / full: 通常どおり処理
+HIDDEN_SLIDE_POLICIES = ('skip', 'placeholder', 'full')
+DEFAULT_HIDDEN_SLIDE_POLICY = 'full'
+
+# 抽出する項目（テキスト・位置・段落とランの区切りは常に抽出する）
+# fonts: ランのフォント / paragraph_styles: 段落の配置・行間など / bullets: 箇条書き
+# resolved_styles: 継承した書式の解決結果 / shapes: テキスト以外の図形情報
+# shape_styles: 図形の塗り・線の色 / shape_geometry: 多角形の頂点など / background: スライドの背景
+EXTRACTION_FIELDS = ('fonts', 'paragraph_styles', 'bullets', 'resolved_styles',
+                     'shapes', 'shape_styles', 'shape_geometry', 'background')
+# 用途ごとの抽出項目
+# translate: 翻訳と書き戻しに必要なテキストのみ / preview: 表示用（図形の頂点は省略） / full: すべて
+EXTRACTION_PROFILES = {
+    'translate': frozenset(),
+    'preview': frozenset(('fonts', 'paragraph_styles', 'bullets', 'resolved_styles',
+                          'shapes', 'shape_styles', 'background')),
+    'full': frozenset(EXTRACTION_FIELDS)
+}
+DEFAULT_EXTRACTION_PROFILE = os.environ.get('PPTX_EXTRACTION_PROFILE', 'full')
+
+# テキスト抽出エンジン
+# python-pptx: プロキシオブジェクト経由 / lxml: スライドXMLを直接走査（pptx_xml_extractor）
+EXTRACTION_ENGINES = ('python-pptx', 'lxml')
+DEFAULT_EXTRACTION_ENGINE = os.environ.get('PPTX_EXTRACTION_ENGINE', 'python-pptx')
+
+# テキスト抽出のプロセス並列化
+# 抽出するスライドがPARALLEL_EXTRACT_MIN_SLIDES枚以上の場合のみプロセスプールを使う（0の場合は使わない）
+DEFAULT_EXTRACT_WORKERS = int(os.environ.get('PPTX_EXTRACT_WORKERS', 0))
+PARALLEL_EXTRACT_MIN_SLIDES = int(os.environ.get('PPTX_PARALLEL_EXTRACT_MIN_SLIDES', 50))
+# 1タスクで抽出するスライド数（結果はタスク単位で親プロセスに返すため、ワーカーのメモリ使用量の上限になる）
+EXTRACT_CHUNK_SIZE = int(os.environ.get('PPTX_EXTRACT_CHUNK_SIZE', 16))
+# 抽出ワーカーの起動方法（forkserverが使えない環境ではspawn）
+EXTRACT_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
 def convert_to_png(pptx_path: str, output_dir: str, optimize: bool = True, 
                   format: str = 'WEBP', quality: int = 85, 
-                  max_width: int = 1920, max_height: int = 1080) -> tuple[List[str], tuple[int, int]]:
+                  max_width: int = 1920, max_height: int = 1080,
+                  raster_workers: Optional[int] = None,
+                  supersample: Optional[float] = None,
+                  slide_range: Optional[Tuple[int, int]] = None,
+                  stats: Optional[Dict[str, Any]] = None,
+                  skip_slides: Optional[List[int]] = None,
+                  on_image: Optional[Callable[[int, str], None]] = None) -> tuple[List[Optional[str]], tuple[int, int]]:
     """
     PPTXの各スライドをPNG画像に変換し、必要に応じて最適化する
     
+    レンダリング結果が同一のスライド（区切りページなど）は一度だけエンコードし、
+    同じ画像パスを指すようにする
+    
     Args:
         pptx_path (str): PPTXファイルのパス
         output_dir (str): 出力ディレクトリ
@@ -35,181 +99,179 @@ def convert_to_png(pptx_path: str, output_dir: str, optimize: bool = True,
         quality (int): 画質 (0-100)
         max_width (int): 最大幅
         max_height (int): 最大高さ
+        raster_workers (int): PDFのラスタライズに使う並列ワーカー数（Noneの場合は既定値）
+        supersample (float): 出力サイズに対するレンダリング倍率（Noneの場合は既定値）
+        slide_range (Tuple[int, int]): 変換するスライドの範囲（0始まり、両端を含む）。Noneの場合は全スライド
+        stats (Dict[str, Any]): 指定された場合、重複排除の集計（unique_images, duplicate_images）を書き込む
+        skip_slides (List[int]): 画像化しないスライドのインデックス（0始まり、非表示スライドなど）
+        on_image (Callable): 画像を1枚出力するたびに (スライドのインデックス, 相対パス) で呼ばれるコールバック
     
     Returns:
-        tuple[List[str], tuple[int, int]]: 画像パスのリストと画像サイズ
+        tuple[List[Optional[str]], tuple[int, int]]: スライド順の画像パスのリスト
+            （画像化しなかったスライドはNone）と画像サイズ
     """
     try:
+        from lib.python.image_optimizer import encode_image, resize_image, SUPPORTED_FORMATS
+        from lib.python.pdf_rasterizer import (
+            iter_rasterized_pages, get_pdf_info, compute_render_dpi, DEFAULT_WORKERS, DEFAULT_SUPERSAMPLE
+        )
+        from lib.python.pdf_cache import get_pdf_cache, hash_file
+        if raster_workers is None:
+            raster_workers = DEFAULT_WORKERS
+        if supersample is None:
+            supersample = DEFAULT_SUPERSAMPLE
+        
         # デバッグ出力を追加
         logger.info(f"Starting convert_to_png: pptx_path={pptx_path}, output_dir={output_dir}")
         
         # 出力ディレクトリが存在しない場合は作成
         os.makedirs(output_dir, exist_ok=True)
         
-        # PPTXをPDFに変換
-        pptx_name = os.path.splitext(os.path.basename(pptx_path))[0]
-        pdf_path = os.path.join(output_dir, f"{pptx_name}.pdf")
+        # PPTXをPDFに変換（常駐LibreOfficeプールを使用）
+        # 変換済みのPDFがキャッシュにあればLibreOfficeを起動せずに再利用する
+        pdf_cache = get_pdf_cache()
+        deck_hash = hash_file(pptx_path) if pdf_cache.enabled else None
+        first_page = last_page = None
+        page_offset = 0
         
-        logger.info(f"Converting PPTX to PDF: output={pdf_path}")
+        # キャッシュのPDFは出力ディレクトリにハードリンクして使う（ラスタライズ中に別プロセスのevictで
+        # 削除されても読み続けられる）。変換したPDFもキャッシュにはハードリンクを置き、ここでは出力ディレクトリの
+        # ファイルを使う。どちらの場合もラスタライズ後に出力ディレクトリのPDFを削除する
+        pdf_path = pdf_cache.lookup(pdf_cache.make_key(deck_hash), pin_dir=output_dir) if deck_hash else None
+        if slide_range and (pdf_path or not supports_page_range()):
+            # 全スライドのPDF（キャッシュ済みのもの、またはページ範囲を指定して変換できない環境
+            # (UNOがなく、LibreOfficeが7.4未満) で変換したもの）から必要なページだけをラスタライズする
+            first_page, last_page = slide_range[0] + 1, slide_range[1] + 1
+        if not pdf_path:
+            # スライド範囲が指定されている場合はその範囲のページだけを書き出す
+            page_range = None
+            if slide_range and first_page is None:
+                page_offset = slide_range[0]
+                page_range = f"{slide_range[0] + 1}-{slide_range[1] + 1}"
+            cache_key = pdf_cache.make_key(deck_hash, page_range) if deck_hash else None
+            pdf_path = pdf_cache.lookup(cache_key, pin_dir=output_dir) if cache_key else None
+            if not pdf_path:
+                logger.info(f"Converting PPTX to PDF via LibreOffice pool: output_dir={output_dir}, page_range={page_range}")
+                pdf_path = convert_to_pdf(pptx_path, output_dir, page_range)
+                if not pdf_path:
+                    return [], (0, 0)
+                logger.info(f"PDF file created successfully: {pdf_path}")
+                if cache_key:
+                    try:
+                        pdf_cache.store(cache_key, pdf_path)
+                    except Exception as e:
+                        logger.warning(f"Failed to cache PDF file: {str(e)}")
+            
+        # PDFをページ単位でラスタライズし、そのままメモリ上でエンコードする
+        # （一時PNGを経由せず、同時に保持するページ数も先読み分に限られる）
+        paths_by_slide = {}  # スライド番号（1始まり） -> 相対パス
+        encoded_by_hash = {}  # レンダリング結果のハッシュ -> 相対パス
+        duplicate_count = 0
+        actual_width, actual_height = 0, 0
+        optimized_dir = os.path.join(output_dir, "optimized")
+        extension = SUPPORTED_FORMATS.get(format, SUPPORTED_FORMATS['PNG'])['extension']
         
-        if sys.platform == "darwin":  # macOS
-            # LibreOfficeのパスを確認
-            libreoffice_path = subprocess.run(["which", "soffice"], capture_output=True, text=True).stdout.strip()
-            logger.info(f"LibreOffice path: {libreoffice_path}")
+        try:
+            logger.info(f"Converting PDF to images with target size: {max_width}x{max_height}")
+            if optimize:
+                logger.info(f"Optimizing images to format: {format}, quality: {quality}")
             
-            result = subprocess.run(
-                [libreoffice_path, "--headless", "--convert-to", "pdf", "--outdir", output_dir, pptx_path],
-                capture_output=True,
-                text=True
-            )
+            # 出力サイズから解像度を決める（300dpi固定で描画して縮小する無駄を避ける）
+            pdf_info = get_pdf_info(pdf_path)
+            dpi = compute_render_dpi(pdf_info['page_size'], max_width, max_height, supersample)
+            logger.info(f"Rendering at {dpi} dpi (page size: {pdf_info['page_size']}, supersample: {supersample})")
             
-            logger.info(f"LibreOffice conversion result: returncode={result.returncode}")
-            logger.debug(f"LibreOffice stdout: {result.stdout}")
-            logger.debug(f"LibreOffice stderr: {result.stderr}")
+            # 出力対象のスライド番号と、PDF上でスキップするページ
+            first_slide_number = page_offset + (first_page or 1)
+            last_slide_number = page_offset + (last_page or pdf_info['pages'])
+            skip_pages = [index + 1 - page_offset for index in (skip_slides or [])
+                          if first_slide_number <= index + 1 <= last_slide_number]
             
-            if result.returncode != 0:
-                logger.error(f"LibreOffice conversion failed with code {result.returncode}")
-                return [], (0, 0)
-        else:  # Linux
-            result = subprocess.run(
-                ["libreoffice", "--headless", "--convert-to", "pdf", "--outdir", output_dir, pptx_path],
-                capture_output=True,
-                text=True
+            pages = iter_rasterized_pages(
+                pdf_path,
+                dpi=dpi,
+                workers=raster_workers,
+                first_page=first_page,
+                last_page=last_page,
+                page_count=pdf_info['pages'],
+                skip_pages=skip_pages
             )
-            if result.returncode != 0:
-                logger.error(f"LibreOffice conversion failed with code {result.returncode}")
-                return [], (0, 0)
-
-        if not os.path.exists(pdf_path):
-            logger.error(f"PDF file not found at {pdf_path}")
-            return [], (0, 0)
-            
-        logger.info(f"PDF file created successfully: {pdf_path}")
             
-        # PDFを画像に変換（アスペクト比を保持）
-        try:
-            # popplerのパスを確認
-            poppler_path = None
-            if sys.platform == "darwin":  # macOS
-                # Homebrewでインストールされたpopplerのパスを使用
-                poppler_path = "/opt/homebrew/bin"
-                if not os.path.exists(poppler_path):
-                    poppler_path = "/usr/local/bin"
-                
-                # パスの存在確認
-                logger.debug(f"Checking poppler path: {poppler_path}")
-                if os.path.exists(os.path.join(poppler_path, "pdftoppm")):
-                    logger.debug(f"pdftoppm found at {os.path.join(poppler_path, 'pdftoppm')}")
-                else:
-                    logger.warning(f"pdftoppm NOT found at {os.path.join(poppler_path, 'pdftoppm')}")
-                    # 環境変数PATHからpoppler関連コマンドを探す
-                    for path_dir in os.environ.get('PATH', '').split(':'):
-                        if os.path.exists(os.path.join(path_dir, 'pdftoppm')):
-                            poppler_path = path_dir
-                            logger.info(f"Found pdftoppm in PATH: {os.path.join(path_dir, 'pdftoppm')}")
-                            break
-            
-            logger.info(f"Using poppler_path: {poppler_path}")
-            logger.info(f"Converting PDF to images with target size: {max_width}x{max_height}")
-            
-            # 高品質設定でPDFを画像に変換
-            images = convert_from_path(
-                pdf_path, 
-                size=(max_width, max_height),
-                poppler_path=poppler_path,
-                dpi=300,  # 高解像度
-                fmt="png",  # PNG形式で出力（後で最適化）
-                transparent=False,  # 透明度なし
-                use_cropbox=True,  # クロップボックスを使用
-                strict=False  # 厳密なエラーチェックを無効化
-            )
+            for page_number, image in pages:
+                # PDF内のページ番号を元のスライド番号に戻す
+                slide_number = page_offset + page_number
+                try:
+                    # 同じ見た目のスライドは既存の画像を共有する
+                    render_hash = hashlib.sha1(
+                        f"{image.mode}:{image.width}x{image.height}:".encode('ascii') + image.tobytes()
+                    ).hexdigest()
+                    if render_hash in encoded_by_hash:
+                        paths_by_slide[slide_number] = encoded_by_hash[render_hash]
+                        duplicate_count += 1
+                        logger.debug(f"Slide {slide_number} is identical to {encoded_by_hash[render_hash]}")
+                        if on_image:
+                            on_image(slide_number - 1, encoded_by_hash[render_hash])
+                        continue
+                    
+                    if optimize:
+                        result = encode_image(
+                            image,
+                            os.path.join(optimized_dir, f"slide_{slide_number}{extension}"),
+                            format=format,
+                            quality=quality,
+                            max_width=max_width,
+                            max_height=max_height
+                        )
+                        logger.debug(f"Optimized image {slide_number}: {result['path']} ({result['optimized']['size']} bytes)")
+                        image_path = result['path']
+                        output_size = (result['dimensions']['width'], result['dimensions']['height'])
+                    else:
+                        # 最適化しない場合はレンダリング結果をそのままPNGで保存
+                        image_path = os.path.join(output_dir, f"slide_{slide_number}.png")
+                        output_image = resize_image(image, max_width, max_height)
+                        output_image.save(image_path, "PNG")
+                        output_size = output_image.size
+                        logger.debug(f"Using non-optimized image: {image_path}")
+                    
+                    # 実際の画像サイズを取得（先頭ページ基準）
+                    if not actual_width:
+                        actual_width, actual_height = output_size
+                        logger.info(f"Actual image size: {actual_width}x{actual_height}")
+                    
+                    # 相対パスを生成
+                    relative_path = os.path.relpath(image_path, output_dir)
+                    encoded_by_hash[render_hash] = relative_path
+                    paths_by_slide[slide_number] = relative_path
+                    if on_image:
+                        on_image(slide_number - 1, relative_path)
+                except Exception as e:
+                    logger.error(f"Error encoding image {slide_number}: {str(e)}")
+                finally:
+                    image.close()
             
-            logger.info(f"Converted {len(images)} images from PDF")
+            logger.info(f"Converted {len(paths_by_slide)} images from PDF "
+                        f"({len(encoded_by_hash)} unique, {duplicate_count} duplicates)")
+            if stats is not None:
+                stats['unique_images'] = len(encoded_by_hash)
+                stats['duplicate_images'] = duplicate_count
             
-            if not images:
+            if not paths_by_slide:
                 logger.error("No images were converted from PDF")
                 return [], (0, 0)
-                
-            # 実際の画像サイズを取得
-            actual_width = images[0].width
-            actual_height = images[0].height
-            logger.info(f"Actual image size: {actual_width}x{actual_height}")
+            
+            image_paths = [paths_by_slide.get(slide_number)
+                           for slide_number in range(first_slide_number, last_slide_number + 1)]
             
         except Exception as e:
             logger.error(f"Error converting PDF to images: {str(e)}")
             return [], (0, 0)
-        
-        # 一時的な画像パスを生成（最適化前）
-        temp_image_paths = []
-        for i, image in enumerate(images):
-            temp_image_path = os.path.join(output_dir, f"temp_slide_{i+1}.png")
+        finally:
+            # 出力ディレクトリのPDFを削除（キャッシュには別のリンクが残る）
             try:
-                # 保存前にディレクトリが存在することを確認
-                os.makedirs(os.path.dirname(temp_image_path), exist_ok=True)
-                
-                # 一時的に高品質PNGで保存
-                image.save(temp_image_path, "PNG", optimize=True)
-                
-                if os.path.exists(temp_image_path):
-                    logger.debug(f"Saved temporary image: {temp_image_path}")
-                    temp_image_paths.append(temp_image_path)
-                else:
-                    logger.warning(f"Warning: Temporary image file not found: {temp_image_path}")
+                os.remove(pdf_path)
+                logger.debug(f"Removed temporary PDF file: {pdf_path}")
             except Exception as e:
-                logger.error(f"Error saving temporary image {i+1}: {str(e)}")
-        
-        # 画像の最適化処理
-        image_paths = []
-        if optimize and temp_image_paths:
-            logger.info(f"Optimizing {len(temp_image_paths)} images to format: {format}, quality: {quality}")
-            
-            # 最適化結果を格納するディレクトリ
-            optimized_dir = os.path.join(output_dir, "optimized")
-            os.makedirs(optimized_dir, exist_ok=True)
-            
-            # 画像を最適化
-            optimization_results = batch_optimize(
-                input_paths=temp_image_paths,
-                output_dir=optimized_dir,
-                format=format,
-                quality=quality,
-                max_width=max_width,
-                max_height=max_height
-            )
-            
-            # 最適化された画像パスを収集
-            for i, result in enumerate(optimization_results):
-                if 'error' not in result:
-                    # 相対パスを生成
-                    rel_path = os.path.relpath(result['path'], output_dir)
-                    image_paths.append(rel_path)
-                    logger.info(f"Optimized image {i+1}: {result['path']}")
-                    logger.info(f"  Size reduction: {result['original']['size']} -> {result['optimized']['size']} bytes")
-                    logger.info(f"  Compression ratio: {result['optimized']['compression_ratio']:.2f}%")
-                else:
-                    logger.error(f"Error optimizing image {i+1}: {result.get('error', 'Unknown error')}")
-            
-            # 一時ファイルを削除
-            for temp_path in temp_image_paths:
-                try:
-                    os.remove(temp_path)
-                    logger.debug(f"Removed temporary file: {temp_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to remove temporary file {temp_path}: {str(e)}")
-        else:
-            # 最適化しない場合は一時ファイルをそのまま使用
-            for i, temp_path in enumerate(temp_image_paths):
-                # 相対パスを生成
-                rel_path = os.path.relpath(temp_path, output_dir)
-                image_paths.append(rel_path)
-                logger.info(f"Using non-optimized image: {temp_path}")
-        
-        # PDFファイルを削除
-        try:
-            os.remove(pdf_path)
-            logger.debug(f"Removed temporary PDF file: {pdf_path}")
-        except Exception as e:
-            logger.warning(f"Failed to remove temporary PDF file: {str(e)}")
+                logger.warning(f"Failed to remove temporary PDF file: {str(e)}")
         
         logger.info(f"Returning {len(image_paths)} image paths")
         return image_paths, (actual_width, actual_height)
@@ -218,6 +280,30 @@ def convert_to_png(pptx_path: str, output_dir: str, optimize: bool = True,
         logger.error(f"Exception in convert_to_png: {str(e)}")
         return [], (0, 0)
 
+def resolve_extraction_fields(profile: str = DEFAULT_EXTRACTION_PROFILE,
+                              fields: Optional[List[str]] = None) -> frozenset:
+    """
+    抽出する項目を決定する
+    
+    Args:
+        profile (str): 抽出プロファイル ('translate', 'preview', 'full')
+        fields (List[str]): 抽出する項目の明示的な指定（指定した場合はプロファイルより優先）
+        
+    Returns:
+        frozenset: 抽出する項目
+        
+    Raises:
+        ValueError: 未知のプロファイルまたは項目が指定された場合
+    """
+    if fields is not None:
+        unknown = set(fields) - set(EXTRACTION_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown extraction fields: {', '.join(sorted(unknown))}")
+        return frozenset(fields)
+    if profile not in EXTRACTION_PROFILES:
+        raise ValueError(f"Unknown extraction profile: {profile}")
+    return EXTRACTION_PROFILES[profile]
+
 def convert_coordinates(x: float, y: float, width: float, height: float, 
                       slide_width: float, slide_height: float,
                       image_width: float, image_height: float) -> dict:
@@ -235,72 +321,26 @@ def convert_coordinates(x: float, y: float, width: float, height: float,
     Returns:
         dict: 変換後の座標とサイズ
     """
-    # デバッグ出力
-    print(f"Converting coordinates: ({x}, {y}, {width}, {height}) in slide size {slide_width}x{slide_height} to image size {image_width}x{image_height}", file=sys.stderr)
-    
-    # スライドと画像のアスペクト比を計算
-    slide_aspect = slide_width / slide_height
-    image_aspect = image_width / image_height
-    
-    # 基本のスケーリング係数を計算
-    scale_x = image_width / slide_width
-    scale_y = image_height / slide_height
-    
-    # アスペクト比の違いを考慮したスケーリング
-    if abs(slide_aspect - image_aspect) > 0.01:  # アスペクト比が異なる場合
-        print(f"Aspect ratio adjustment needed: slide={slide_aspect}, image={image_aspect}", file=sys.stderr)
-        
-        # 画像がスライドより横長の場合
-        if image_aspect > slide_aspect:
-            # 高さに合わせてスケーリング
-            new_width = image_height * slide_aspect
-            # 中央揃えのためのオフセット計算
-            offset_x = (image_width - new_width) / 2
-            # スケール係数を調整
-            scale_x = new_width / slide_width
-            # 座標を変換
-            scaled_x = x * scale_x + offset_x
-            scaled_y = y * scale_y
-        else:
-            # 幅に合わせてスケーリング
-            new_height = image_width / slide_aspect
-            # 中央揃えのためのオフセット計算
-            offset_y = (image_height - new_height) / 2
-            # スケール係数を調整
-            scale_y = new_height / slide_height
-            # 座標を変換
-            scaled_x = x * scale_x
-            scaled_y = y * scale_y + offset_y
-    else:
-        # アスペクト比が同じ場合は単純にスケーリング
-        scaled_x = x * scale_x
-        scaled_y = y * scale_y
-    
-    # サイズをスケーリング
-    scaled_width = width * scale_x
-    scaled_height = height * scale_y
-    
-    # デバッグ出力
-    print(f"Scaled coordinates: ({scaled_x}, {scaled_y}, {scaled_width}, {scaled_height})", file=sys.stderr)
-    
-    # 結果を返す
-    result = {
-        "x": round(scaled_x),
-        "y": round(scaled_y),
-        "width": round(scaled_width),
-        "height": round(scaled_height)
+    # 複数の矩形を変換する場合は transform_boxes / add_pixel_positions で変換をまとめて適用する
+    affine = slide_to_image_affine(slide_width, slide_height, image_width, image_height)
+    scaled_x, scaled_y, scaled_width, scaled_height = transform_boxes([(x, y, width, height)], affine)[0]
+    return {
+        "x": scaled_x,
+        "y": scaled_y,
+        "width": scaled_width,
+        "height": scaled_height
     }
-    
-    print(f"Final coordinates: {result}", file=sys.stderr)
-    return result
 
-def extract_text_from_shape(shape, parent_z_order=0, parent_position=None):
+def extract_text_from_shape(shape, parent_z_order=0, parent_transform=None, style_context=None,
+                            fields=EXTRACTION_PROFILES['full']):
     """シェイプからテキストを抽出し、フォーマット情報も保持する
     
     Args:
         shape: シェイプオブジェクト
         parent_z_order: 親要素のZ順序（グループ内の要素用）
-        parent_position: 親要素の位置情報（グループ内の要素用）
+        parent_transform: グループの子座標からスライド座標への変換（グループ内の要素用）
+        style_context: 継承した書式を解決するSlideStyleContext（Noneの場合は直接指定された書式のみ）
+        fields: 抽出する項目（EXTRACTION_FIELDS）
         
     Returns:
         dict: テキスト情報を含む辞書、またはNone
@@ -309,18 +349,18 @@ def extract_text_from_shape(shape, parent_z_order=0, parent_position=None):
     if isinstance(shape, GroupShape):
         group_elements = []
         try:
-            # グループ自体の位置情報を取得
-            group_position = {
-                'x': shape.left,
-                'y': shape.top,
-                'z_order': parent_z_order
-            }
+            # グループ自体の位置情報を取得（入れ子の場合は親グループの子座標なので変換する）
+            group_position = to_slide_position(shape.left, shape.top, shape.width, shape.height, parent_transform)
+            group_position['z_order'] = parent_z_order
+            
+            # 子要素の座標はグループの子座標（chOff/chExt基準）なので、スライド座標への変換を求める
+            child_transform = group_child_affine(shape._element, parent_transform or IDENTITY)
             
             # グループ内の各シェイプを処理
             for i, child in enumerate(shape.shapes):
                 # 子要素のZ順序は親のZ順序 + インデックスで計算
                 child_z_order = parent_z_order + i / 1000.0
-                child_element = extract_text_from_shape(child, child_z_order, group_position)
+                child_element = extract_text_from_shape(child, child_z_order, child_transform, style_context, fields)
                 if child_element:
                     group_elements.append(child_element)
                     
@@ -335,18 +375,19 @@ def extract_text_from_shape(shape, parent_z_order=0, parent_position=None):
             logger.warning(f"Error extracting text from group shape: {str(e)}")
             return None
     
-    # テーブルの場合は特別な処理
-    if hasattr(shape, "table"):
+    # 継承した書式は要求された場合のみ解決する
+    if 'resolved_styles' not in fields:
+        style_context = None
+    
+    # テーブルの場合は特別な処理（表以外のグラフィックフレームはtable属性で例外になる）
+    if getattr(shape, "has_table", False):
         try:
             table_data = {
                 "type": "table",
                 "rows": [],
-                "position": {
-                    'x': shape.left,
-                    'y': shape.top,
-                    'z_order': parent_z_order
-                }
+                "position": to_slide_position(shape.left, shape.top, shape.width, shape.height, parent_transform)
             }
+            table_data["position"]["z_order"] = parent_z_order
             
             # 各セルのテキストを抽出
             for i, row in enumerate(shape.table.rows):
@@ -361,24 +402,31 @@ def extract_text_from_shape(shape, parent_z_order=0, parent_position=None):
                                 continue
                                 
                             # 各ランのフォント情報を収集
+                            resolved_style = style_context.resolve_paragraph(None, p._p, p.level) if style_context else None
                             runs_info = []
-                            for run in p.runs:
+                            for r_idx, run in enumerate(p.runs):
                                 if not run.text.strip():
                                     continue
                                     
-                                font_info = extract_font_info(run)
-                                runs_info.append({
+                                run_info = {
                                     "text": run.text.strip(),
-                                    "font": font_info,
-                                    "index": run._rId
-                                })
+                                    "index": r_idx
+                                }
+                                if 'fonts' in fields:
+                                    run_info["font"] = extract_font_info(run)
+                                if resolved_style:
+                                    run_info["resolved_font"] = style_context.resolve_run(resolved_style, run._r)
+                                runs_info.append(run_info)
                                 
                             if runs_info:
-                                cell_paragraphs.append({
+                                paragraph_info = {
                                     "text": p.text.strip(),
-                                    "style": extract_text_style(p),
+                                    "style": extract_text_style(p, fields),
                                     "runs": runs_info
-                                })
+                                }
+                                if resolved_style:
+                                    paragraph_info["resolved_style"] = paragraph_style_summary(resolved_style)
+                                cell_paragraphs.append(paragraph_info)
                                 
                         row_data.append({
                             "text": cell_text,
@@ -413,24 +461,14 @@ def extract_text_from_shape(shape, parent_z_order=0, parent_position=None):
     width = getattr(shape, "width", 0)
     height = getattr(shape, "height", 0)
     
-    # 親要素の位置がある場合は相対位置を計算
-    if parent_position:
-        left += parent_position['x']
-        top += parent_position['y']
-    
-    # テキスト情報を抽出
+    # テキスト情報を抽出（グループ内の場合はスライド座標に変換する）
     text_info = {
         "text": text,
         "type": "text",
         "shape_id": shape_id,
-        "position": {
-            "x": left,
-            "y": top,
-            "width": width,
-            "height": height,
-            "z_order": parent_z_order
-        }
+        "position": to_slide_position(left, top, width, height, parent_transform)
     }
+    text_info["position"]["z_order"] = parent_z_order
     
     # 可能であればフォント情報も抽出
     try:
@@ -439,9 +477,8 @@ def extract_text_from_shape(shape, parent_z_order=0, parent_position=None):
             if hasattr(shape.text_frame, "auto_size"):
                 text_info["auto_size"] = str(shape.text_frame.auto_size)
                 
-            # 縦書きかどうかを判定
-            if hasattr(shape.text_frame, "vertical"):
-                text_info["vertical"] = shape.text_frame.vertical
+            # 縦書きかどうかを判定（読み順の決定に使う）
+            text_info["vertical"] = is_vertical_text(shape.text_frame._bodyPr)
             
             # パラグラフごとの処理
             paragraphs_info = []
@@ -450,32 +487,41 @@ def extract_text_from_shape(shape, parent_z_order=0, parent_position=None):
                     continue
                 
                 # パラグラフのスタイル情報を取得
-                paragraph_style = extract_text_style(p)
+                paragraph_style = extract_text_style(p, fields)
                 
                 # 箇条書きスタイルを取得
-                bullet_style = extract_bullet_style(p)
+                bullet_style = extract_bullet_style(p) if 'bullets' in fields else None
                 if bullet_style:
                     paragraph_style.update(bullet_style)
                 
+                # レイアウト・マスター・テーマから継承した書式
+                resolved_style = style_context.resolve_paragraph(shape._element, p._p, p.level) if style_context else None
+                
                 # 各テキストランの処理
                 runs_info = []
                 for r_idx, run in enumerate(p.runs):
                     if not run.text.strip():
                         continue
                         
-                    font_info = extract_font_info(run)
-                    runs_info.append({
+                    run_info = {
                         "text": run.text.strip(),
-                        "font": font_info,
                         "index": r_idx
-                    })
+                    }
+                    if 'fonts' in fields:
+                        run_info["font"] = extract_font_info(run)
+                    if resolved_style:
+                        run_info["resolved_font"] = style_context.resolve_run(resolved_style, run._r)
+                    runs_info.append(run_info)
                 
-                paragraphs_info.append({
+                paragraph_info = {
                     "text": p.text.strip(),
                     "style": paragraph_style,
                     "runs": runs_info,
                     "index": p_idx
-                })
+                }
+                if resolved_style:
+                    paragraph_info["resolved_style"] = paragraph_style_summary(resolved_style)
+                paragraphs_info.append(paragraph_info)
             
             if paragraphs_info:
                 text_info["paragraphs"] = paragraphs_info
@@ -587,61 +633,64 @@ def extract_font_info(run):
         
     return font_info
 
-def extract_text_style(paragraph):
+def extract_text_style(paragraph, fields=EXTRACTION_PROFILES['full']):
     """
     段落のスタイル情報を抽出する
     
     Args:
         paragraph: 段落オブジェクト
+        fields: 抽出する項目（paragraph_stylesで配置・行間など、fontsで最初のランのフォント）
     
     Returns:
-        dict: スタイル情報
+        dict: スタイル情報（レベルは常に含む）
     """
     style_info = {}
     
     try:
-        # 段落の配置
-        if paragraph.alignment:
-            style_info["alignment"] = str(paragraph.alignment)
-            
-        # 行間
-        if paragraph.line_spacing:
-            style_info["line_spacing"] = paragraph.line_spacing
-            
-        # 段落前の空き
-        if paragraph.space_before:
-            style_info["space_before"] = paragraph.space_before
-            
-        # 段落後の空き
-        if paragraph.space_after:
-            style_info["space_after"] = paragraph.space_after
+        if 'paragraph_styles' in fields:
+            # 段落の配置
+            if paragraph.alignment:
+                style_info["alignment"] = str(paragraph.alignment)
+                
+            # 行間
+            if paragraph.line_spacing:
+                style_info["line_spacing"] = paragraph.line_spacing
+                
+            # 段落前の空き
+            if paragraph.space_before:
+                style_info["space_before"] = paragraph.space_before
+                
+            # 段落後の空き
+            if paragraph.space_after:
+                style_info["space_after"] = paragraph.space_after
             
         # インデント情報
         if hasattr(paragraph, "level"):
             style_info["level"] = paragraph.level
-            
-        # 左インデント
-        if hasattr(paragraph, "left_indent") and paragraph.left_indent is not None:
-            style_info["left_indent"] = paragraph.left_indent
-            
-        # 右インデント
-        if hasattr(paragraph, "right_indent") and paragraph.right_indent is not None:
-            style_info["right_indent"] = paragraph.right_indent
-            
-        # 最初の行のインデント
-        if hasattr(paragraph, "first_line_indent") and paragraph.first_line_indent is not None:
-            style_info["first_line_indent"] = paragraph.first_line_indent
-            
-        # 文字方向（右から左、左から右）
-        if hasattr(paragraph, "bidi") and paragraph.bidi is not None:
-            style_info["bidi"] = paragraph.bidi
-            
-        # 縦書きかどうか
-        if hasattr(paragraph, "vertical") and paragraph.vertical is not None:
-            style_info["vertical"] = paragraph.vertical
+        
+        if 'paragraph_styles' in fields:
+            # 左インデント
+            if hasattr(paragraph, "left_indent") and paragraph.left_indent is not None:
+                style_info["left_indent"] = paragraph.left_indent
+                
+            # 右インデント
+            if hasattr(paragraph, "right_indent") and paragraph.right_indent is not None:
+                style_info["right_indent"] = paragraph.right_indent
+                
+            # 最初の行のインデント
+            if hasattr(paragraph, "first_line_indent") and paragraph.first_line_indent is not None:
+                style_info["first_line_indent"] = paragraph.first_line_indent
+                
+            # 文字方向（右から左、左から右）
+            if hasattr(paragraph, "bidi") and paragraph.bidi is not None:
+                style_info["bidi"] = paragraph.bidi
+                
+            # 縦書きかどうか
+            if hasattr(paragraph, "vertical") and paragraph.vertical is not None:
+                style_info["vertical"] = paragraph.vertical
             
         # フォントの基本情報を取得（最初のランから）
-        if paragraph.runs and paragraph.runs[0].font:
+        if 'fonts' in fields and paragraph.runs and paragraph.runs[0].font:
             base_font = paragraph.runs[0].font
             if base_font.name:
                 style_info["font_name"] = base_font.name
@@ -721,12 +770,14 @@ def extract_bullet_style(paragraph):
         
     return bullet_info
 
-def extract_shape_info(shape) -> dict:
+def extract_shape_info(shape, style_context=None, fields=EXTRACTION_PROFILES['full']) -> dict:
     """
     シェイプの情報を抽出する
     
     Args:
         shape: シェイプオブジェクト
+        style_context: テーマカラーの解決に使うSlideStyleContext（省略可）
+        fields: 抽出する項目（shape_stylesで色と線、shape_geometryで半径と頂点）
     
     Returns:
         dict: シェイプ情報
@@ -739,29 +790,35 @@ def extract_shape_info(shape) -> dict:
         'y': shape.top,
         'width': shape.width,
         'height': shape.height,
-        'rotation': shape.rotation,
-        'fillColor': extract_fill_color(shape),
-        'strokeColor': extract_line_color(shape),
-        'strokeWidth': shape.line.width if shape.line else 1,
-        'opacity': 1  # python-pptxの最新バージョンではtransparency属性が存在しないため、固定値を使用
+        'rotation': shape.rotation
     }
     
-    # 円の場合は半径を追加
-    if shape_type == 'OVAL':
-        base_info['radius'] = min(shape.width, shape.height) / 2
-        
-    # 多角形の場合は頂点情報を追加
-    if hasattr(shape, 'points'):
-        base_info['points'] = [{'x': point[0], 'y': point[1]} for point in shape.points]
+    if 'shape_styles' in fields:
+        base_info.update({
+            'fillColor': extract_fill_color(shape, style_context),
+            'strokeColor': extract_line_color(shape, style_context),
+            'strokeWidth': shape.line.width if getattr(shape, 'line', None) else 1,  # グループや表には線がない
+            'opacity': 1  # python-pptxの最新バージョンではtransparency属性が存在しないため、固定値を使用
+        })
+    
+    if 'shape_geometry' in fields:
+        # 円の場合は半径を追加
+        if shape_type == 'OVAL':
+            base_info['radius'] = min(shape.width, shape.height) / 2
+            
+        # 多角形の場合は頂点情報を追加
+        if hasattr(shape, 'points'):
+            base_info['points'] = [{'x': point[0], 'y': point[1]} for point in shape.points]
         
     return base_info
 
-def safe_get_rgb(color) -> str:
+def safe_get_rgb(color, style_context=None) -> str:
     """
     色情報からRGB値を安全に取得する
     
     Args:
         color: 色オブジェクト
+        style_context: テーマカラーの解決に使うSlideStyleContext（省略時はテーマカラーを解決しない）
         
     Returns:
         str: 16進数のRGB値
@@ -770,40 +827,51 @@ def safe_get_rgb(color) -> str:
         return '#000000'
         
     try:
-        if hasattr(color, 'rgb') and color.rgb:
-            return f'#{color.rgb:06x}'
-        elif hasattr(color, 'theme_color') and color.theme_color:
-            # テーマカラーの場合
+        # テーマカラーのColorFormatでrgbを参照するとAttributeErrorになるため、色の種類で分岐する
+        if color.type == MSO_COLOR_TYPE.RGB:
+            return f'#{color.rgb}'
+        elif color.type == MSO_COLOR_TYPE.SCHEME:
+            # テーマカラーの場合はマスターの配色の対応とテーマから求める
+            if style_context:
+                resolved = style_context.theme_color(color.theme_color, color.brightness)
+                if resolved:
+                    return resolved
             return '#000000'  # デフォルト値
-    except (AttributeError, TypeError):
+    except (AttributeError, TypeError, ValueError):
         pass
         
     return '#000000'
 
-def extract_fill_color(shape) -> str:
+def extract_fill_color(shape, style_context=None) -> str:
     """
     シェイプの塗りつぶし色を抽出する
     
     Args:
         shape: シェイプオブジェクト
+        style_context: テーマカラーの解決に使うSlideStyleContext（省略可）
     
     Returns:
         str: 色情報（16進数）
     """
-    if not hasattr(shape, 'fill') or not shape.fill or shape.fill.type == 'NONE':
+    if not hasattr(shape, 'fill') or not shape.fill:
         return 'transparent'
         
-    if shape.fill.type == 'SOLID':
-        return safe_get_rgb(shape.fill.fore_color)
+    fill_type = shape.fill.type
+    if fill_type == MSO_FILL.SOLID:
+        return safe_get_rgb(shape.fill.fore_color, style_context)
+    if fill_type is None and style_context:
+        # spPrで指定がない場合はシェイプのスタイル（p:style/a:fillRef）の色で描画される
+        return style_context.style_color(shape._element, 'fillRef') or 'transparent'
         
     return 'transparent'
 
-def extract_line_color(shape) -> str:
+def extract_line_color(shape, style_context=None) -> str:
     """
     シェイプの線の色を抽出する
     
     Args:
         shape: シェイプオブジェクト
+        style_context: テーマカラーの解決に使うSlideStyleContext（省略可）
     
     Returns:
         str: 色情報（16進数）
@@ -812,22 +880,25 @@ def extract_line_color(shape) -> str:
         if not hasattr(shape, 'line') or not shape.line:
             return 'transparent'
             
-        if not hasattr(shape.line, 'fill') or not shape.line.fill or shape.line.fill.type == 'NONE':
-            return 'transparent'
-            
-        if hasattr(shape.line, 'color') and shape.line.color:
-            return safe_get_rgb(shape.line.color)
+        # line.colorは塗りつぶしが単色でない場合にsolidFillを追加してしまうため、先に種類を確認する
+        fill_type = shape.line.fill.type
+        if fill_type == MSO_FILL.SOLID:
+            return safe_get_rgb(shape.line.fill.fore_color, style_context)
+        if fill_type is None and style_context:
+            # a:lnで指定がない場合はシェイプのスタイル（p:style/a:lnRef）の色で描画される
+            return style_context.style_color(shape._element, 'lnRef') or 'transparent'
     except (AttributeError, TypeError):
         pass
         
     return 'transparent'
 
-def extract_background(slide) -> dict:
+def extract_background(slide, style_context=None) -> dict:
     """
     スライドの背景情報を抽出する
     
     Args:
         slide: スライドオブジェクト
+        style_context: テーマカラーの解決に使うSlideStyleContext（省略可）
     
     Returns:
         dict: 背景情報
@@ -843,6 +914,19 @@ def extract_background(slide) -> dict:
             'transparency': 0
         }
         
+    bg = slide._element.cSld.bg
+    if bg is None or bg.bgPr is None:
+        # スライドに背景の指定がない（またはテーマの背景スタイルを参照する）場合はレイアウト・マスターから継承する
+        # （background.fillはp:bgPrを追加してスライドの背景を「塗りつぶしなし」に書き換えてしまうため参照しない）
+        color = style_context.background_color() if style_context else None
+        return {
+            'color': color or '#FFFFFF',
+            'image': None,
+            'pattern': None,
+            'gradient': None,
+            'transparency': 0
+        }
+        
     fill = background.fill
     
     # python-pptxの最新バージョンではtransparency属性が存在しないため、固定値を使用
@@ -858,9 +942,9 @@ def extract_background(slide) -> dict:
     
     if fill:
         try:
-            if fill.type == 'SOLID':
-                result['color'] = safe_get_rgb(fill.fore_color) if hasattr(fill, 'fore_color') else '#FFFFFF'
-            elif fill.type == 'PICTURE' and hasattr(fill, 'image'):
+            if fill.type == MSO_FILL.SOLID:
+                result['color'] = safe_get_rgb(fill.fore_color, style_context) if hasattr(fill, 'fore_color') else '#FFFFFF'
+            elif fill.type == MSO_FILL.PICTURE and hasattr(fill, 'image'):
                 try:
                     result['image'] = {
                         'rId': fill.image.rId if hasattr(fill.image, 'rId') else '',
@@ -868,47 +952,359 @@ def extract_background(slide) -> dict:
                     }
                 except (AttributeError, TypeError):
                     result['image'] = {'rId': '', 'filename': ''}
-            elif fill.type == 'PATTERN' and hasattr(fill, 'pattern'):
+            elif fill.type == MSO_FILL.PATTERNED and hasattr(fill, 'pattern'):
                 result['pattern'] = {
                     'type': str(fill.pattern),
-                    'foreColor': safe_get_rgb(fill.fore_color) if hasattr(fill, 'fore_color') else '#000000',
-                    'backColor': safe_get_rgb(fill.back_color) if hasattr(fill, 'back_color') else '#FFFFFF'
+                    'foreColor': safe_get_rgb(fill.fore_color, style_context) if hasattr(fill, 'fore_color') else '#000000',
+                    'backColor': safe_get_rgb(fill.back_color, style_context) if hasattr(fill, 'back_color') else '#FFFFFF'
                 }
         except (AttributeError, TypeError) as e:
             print(f"Error processing fill: {str(e)}", file=sys.stderr)
             
         # グラデーションの処理
         try:
-            if fill.type == 'GRADIENT' and hasattr(fill, 'gradient_stops'):
+            if fill.type == MSO_FILL.GRADIENT and hasattr(fill, 'gradient_stops'):
                 stops = []
                 for stop in fill.gradient_stops:
                     try:
                         stops.append({
                             'position': stop.position if hasattr(stop, 'position') else 0,
-                            'color': safe_get_rgb(stop.color) if hasattr(stop, 'color') else '#000000'
+                            'color': safe_get_rgb(stop.color, style_context) if hasattr(stop, 'color') else '#000000'
                         })
                     except (AttributeError, TypeError) as e:
                         print(f"Error processing gradient stop: {str(e)}", file=sys.stderr)
                 
+                try:
+                    angle = fill.gradient_angle
+                except (AttributeError, TypeError, ValueError):
+                    # 線形でない（またはa:linに角度のない）グラデーションは角度を0とする
+                    angle = 0
+                    
                 result['gradient'] = {
                     'type': 'linear' if fill.gradient_stops else 'radial',
                     'stops': stops,
-                    'angle': fill.gradient_angle if hasattr(fill, 'gradient_angle') else 0
+                    'angle': angle
                 }
         except (AttributeError, TypeError) as e:
             print(f"Error processing gradient: {str(e)}", file=sys.stderr)
             
     return result
 
+def is_hidden_slide(slide) -> bool:
+    """
+    スライドが非表示（スライドXMLの show="0"）かどうかを判定する
+    
+    Args:
+        slide: スライドオブジェクト
+        
+    Returns:
+        bool: 非表示の場合True
+    """
+    return slide._element.get('show') in ('0', 'false')
+
+def find_hidden_slides(presentation) -> List[int]:
+    """
+    非表示スライドのインデックスを取得する
+    
+    Args:
+        presentation: プレゼンテーションオブジェクト
+        
+    Returns:
+        List[int]: 非表示スライドのインデックス（0始まり）
+    """
+    return [index for index, slide in enumerate(presentation.slides) if is_hidden_slide(slide)]
+
+def hidden_slide_placeholder(index: int, slide_width: int, slide_height: int) -> Dict[str, Any]:
+    """
+    placeholderポリシーで使う非表示スライドの空データを作成する
+    
+    Args:
+        index (int): スライドのインデックス（0始まり）
+        slide_width (int): スライドの幅（EMU）
+        slide_height (int): スライドの高さ（EMU）
+        
+    Returns:
+        Dict[str, Any]: テキストも図形も含まないスライドデータ
+    """
+    return {
+        'index': index,
+        'hidden': True,
+        'elements': [],
+        'text_elements': [],
+        'background': None,
+        'size': {
+            'width': slide_width,
+            'height': slide_height
+        }
+    }
+
+def extract_slide(slide, index: int, slide_width: int, slide_height: int,
+                  sort_elements: bool = True, improve_text_order: bool = True,
+                  text_only: bool = False,
+                  engine: str = DEFAULT_EXTRACTION_ENGINE,
+                  style_context=None,
+                  fields: frozenset = EXTRACTION_PROFILES['full']) -> Dict[str, Any]:
+    """
+    1枚のスライドから要素とテキスト情報を抽出する
+    
+    Args:
+        slide: スライドオブジェクト
+        index (int): スライドのインデックス（0始まり）
+        slide_width (int): スライドの幅（EMU）
+        slide_height (int): スライドの高さ（EMU）
+        sort_elements (bool): 要素をZ順序とレイアウト位置でソートするか
+        improve_text_order (bool): テキスト順序を改善するか
+        text_only (bool): テキスト要素のみを抽出するか（背景と図形情報を省略）
+        engine (str): テキスト抽出エンジン ('python-pptx', 'lxml')
+        style_context: 継承した書式を解決するSlideStyleContext（Noneの場合は直接指定された書式のみ）
+        fields (frozenset): 抽出する項目（resolve_extraction_fieldsの戻り値）
+        
+    Returns:
+        Dict[str, Any]: スライドデータ（画像パスは含まない）
+    """
+    slide_data = {
+        'index': index,
+        'elements': [],
+        'text_elements': [],  # テキスト要素のみを格納する配列を追加
+        'background': extract_background(slide, style_context) if 'background' in fields and not text_only else None,
+        'size': {
+            'width': slide_width,
+            'height': slide_height
+        }
+    }
+    
+    # lxmlエンジンではスライドXMLを一度だけ走査して全シェイプのテキストを取得する
+    lxml_text_data = None
+    shapes = slide.shapes
+    if engine == 'lxml':
+        from lib.python.pptx_xml_extractor import extract_text_elements
+        lxml_text_data = extract_text_elements(slide, style_context, fields)
+        if text_only or 'shapes' not in fields:
+            # テキストのみの場合はシェイプのプロキシオブジェクトを作らない
+            shapes = [None] * len(lxml_text_data)
+    
+    # スライド内の全要素を処理
+    all_elements = []
+    for shape_idx, shape in enumerate(shapes):
+        # Z順序を設定（スライド内の順序を使用）
+        z_order = shape_idx
+        
+        # テキスト要素の抽出
+        text_data = None
+        if lxml_text_data is not None:
+            text_data = lxml_text_data[shape_idx]
+        elif hasattr(shape, "text") or isinstance(shape, GroupShape) or getattr(shape, "has_table", False):
+            text_data = extract_text_from_shape(shape, z_order, style_context=style_context, fields=fields)
+        if text_data:
+            all_elements.append(text_data)
+            # テキスト要素のみの配列にも追加
+            if text_data.get("type") == "text" or text_data.get("type") == "table" or text_data.get("type") == "group":
+                slide_data['text_elements'].append(text_data)
+        
+        # 非テキスト要素の情報も抽出
+        if text_only or 'shapes' not in fields:
+            continue
+        shape_info = extract_shape_info(shape, style_context, fields)
+        if shape_info:
+            all_elements.append(shape_info)
+    
+    # 要素をZ順序とレイアウト位置でソート
+    if sort_elements and all_elements:
+        # まずZ順序でソート
+        all_elements.sort(key=lambda x: x.get("position", {}).get("z_order", 0) if x.get("position") else 999999)
+        
+        # 読み順を改善する場合は、さらにレイアウト位置も考慮
+        if improve_text_order:
+            # テキスト要素（テーブル・グループを含む）をXY-cut法で行・段に分割して読み順に並べる
+            text_elements = [elem for elem in all_elements if elem.get("type") in ["text", "table", "group"]]
+            sorted_text_elements = order_text_elements(text_elements, slide_width, slide_height)
+            
+            # テキスト要素のみの配列を更新
+            slide_data['text_elements'] = sorted_text_elements
+            
+            # 全要素の配列でテキスト要素を更新
+            text_element_ids = {id(elem) for elem in sorted_text_elements}
+            non_text_elements = [elem for elem in all_elements if id(elem) not in text_element_ids]
+            all_elements = sorted_text_elements + non_text_elements
+    
+    # 処理済みの要素をスライドデータに追加
+    slide_data['elements'] = all_elements
+    
+    # 特殊文字や多言語テキストをUnicode正規化する（ランごとに1回だけ正規化し、元のテキストも残す）
+    for elem in slide_data['text_elements']:
+        if elem.get("type") == "text" and "text" in elem:
+            normalize_text_element(elem)
+    
+    return slide_data
+
+def restore_cached_slide(entry: Dict[str, Any], index: int, output_dir: Optional[str]) -> Dict[str, Any]:
+    """
+    スライド単位のキャッシュからスライドデータを復元し、画像を出力ディレクトリに配置する
+    
+    Args:
+        entry (Dict[str, Any]): ParseCache.lookup_slide の戻り値
+        index (int): 現在のデッキでのスライドのインデックス（0始まり）
+        output_dir (str): 出力ディレクトリ
+        
+    Returns:
+        Dict[str, Any]: スライドデータ（image_pathは現在のスライド番号のファイルを指す）
+    
+    Raises:
+        OSError: キャッシュの画像が（別プロセスのevictで）削除されていてコピーできない場合
+    """
+    slide_data = entry['slide']
+    slide_data['index'] = index
+    
+    image_path = None
+    if entry['image_path'] and output_dir:
+        # スライドの位置が変わっていても、現在のスライド番号のファイル名で配置する
+        cached_relative_path = slide_data.get('image_path') or ''
+        extension = os.path.splitext(entry['image_path'])[1]
+        image_path = os.path.join(os.path.dirname(cached_relative_path), f"slide_{index + 1}{extension}")
+        destination = os.path.join(output_dir, image_path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(entry['image_path'], destination)
+    slide_data['image_path'] = image_path
+    return slide_data
+
+def restore_cached_deck(parse_cache, deck_key: str, output_dir: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    デッキ単位のキャッシュから解析結果を復元し、画像を出力ディレクトリに配置する
+    
+    Args:
+        parse_cache (ParseCache): 解析結果キャッシュ
+        deck_key (str): デッキ単位のキャッシュキー
+        output_dir (str): 出力ディレクトリ
+        
+    Returns:
+        Optional[Dict[str, Any]]: 解析結果（キャッシュにないか画像が欠けている場合はNone）
+    """
+    entry = parse_cache.lookup_deck(deck_key)
+    if not entry:
+        return None
+    
+    result = entry['result']
+    try:
+        for slide_data in result['slides']:
+            if not slide_data.get('image_path'):
+                continue
+            slide_key = entry['slide_keys'].get(str(slide_data['index']))
+            slide_entry = parse_cache.lookup_slide(slide_key) if slide_key else None
+            if not slide_entry or not slide_entry['image_path'] or not output_dir:
+                return None
+            destination = os.path.join(output_dir, slide_data['image_path'])
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(slide_entry['image_path'], destination)
+    except OSError as e:
+        logger.warning(f"Failed to restore cached images: {str(e)}")
+        return None
+    
+    result['metadata']['cache'] = {
+        'deck_hit': True,
+        'cached_slides': len(result['slides'])
+    }
+    return result
+
+# ワーカープロセスごとに一度だけ開いたプレゼンテーション
+_extract_worker_state: Dict[str, Any] = {}
+
+def _init_extract_worker(file_path: str, resolve_styles: bool) -> None:
+    """
+    抽出ワーカープロセスの初期化（PPTXを一度だけ開き、書式の解決結果をワーカー内で共有する）
+    
+    Args:
+        file_path (str): PPTXファイルのパス
+        resolve_styles (bool): 継承した書式を解決するか
+    """
+    presentation = open_presentation(file_path)
+    _extract_worker_state['presentation'] = presentation
+    # ワーカーの終了時に読み込み元のメモリマップとファイルを閉じる
+    Finalize(None, close_presentation, args=(presentation,), exitpriority=10)
+    _extract_worker_state['style_resolver'] = StyleResolver(presentation) if resolve_styles else None
+    # ワーカーの進捗ログは親プロセスの出力と混ざるため抑制する
+    logger.setLevel(logging.WARNING)
+
+def _extract_slide_chunk(indices: List[int], extract_kwargs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    ワーカープロセスで複数のスライドを抽出する
+    
+    Args:
+        indices (List[int]): 抽出するスライドのインデックス（0始まり）
+        extract_kwargs (Dict[str, Any]): extract_slideに渡すオプション
+        
+    Returns:
+        List[Dict[str, Any]]: indicesと同じ順序のスライドデータ
+    """
+    presentation = _extract_worker_state['presentation']
+    style_resolver = _extract_worker_state['style_resolver']
+    slides = presentation.slides
+    chunk = []
+    for i in indices:
+        slide = slides[i]
+        chunk.append(extract_slide(
+            slide, i,
+            presentation.slide_width, presentation.slide_height,
+            style_context=style_resolver.slide_context(slide) if style_resolver else None,
+            **extract_kwargs
+        ))
+    return chunk
+
+def iter_parallel_extraction(file_path: str, indices: List[int], workers: int,
+                             resolve_styles: bool, extract_kwargs: Dict[str, Any]):
+    """
+    スライドの抽出をプロセスプールに分散し、結果をインデックス順に返す
+    
+    各ワーカーはPPTXを一度だけ開き、EXTRACT_CHUNK_SIZE枚ずつ抽出する。
+    先行するチャンクが完了した時点で順に返すため、呼び出し側は直列処理と同じ順序で結果を受け取れる。
+    
+    Args:
+        file_path (str): PPTXファイルのパス
+        indices (List[int]): 抽出するスライドのインデックス（昇順）
+        workers (int): ワーカープロセス数
+        resolve_styles (bool): 継承した書式を解決するか
+        extract_kwargs (Dict[str, Any]): extract_slideに渡すオプション（スライドと書式の文脈以外）
+        
+    Yields:
+        Dict[str, Any]: スライドデータ（indicesの順）
+    """
+    chunk_size = max(1, min(EXTRACT_CHUNK_SIZE, -(-len(indices) // workers)))
+    chunks = [indices[start:start + chunk_size] for start in range(0, len(indices), chunk_size)]
+    logger.info(f"Extracting {len(indices)} slides with {workers} worker processes ({len(chunks)} chunks)")
+    # 画像化のスレッド（LibreOffice・pdftoppmの待ち合わせやロギングのロック）が動いている状態でforkすると
+    # 子プロセスがロックを持ったまま固まることがあるため、スレッドを持たないプロセスから起動する
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_extract_worker,
+                             initargs=(file_path, resolve_styles),
+                             mp_context=multiprocessing.get_context(EXTRACT_START_METHOD)) as pool:
+        for chunk in pool.map(_extract_slide_chunk, chunks, [extract_kwargs] * len(chunks)):
+            yield from chunk
+
 def parse_pptx(file_path: str, output_dir: str, optimize_images: bool = True, 
              image_format: str = 'WEBP', image_quality: int = 85,
              max_width: int = 1920, max_height: int = 1080,
              sort_elements: bool = True, extract_tables: bool = True,
              extract_groups: bool = True, extract_smartart: bool = True,
-             improve_text_order: bool = True) -> Dict[str, Any]:
+             improve_text_order: bool = True,
+             raster_workers: Optional[int] = None,
+             supersample: Optional[float] = None,
+             slide_range: Optional[Tuple[int, int]] = None,
+             text_only: bool = False,
+             on_slide: Optional[Callable[[Dict[str, Any]], None]] = None,
+             hidden_slides: str = DEFAULT_HIDDEN_SLIDE_POLICY,
+             engine: str = DEFAULT_EXTRACTION_ENGINE,
+             use_cache: bool = True,
+             on_metadata: Optional[Callable[[Dict[str, Any]], None]] = None,
+             on_image: Optional[Callable[[int, str], None]] = None,
+             resolve_styles: bool = True,
+             profile: str = DEFAULT_EXTRACTION_PROFILE,
+             fields: Optional[List[str]] = None,
+             extract_workers: Optional[int] = None,
+             media_inventory: bool = False,
+             extract_media: bool = False) -> Dict[str, Any]:
     """
     PPTXファイルを解析し、スライド情報を抽出する
     
+    スライド画像の生成は別スレッドで行い、その間にテキストを抽出する。
+    
     Args:
         file_path (str): PPTXファイルのパス
         output_dir (str): 出力ディレクトリ
@@ -922,163 +1318,321 @@ def parse_pptx(file_path: str, output_dir: str, optimize_images: bool = True,
         extract_groups (bool): グループ内のテキストを抽出するか
         extract_smartart (bool): SmartArt内のテキストを抽出するか
         improve_text_order (bool): テキスト順序を改善するか
+        raster_workers (int): PDFのラスタライズに使う並列ワーカー数（Noneの場合は既定値）
+        supersample (float): 出力サイズに対するレンダリング倍率（Noneの場合は既定値）
+        slide_range (Tuple[int, int]): 処理するスライドの範囲（0始まり、両端を含む）。Noneの場合は全スライド
+        text_only (bool): テキストのみを抽出するか（LibreOfficeと画像処理を一切使わない）
+        on_slide (Callable): スライドのテキストを抽出するたびに呼ばれるコールバック
+            （画像生成の完了前に呼ばれるため、image_pathはまだ含まれない）
+        hidden_slides (str): 非表示スライドの扱い ('skip', 'placeholder', 'full')
+            skipとplaceholderでは画像化もテキスト抽出も行わない
+        engine (str): テキスト抽出エンジン ('python-pptx', 'lxml')
+        use_cache (bool): ディスク上の解析結果キャッシュ（デッキ単位・スライド単位）を使うか
+        on_metadata (Callable): メタデータの抽出後、最初のスライドより前に一度だけ呼ばれるコールバック
+        on_image (Callable): スライド画像を1枚出力するたびに (スライドのインデックス, 相対パス) で
+            呼ばれるコールバック（画像生成スレッドから呼ばれる）
+        resolve_styles (bool): レイアウト・マスター・テーマから継承した書式を解決するか
+            （ランに resolved_font、段落に resolved_style を追加し、テーマカラーをRGB値にする）
+        profile (str): 抽出プロファイル ('translate', 'preview', 'full')
+        fields (List[str]): 抽出する項目（EXTRACTION_FIELDS）。指定した場合はプロファイルより優先
+        extract_workers (int): テキスト抽出に使うワーカープロセス数（Noneの場合は既定値、1以下の場合は直列）
+            抽出するスライドがPARALLEL_EXTRACT_MIN_SLIDES枚未満の場合は直列で処理する。結果は直列処理と同一
+        media_inventory (bool): 埋め込みメディアの一覧（結果の media）と、スライドごとの参照（スライドの media）を追加するか
+        extract_media (bool): 重複を除いたメディアを output_dir/media に書き出すか（media_inventoryを含む）
         
     Returns:
         Dict[str, Any]: 解析結果
     """
+    presentation = None
     try:
         logger.info(f"Starting to parse PPTX file: {file_path}")
-        # プレゼンテーションを開く
-        presentation = Presentation(file_path)
-        
-        # スライド画像を生成（最適化オプション付き）
-        image_paths, image_size = convert_to_png(
-            file_path, 
-            output_dir,
-            optimize=optimize_images,
-            format=image_format,
-            quality=image_quality,
-            max_width=max_width,
-            max_height=max_height
-        )
-        
-        if not image_paths:
-            logger.error("Failed to convert slides to images")
-            return {'error': 'Failed to convert slides to images'}
+        if hidden_slides not in HIDDEN_SLIDE_POLICIES:
+            return {'error': f'Unknown hidden slide policy: {hidden_slides}'}
+        if engine not in EXTRACTION_ENGINES:
+            return {'error': f'Unknown extraction engine: {engine}'}
+        try:
+            extraction_fields = resolve_extraction_fields(profile, fields)
+        except ValueError as e:
+            return {'error': str(e)}
+        media_inventory = media_inventory or extract_media
         
-        # 結果を格納する辞書
-        result = {
-            'slides': [],
-            'metadata': {
-                'image_format': image_format if optimize_images else 'PNG',
-                'image_quality': image_quality,
-                'image_dimensions': {
-                    'width': image_size[0],
-                    'height': image_size[1]
-                },
-                'optimized': optimize_images,
-                'parser_version': '2.0',  # パーサーバージョンを追加
-                'extraction_options': {
-                    'tables': extract_tables,
-                    'groups': extract_groups,
-                    'smartart': extract_smartart,
-                    'improved_text_order': improve_text_order
-                }
-            }
+        # 結果に影響するオプション（キャッシュキーに使う）
+        slide_options = {
+            'optimize_images': optimize_images,
+            'image_format': image_format,
+            'image_quality': image_quality,
+            'max_width': max_width,
+            'max_height': max_height,
+            'supersample': supersample,
+            'sort_elements': sort_elements,
+            'extract_tables': extract_tables,
+            'extract_groups': extract_groups,
+            'extract_smartart': extract_smartart,
+            'improve_text_order': improve_text_order,
+            'text_only': text_only,
+            'engine': engine,
+            'resolve_styles': resolve_styles,
+            'fields': sorted(extraction_fields),
+            'media_inventory': media_inventory
         }
+        deck_options = dict(slide_options, slide_range=slide_range, hidden_slides=hidden_slides)
         
-        # メタデータを抽出
-        try:
-            result['metadata'].update(extract_metadata(presentation))
-        except Exception as e:
-            logger.warning(f"Error extracting metadata: {str(e)}")
+        # 同じデッキを同じオプションで解析済みであれば、PPTXを開かずに結果を返す
+        # （メディアを書き出す場合はPPTXから読み出す必要があるため、デッキ単位のキャッシュは使わない）
+        parse_cache = None
+        deck_key = None
+        if use_cache:
+            from lib.python.parse_cache import get_parse_cache
+            from lib.python.pdf_cache import hash_file
+            parse_cache = get_parse_cache()
+            if parse_cache.enabled:
+                deck_key = parse_cache.deck_key(hash_file(file_path), deck_options)
+                cached_result = None if extract_media else restore_cached_deck(parse_cache, deck_key, output_dir)
+                if cached_result:
+                    logger.info(f"Parse cache hit for {file_path}")
+                    if on_metadata:
+                        on_metadata(cached_result['metadata'])
+                    if on_slide:
+                        for slide_data in cached_result['slides']:
+                            on_slide(slide_data)
+                    return cached_result
+            else:
+                parse_cache = None
         
-        # 各スライドを処理
+        # プレゼンテーションを開く（メディアは読み込まず、XMLは参照した時点で解析する）
+        presentation = open_presentation(file_path)
+        
+        # 処理するスライドの範囲を決定
         total_slides = len(presentation.slides)
-        logger.info(f"Processing {total_slides} slides")
+        first_index, last_index = 0, total_slides - 1
+        if slide_range:
+            first_index = max(0, slide_range[0])
+            last_index = min(total_slides - 1, slide_range[1])
+            if first_index > last_index:
+                logger.error(f"Slide range {slide_range} is out of bounds (total: {total_slides})")
+                return {'error': f'Slide range {slide_range[0]}-{slide_range[1]} is out of bounds (total: {total_slides})'}
         
-        for i, (slide, image_path) in enumerate(zip(presentation.slides, image_paths)):
-            logger.info(f"Processing slide {i+1}/{total_slides}")
-            
-            slide_data = {
-                'index': i,
-                'image_path': image_path,
-                'elements': [],
-                'text_elements': [],  # テキスト要素のみを格納する配列を追加
-                'background': extract_background(slide),
-                'size': {
-                    'width': presentation.slide_width,
-                    'height': presentation.slide_height
+        # 非表示スライドは読み込み時に一度だけ判定する
+        hidden_indices = set(find_hidden_slides(presentation))
+        skipped_indices = set() if hidden_slides == 'full' else hidden_indices
+        if hidden_indices:
+            logger.info(f"Found {len(hidden_indices)} hidden slides (policy: {hidden_slides})")
+        
+        # 変更のないスライドはスライド単位のキャッシュから取り出す
+        # （抽出で要素が書き換わる前に、読み込んだ直後のXMLでハッシュを計算する）
+        slide_keys = {}
+        cached_slides = {}
+        cached_image_size = (0, 0)
+        if parse_cache:
+            from lib.python.parse_cache import SlideFingerprinter
+            fingerprinter = SlideFingerprinter(presentation)
+            for i in range(first_index, last_index + 1):
+                if i in skipped_indices:
+                    continue
+                slide_keys[i] = parse_cache.slide_key(fingerprinter.fingerprint(presentation.slides[i]), slide_options)
+                entry = parse_cache.lookup_slide(slide_keys[i])
+                if not entry or not (text_only or entry['image_path']):
+                    continue
+                try:
+                    # 画像は画像化を始める前に出力ディレクトリへコピーしておく（別プロセスのevictで
+                    # エントリが削除されていた場合はキャッシュミスとして、抽出・画像化し直す）
+                    cached_slides[i] = restore_cached_slide(entry, i, output_dir)
+                    cached_image_size = entry['image_size']
+                except OSError as e:
+                    logger.warning(f"Cached slide {i+1} disappeared while restoring it: {str(e)}")
+            if cached_slides:
+                logger.info(f"Reusing {len(cached_slides)} cached slides")
+        
+        # スライド画像を生成（最適化オプション付き）
+        # テキストのみのモードではLibreOfficeも画像処理も使わない
+        # 画像生成はLibreOfficeとpdftoppmの待ち時間が大半なので、別スレッドで進めてテキスト抽出と重ねる
+        render_stats = {'unique_images': 0, 'duplicate_images': 0}
+        executor = None
+        render_future = None
+        render_indices = [i for i in range(first_index, last_index + 1)
+                          if i not in skipped_indices and i not in cached_slides]
+        # キャッシュ済みのスライドがある場合は、書き出す範囲を未キャッシュのスライドに絞る
+        render_first, render_last = first_index, last_index
+        if render_indices and cached_slides:
+            render_first, render_last = render_indices[0], render_indices[-1]
+        if not text_only and render_indices:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slide-render')
+            render_future = executor.submit(
+                convert_to_png,
+                file_path, 
+                output_dir,
+                optimize=optimize_images,
+                format=image_format,
+                quality=image_quality,
+                max_width=max_width,
+                max_height=max_height,
+                raster_workers=raster_workers,
+                supersample=supersample,
+                slide_range=(render_first, render_last) if slide_range or cached_slides else None,
+                stats=render_stats,
+                skip_slides=sorted(skipped_indices | set(cached_slides)),
+                on_image=on_image
+            )
+        
+        parallel_slides = None
+        try:
+            # 結果を格納する辞書
+            result = {
+                'slides': [],
+                'metadata': {
+                    'image_format': None if text_only else (image_format if optimize_images else 'PNG'),
+                    'image_quality': image_quality,
+                    'image_dimensions': {
+                        'width': 0,
+                        'height': 0
+                    },
+                    'optimized': optimize_images and not text_only,
+                    'cache': {
+                        'deck_hit': False,
+                        'cached_slides': len(cached_slides)
+                    },
+                    'text_only': text_only,
+                    'parser_version': '2.0',  # パーサーバージョンを追加
+                    'total_slides': total_slides,
+                    'hidden_slides': sorted(hidden_indices),
+                    'hidden_slide_policy': hidden_slides,
+                    'slide_range': {
+                        'first': first_index,
+                        'last': last_index
+                    },
+                    'extraction_options': {
+                        'tables': extract_tables,
+                        'groups': extract_groups,
+                        'smartart': extract_smartart,
+                        'improved_text_order': improve_text_order,
+                        'engine': engine,
+                        'resolve_styles': resolve_styles,
+                        'profile': profile if fields is None else None,
+                        'fields': sorted(extraction_fields)
+                    }
                 }
             }
             
-            # スライド内の全要素を処理
-            all_elements = []
-            for shape_idx, shape in enumerate(slide.shapes):
-                # Z順序を設定（スライド内の順序を使用）
-                z_order = shape_idx
-                
-                # テキスト要素の抽出
-                if hasattr(shape, "text") or isinstance(shape, GroupShape) or hasattr(shape, "table"):
-                    text_data = extract_text_from_shape(shape, z_order)
-                    if text_data:
-                        all_elements.append(text_data)
-                        # テキスト要素のみの配列にも追加
-                        if text_data.get("type") == "text" or text_data.get("type") == "table" or text_data.get("type") == "group":
-                            slide_data['text_elements'].append(text_data)
-                
-                # 非テキスト要素の情報も抽出
-                shape_info = extract_shape_info(shape)
-                if shape_info:
-                    all_elements.append(shape_info)
+            # メタデータを抽出
+            try:
+                result['metadata'].update(extract_metadata(presentation))
+            except Exception as e:
+                logger.warning(f"Error extracting metadata: {str(e)}")
+            if on_metadata:
+                on_metadata(result['metadata'])
             
-            # 要素をZ順序とレイアウト位置でソート
-            if sort_elements and all_elements:
-                # まずZ順序でソート
-                all_elements.sort(key=lambda x: x.get("position", {}).get("z_order", 0) if x.get("position") else 999999)
-                
-                # 読み順を改善する場合は、さらにレイアウト位置も考慮
-                if improve_text_order:
-                    # テキスト要素のみを抽出してレイアウト位置でソート
-                    text_elements = [elem for elem in all_elements if elem.get("type") in ["text", "table", "group"]]
-                    
-                    # 縦書きテキストと横書きテキストを区別
-                    vertical_texts = []
-                    horizontal_texts = []
-                    other_elements = []
-                    
-                    for elem in text_elements:
-                        if elem.get("type") == "text" and elem.get("vertical"):
-                            vertical_texts.append(elem)
-                        elif elem.get("type") == "text":
-                            horizontal_texts.append(elem)
-                        else:
-                            other_elements.append(elem)
-                    
-                    # 横書きテキストは上から下、左から右の順でソート
-                    horizontal_texts.sort(key=lambda x: (x.get("position", {}).get("y", 0), x.get("position", {}).get("x", 0)))
-                    
-                    # 縦書きテキストは右から左、上から下の順でソート
-                    vertical_texts.sort(key=lambda x: (-x.get("position", {}).get("x", 0), x.get("position", {}).get("y", 0)))
-                    
-                    # ソートされたテキスト要素を結合
-                    sorted_text_elements = horizontal_texts + vertical_texts + other_elements
-                    
-                    # テキスト要素のみの配列を更新
-                    slide_data['text_elements'] = sorted_text_elements
-                    
-                    # 全要素の配列でテキスト要素を更新
-                    text_element_ids = {id(elem) for elem in sorted_text_elements}
-                    non_text_elements = [elem for elem in all_elements if id(elem) not in text_element_ids]
-                    all_elements = sorted_text_elements + non_text_elements
+            # レイアウト・マスター・テーマの書式はデッキ全体でメモ化する（色や書式を抽出しない場合は不要）
+            needs_styles = extraction_fields & {'resolved_styles', 'shape_styles', 'background'}
+            style_resolver = StyleResolver(presentation) if resolve_styles and needs_styles else None
             
-            # 処理済みの要素をスライドデータに追加
-            slide_data['elements'] = all_elements
+            # 各スライドを処理（画像生成と並行して実行）
+            logger.info(f"Processing slides {first_index + 1}-{last_index + 1} of {total_slides}")
             
-            # 特殊文字や多言語テキストの処理を強化
-            for elem in slide_data['text_elements']:
-                if elem.get("type") == "text" and "text" in elem:
-                    # Unicode正規化を適用して特殊文字を適切に処理
-                    import unicodedata
-                    normalized_text = unicodedata.normalize('NFKC', elem["text"])
-                    elem["text"] = normalized_text
-                    
-                    # パラグラフ内のテキストも正規化
-                    if "paragraphs" in elem:
-                        for para in elem["paragraphs"]:
-                            if "text" in para:
-                                para["text"] = unicodedata.normalize('NFKC', para["text"])
-                            
-                            # ラン内のテキストも正規化
-                            if "runs" in para:
-                                for run in para["runs"]:
-                                    if "text" in run:
-                                        run["text"] = unicodedata.normalize('NFKC', run["text"])
+            # 大きなデッキは抽出をプロセスプールに分散する（結果はインデックス順に受け取る）
+            if extract_workers is None:
+                extract_workers = DEFAULT_EXTRACT_WORKERS
+            extract_indices = [i for i in range(first_index, last_index + 1)
+                               if i not in skipped_indices and i not in cached_slides]
+            if extract_workers > 1 and len(extract_indices) >= max(PARALLEL_EXTRACT_MIN_SLIDES, 2):
+                parallel_slides = iter_parallel_extraction(
+                    file_path, extract_indices, min(extract_workers, len(extract_indices)),
+                    resolve_styles=bool(style_resolver),
+                    extract_kwargs={
+                        'sort_elements': sort_elements,
+                        'improve_text_order': improve_text_order,
+                        'text_only': text_only,
+                        'engine': engine,
+                        'fields': extraction_fields
+                    }
+                )
+            
+            for i in range(first_index, last_index + 1):
+                if i in skipped_indices:
+                    if hidden_slides == 'skip':
+                        logger.info(f"Skipping hidden slide {i+1}/{total_slides}")
+                        continue
+                    slide_data = hidden_slide_placeholder(i, presentation.slide_width, presentation.slide_height)
+                elif i in cached_slides:
+                    logger.info(f"Using cached slide {i+1}/{total_slides}")
+                    slide_data = cached_slides[i]
+                elif parallel_slides:
+                    slide_data = next(parallel_slides)
+                    slide_data['hidden'] = i in hidden_indices
+                else:
+                    logger.info(f"Processing slide {i+1}/{total_slides}")
+                    slide_data = extract_slide(
+                        presentation.slides[i], i,
+                        presentation.slide_width, presentation.slide_height,
+                        sort_elements=sort_elements,
+                        improve_text_order=improve_text_order,
+                        text_only=text_only,
+                        engine=engine,
+                        style_context=style_resolver.slide_context(presentation.slides[i]) if style_resolver else None,
+                        fields=extraction_fields
+                    )
+                    slide_data['hidden'] = i in hidden_indices
+                slide_data.setdefault('image_path', None)
+                if on_slide:
+                    on_slide(slide_data)
+                
+                # スライドデータを結果に追加
+                result['slides'].append(slide_data)
             
-            # スライドデータを結果に追加
-            result['slides'].append(slide_data)
+            # 画像生成の完了を待って画像パスを割り当てる
+            image_size = (0, 0)
+            if cached_slides and not text_only:
+                image_size = cached_image_size
+            if render_future:
+                image_paths, image_size = render_future.result()
+                if not image_paths:
+                    logger.error("Failed to convert slides to images")
+                    return {'error': 'Failed to convert slides to images'}
+                
+                for slide_data in result['slides']:
+                    offset = slide_data['index'] - render_first
+                    if slide_data['index'] not in cached_slides and 0 <= offset < len(image_paths):
+                        slide_data['image_path'] = image_paths[offset]
+            result['metadata']['image_dimensions'] = {
+                'width': image_size[0],
+                'height': image_size[1]
+            }
+            # 画像生成の完了後の値を記録する（NDJSONのヘッダーは画像生成の完了前に出力されるため含めない）
+            result['metadata']['image_dedupe'] = dict(render_stats)
             
-        logger.info(f"Successfully processed all {total_slides} slides")
+            # 全スライドの要素の画像座標を1回の変換でまとめて求める
+            if not text_only:
+                add_pixel_positions(result['slides'], presentation.slide_width, presentation.slide_height,
+                                    image_size[0], image_size[1])
+            
+            # 埋め込みメディアはデッキ全体の一覧にまとめ、スライドには一覧への参照のみを持たせる
+            if media_inventory:
+                inventory = build_media_inventory(presentation, output_dir, extract=extract_media)
+                slide_media = inventory.pop('slides')
+                for slide_data in result['slides']:
+                    slide_data['media'] = slide_media.get(slide_data['index'], [])
+                result['media'] = inventory
+        finally:
+            if parallel_slides:
+                parallel_slides.close()
+            if executor:
+                executor.shutdown(wait=True)
+        
+        # 新たに処理したスライドと結果全体をキャッシュに保存する
+        if parse_cache:
+            try:
+                for slide_data in result['slides']:
+                    index = slide_data['index']
+                    if index in cached_slides or index not in slide_keys:
+                        continue
+                    if not text_only and not slide_data['image_path']:
+                        continue
+                    image_path = os.path.join(output_dir, slide_data['image_path']) if slide_data['image_path'] else None
+                    parse_cache.store_slide(slide_keys[index], slide_data, image_path, image_size)
+                parse_cache.store_deck(deck_key, result, slide_keys)
+            except Exception as e:
+                logger.warning(f"Failed to store parse result in cache: {str(e)}")
+        
+        logger.info(f"Successfully processed {len(result['slides'])} of {total_slides} slides")
         return result
         
     except Exception as e:
@@ -1086,6 +1640,9 @@ def parse_pptx(file_path: str, output_dir: str, optimize_images: bool = True,
         import traceback
         logger.error(traceback.format_exc())
         return {'error': str(e), 'traceback': traceback.format_exc()}
+    finally:
+        # 読み込み元のメモリマップとファイルを閉じる（結果はPPTXのオブジェクトを参照しない）
+        close_presentation(presentation)
 
 def update_pptx_with_translations(
     original_file: str,
@@ -1104,8 +1661,9 @@ def update_pptx_with_translations(
     Returns:
         bool: 成功した場合True
     """
+    prs = None
     try:
-        prs = Presentation(original_file)
+        prs = open_presentation(original_file)
         
         for slide_index, slide in enumerate(prs.slides):
             if slide_index not in translations:
@@ -1126,13 +1684,122 @@ def update_pptx_with_translations(
         
     except Exception:
         return False
+    finally:
+        close_presentation(prs)
+
+class NDJSONWriter:
+    """
+    解析結果を1行1レコードのJSON（NDJSON）で逐次出力する
+
+    レコードは次の順に出力される
+    - {"type": "header", "metadata": {...}}
+    - {"type": "slide", "slide": {...}}  スライドのテキストが揃った時点で1スライドにつき1件
+    - {"type": "image", "index": n, "image_path": "..."}  スライドの出力後に画像ができた場合のみ
+    - {"type": "trailer", "total_slides": n, "total_text_elements": n, "image_dimensions": {...},
+       "image_dedupe": {...}, "errors": [...]}
+
+    コンパクト形式では、ヘッダーに schema が付き、スライドのレコードに
+    そのスライドで新しく登録されたスタイル {"styles": {インデックス: スタイル}} が付く
+    """
+
+    def __init__(self, stream=None, compact: bool = False):
+        """
+        コンストラクタ
+
+        Args:
+            stream: 出力先（デフォルトは標準出力）
+            compact: コンパクト形式（lib.python.compact_schema）で出力するか
+        """
+        self.stream = stream or sys.stdout
+        self.style_table = compact_schema.StyleTable() if compact else None
+        # on_imageは画像生成スレッドから呼ばれるため、書き込みと状態の更新を直列化する
+        self._lock = threading.Lock()
+        self._header_written = False
+        self._emitted_slides = set()
+        self._pending_images = {}
+        self.total_slides = 0
+        self.total_text_elements = 0
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.stream.write(serializer.dumps(record) + '\n')
+        self.stream.flush()
+
+    def on_metadata(self, metadata: Dict[str, Any]) -> None:
+        with self._lock:
+            if not self._header_written:
+                # 画像の重複排除の件数は画像生成の完了後に決まるため、トレーラーで出力する
+                header = {'type': 'header',
+                          'metadata': {key: value for key, value in metadata.items() if key != 'image_dedupe'}}
+                if self.style_table is not None:
+                    header['schema'] = {'name': compact_schema.SCHEMA_NAME, 'version': compact_schema.SCHEMA_VERSION}
+                self._write(header)
+                self._header_written = True
+
+    def on_slide(self, slide_data: Dict[str, Any]) -> None:
+        with self._lock:
+            index = slide_data['index']
+            record = slide_data
+            # スライドより先に画像ができていれば、スライドのレコードに含める
+            if index in self._pending_images:
+                record = dict(slide_data, image_path=self._pending_images.pop(index))
+            if self.style_table is not None:
+                record = compact_schema.compact_slide(record, self.style_table)
+                new_styles = self.style_table.drain_new()
+                self._write({'type': 'slide', 'slide': record, 'styles': new_styles} if new_styles
+                            else {'type': 'slide', 'slide': record})
+            else:
+                self._write({'type': 'slide', 'slide': record})
+            self._emitted_slides.add(index)
+            self.total_slides += 1
+            self.total_text_elements += len(slide_data.get('text_elements', []))
+
+    def on_image(self, index: int, image_path: str) -> None:
+        with self._lock:
+            if index in self._emitted_slides:
+                self._write({'type': 'image', 'index': index, 'image_path': image_path})
+            else:
+                self._pending_images[index] = image_path
+
+    def finish(self, result: Dict[str, Any]) -> None:
+        """
+        トレーラーを出力する
+
+        Args:
+            result: parse_pptxの戻り値
+        """
+        metadata = result.get('metadata', {})
+        # 解析開始前に失敗した場合もヘッダーから始まるようにする
+        self.on_metadata(metadata)
+
+        errors = []
+        if 'error' in result:
+            errors.append({'message': result['error']})
+        with self._lock:
+            if not metadata.get('text_only'):
+                for slide in result.get('slides', []):
+                    if slide.get('image_path') is None and not slide.get('hidden'):
+                        errors.append({'message': 'Slide image was not generated', 'index': slide['index']})
+            # スライドのレコードは一覧の作成前に出力しているため、スライドごとの参照もここで出力する
+            if result.get('media'):
+                self._write(dict(result['media'], type='media', slides=[
+                    {'index': slide['index'], 'media': slide['media']}
+                    for slide in result.get('slides', []) if slide.get('media')
+                ]))
+            self._write({
+                'type': 'trailer',
+                'total_slides': self.total_slides,
+                'total_text_elements': self.total_text_elements,
+                'image_dimensions': metadata.get('image_dimensions'),
+                'image_dedupe': metadata.get('image_dedupe'),
+                'errors': errors
+            })
 
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='PPTX Parser')
     parser.add_argument('file_path', help='Path to PPTX file')
-    parser.add_argument('output_dir', help='Output directory')
+    parser.add_argument('output_dir', nargs='?', help='Output directory (not needed with --text-only)')
     
     # 画像関連のオプション
     image_group = parser.add_argument_group('Image options')
@@ -1142,9 +1809,30 @@ if __name__ == "__main__":
     image_group.add_argument('--quality', type=int, default=85, help='Image quality (0-100)')
     image_group.add_argument('--max-width', type=int, default=1920, help='Maximum image width')
     image_group.add_argument('--max-height', type=int, default=1080, help='Maximum image height')
+    image_group.add_argument('--raster-workers', type=int, default=None,
+                           help='Number of parallel pdftoppm workers for rasterization')
+    image_group.add_argument('--supersample', type=float, default=None,
+                           help='Render at this multiple of the output size and downsample (1.0 = exact)')
+    image_group.add_argument('--thumbnail', action='store_true',
+                           help=f'Render thumbnails ({THUMBNAIL_WIDTH}x{THUMBNAIL_HEIGHT}) instead of full-size slides')
     
     # テキスト抽出関連のオプション
     text_group = parser.add_argument_group('Text extraction options')
+    text_group.add_argument('--engine', choices=EXTRACTION_ENGINES, default=DEFAULT_EXTRACTION_ENGINE,
+                          help='Text extraction engine (lxml reads the slide XML directly and is faster)')
+    text_group.add_argument('--extract-workers', type=int, default=None,
+                          help=f'Number of worker processes for text extraction on large decks '
+                               f'(used from {PARALLEL_EXTRACT_MIN_SLIDES} slides, default: PPTX_EXTRACT_WORKERS or serial)')
+    text_group.add_argument('--hidden-slides', choices=HIDDEN_SLIDE_POLICIES, default=DEFAULT_HIDDEN_SLIDE_POLICY,
+                          help='How to handle hidden slides: skip them, emit index-only placeholders, or process fully')
+    text_group.add_argument('--profile', choices=sorted(EXTRACTION_PROFILES), default=DEFAULT_EXTRACTION_PROFILE,
+                          help='Extraction profile: translate (text only), preview (no shape geometry) or full')
+    text_group.add_argument('--fields', type=str,
+                          help=f"Comma-separated fields to extract, overriding --profile ({', '.join(EXTRACTION_FIELDS)})")
+    text_group.add_argument('--no-resolve-styles', action='store_false', dest='resolve_styles',
+                          help='Do not resolve fonts and colors inherited from layouts, masters and the theme')
+    text_group.add_argument('--text-only', action='store_true',
+                          help='Extract text only, without LibreOffice or image rendering')
     text_group.add_argument('--sort-elements', action='store_true', default=True, 
                           help='Sort elements by Z-order and layout position')
     text_group.add_argument('--no-sort-elements', action='store_false', dest='sort_elements', 
@@ -1166,6 +1854,33 @@ if __name__ == "__main__":
     text_group.add_argument('--no-improve-text-order', action='store_false', dest='improve_text_order', 
                           help='Do not improve text reading order')
     
+    # スライド範囲のオプション
+    range_group = parser.add_argument_group('Slide range options')
+    range_group.add_argument('--slide-index', type=int,
+                           help='Process only the slide at this index (0-based)')
+    range_group.add_argument('--slide-range', type=str,
+                           help='Process only slides in this range (0-based, inclusive, e.g. 3-7)')
+    range_group.add_argument('--single-slide', action='store_true',
+                           help='Output only the selected slide object instead of the whole result')
+    
+    # 出力関連のオプション
+    output_group = parser.add_argument_group('Output options')
+    output_group.add_argument('--ndjson', action='store_true',
+                            help='Stream newline-delimited JSON: a header, one record per slide as it is ready, then a trailer')
+    output_group.add_argument('--compact', action='store_true',
+                            help='Use the compact schema (text elements referenced by index, shared style table, no indentation)')
+    output_group.add_argument('--encoding', choices=serializer.ENCODINGS, default='json',
+                            help='Output encoding (msgpack requires the msgpack package)')
+    output_group.add_argument('--media-inventory', action='store_true',
+                            help='Add a deck-wide index of embedded media (hash, size, dimensions, referencing slides)')
+    output_group.add_argument('--extract-media', action='store_true',
+                            help='Write each unique embedded media file once to OUTPUT_DIR/media (implies --media-inventory)')
+    
+    # キャッシュ関連のオプション
+    cache_group = parser.add_argument_group('Cache options')
+    cache_group.add_argument('--no-cache', action='store_false', dest='cache',
+                           help='Do not read or write the on-disk parse cache (PARSE_CACHE_DIR)')
+    
     # ログ関連のオプション
     log_group = parser.add_argument_group('Logging options')
     log_group.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
@@ -1173,6 +1888,39 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
+    # スライド範囲を決定
+    slide_range = None
+    if args.slide_index is not None:
+        slide_range = (args.slide_index, args.slide_index)
+    elif args.slide_range:
+        try:
+            start, _, end = args.slide_range.partition('-')
+            slide_range = (int(start), int(end) if end else int(start))
+        except ValueError:
+            parser.error(f"Invalid --slide-range: {args.slide_range}")
+    if args.single_slide and slide_range is None:
+        parser.error("--single-slide requires --slide-index")
+    if not args.output_dir and not args.text_only:
+        parser.error("output_dir is required unless --text-only is given")
+    fields = None
+    if args.fields is not None:
+        fields = [field.strip() for field in args.fields.split(',') if field.strip()]
+        try:
+            resolve_extraction_fields(args.profile, fields)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.ndjson and args.encoding != 'json':
+        parser.error("--ndjson cannot be combined with --encoding msgpack")
+    if args.encoding == 'msgpack' and not serializer.MSGPACK_AVAILABLE:
+        parser.error("--encoding msgpack requires the msgpack package (pip install msgpack)")
+    
+    # サムネイルは出力サイズに合わせた低解像度で直接描画する
+    if args.thumbnail:
+        args.max_width = THUMBNAIL_WIDTH
+        args.max_height = THUMBNAIL_HEIGHT
+        from lib.python.image_optimizer import get_optimal_format
+        args.format = get_optimal_format('thumbnail')
+    
     # ログレベルの設定
     if args.debug:
         logger.setLevel(logging.DEBUG)
@@ -1188,7 +1936,8 @@ if __name__ == "__main__":
         sys.exit(1)
         
     # 出力ディレクトリが存在しない場合は作成
-    os.makedirs(args.output_dir, exist_ok=True)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
     
     logger.info(f"Starting to parse PPTX file: {args.file_path}")
     logger.info(f"Output directory: {args.output_dir}")
@@ -1197,6 +1946,9 @@ if __name__ == "__main__":
                f"extract_groups={args.extract_groups}, extract_smartart={args.extract_smartart}, " +
                f"improve_text_order={args.improve_text_order}")
     
+    # NDJSONモードではスライドごとに逐次出力する
+    ndjson_writer = NDJSONWriter(compact=args.compact) if args.ndjson else None
+    
     # PPTXファイルを解析
     result = parse_pptx(
         args.file_path, 
@@ -1210,11 +1962,38 @@ if __name__ == "__main__":
         extract_tables=args.extract_tables,
         extract_groups=args.extract_groups,
         extract_smartart=args.extract_smartart,
-        improve_text_order=args.improve_text_order
+        improve_text_order=args.improve_text_order,
+        raster_workers=args.raster_workers,
+        extract_workers=args.extract_workers,
+        media_inventory=args.media_inventory,
+        extract_media=args.extract_media,
+        supersample=args.supersample,
+        slide_range=slide_range,
+        text_only=args.text_only,
+        hidden_slides=args.hidden_slides,
+        engine=args.engine,
+        use_cache=args.cache,
+        resolve_styles=args.resolve_styles,
+        profile=args.profile,
+        fields=fields,
+        on_slide=ndjson_writer.on_slide if ndjson_writer else None,
+        on_metadata=ndjson_writer.on_metadata if ndjson_writer else None,
+        on_image=ndjson_writer.on_image if ndjson_writer else None
     )
     
-    # 結果を出力
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    # 結果を出力（単一スライドモードではスライドのオブジェクトのみ）
+    if ndjson_writer:
+        ndjson_writer.finish(result)
+    else:
+        output = result
+        if args.compact:
+            output = compact_schema.compact_result(result)
+        if args.single_slide and output.get('slides'):
+            output = dict(output['slides'][0], styles=output['styles']) if args.compact else output['slides'][0]
+        sys.stdout.buffer.write(serializer.encode(output, args.encoding, indent=not args.compact))
+        if args.encoding == 'json':
+            sys.stdout.buffer.write(b'\n')
+        sys.stdout.flush()
     
     # 処理結果のサマリをログに出力
     total_slides = len(result.get('slides', []))
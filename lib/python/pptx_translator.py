@@ -1,16 +1,77 @@
 #!/usr/bin/env python3
 import sys
 import json
-from pptx import Presentation
+from copy import deepcopy
 from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.shapes.group import GroupShape
 from pptx.enum.text import MSO_AUTO_SIZE, MSO_ANCHOR, PP_ALIGN
 from pptx.util import Emu, Pt
+from lazy_package import open_presentation, close_presentation
+from text_normalizer import normalize_text
+from payload_reader import iter_slide_payload, STDIN_ARGUMENT
+from text_metrics import fit_font_size
 
-def find_matching_shape(shape, original_text):
-    """シェイプのテキストが元のテキストと一致するか確認"""
-    if not hasattr(shape, 'text_frame'):
-        return False
-    return shape.text_frame.text.strip() == original_text.strip()
+def text_key(text):
+    """テキストの照合に使うキー（解析時のUnicode正規化と前後の空白の違いは無視する）"""
+    return normalize_text((text or '').strip()).strip()
+
+def iter_text_targets(shapes):
+    """テキストを持つシェイプとテキストフレームを文書順に列挙する（グループ内のシェイプとテーブルのセルを含む）"""
+    for shape in shapes:
+        if isinstance(shape, GroupShape):
+            yield from iter_text_targets(shape.shapes)
+        elif getattr(shape, 'has_table', False):
+            for row in shape.table.rows:
+                for cell in row.cells:
+                    # 結合されたセルのうち、左上以外のセルは表示されない
+                    if not cell.is_spanned:
+                        yield shape, cell.text_frame
+        elif getattr(shape, 'has_text_frame', False):
+            yield shape, shape.text_frame
+
+def build_shape_index(slide):
+    """
+    スライド内のテキストの索引を作る
+
+    Returns:
+        dict: by_id（シェイプID -> 対象のリスト）と by_text（照合キー -> 対象のリスト）。
+            対象は [シェイプ, テキストフレーム, 更新済みか] で、リストは文書順
+    """
+    by_id = {}
+    by_text = {}
+    for shape, text_frame in iter_text_targets(slide.shapes):
+        target = [shape, text_frame, False]
+        by_id.setdefault(shape.shape_id, []).append(target)
+        by_text.setdefault(text_key(text_frame.text), []).append(target)
+    return {'by_id': by_id, 'by_text': by_text}
+
+def find_text_target(index, text_data, original_text):
+    """
+    索引から翻訳を適用する対象を探す（シェイプIDがあればIDで、なければテキストで探す）
+
+    同じテキストが複数ある場合は、まだ更新していない最初の対象を返す
+
+    Returns:
+        [シェイプ, テキストフレーム, 更新済みか]、見つからない場合はNone
+    """
+    key = text_key(original_text)
+    shape_id = text_data.get('shape_id', text_data.get('shapeId'))
+    if shape_id is not None:
+        try:
+            candidates = index['by_id'].get(int(shape_id), [])
+        except (TypeError, ValueError):
+            candidates = []
+        # テーブルはセルごとに対象があるため、テキストでも絞り込む
+        if len(candidates) > 1:
+            candidates = [target for target in candidates if text_key(target[1].text) == key] or candidates
+        for target in candidates:
+            if not target[2]:
+                return target
+
+    for target in index['by_text'].get(key, []):
+        if not target[2]:
+            return target
+    return None
 
 def adjust_text_frame_for_language(text_frame, translation, language="en"):
     """言語に応じてテキストフレームの設定を調整"""
@@ -104,15 +165,79 @@ def detect_language(text):
     # デフォルトは英語
     return "en"
 
-def adjust_font_size(paragraph, min_size=8, max_size=None):
-    """テキストのフォントサイズを調整する"""
+def text_frame_box(shape, text_frame):
+    """
+    テキストフレームの内側（余白を除いた）の大きさを取得する（テーブルのセルは列の幅と行の高さから求める）
+
+    Returns:
+        (幅, 高さ)（EMU）、取得できない場合はNone
+    """
+    container = text_frame
+    width = getattr(shape, 'width', None)
+    height = getattr(shape, 'height', None)
+    if getattr(shape, 'has_table', False):
+        # セルのテキストフレームの親はセル（_Cell）
+        cell = text_frame._parent
+        tc = cell._tc
+        table = shape.table
+        column_index = list(tc.getparent().tc_lst).index(tc)
+        row_index = list(table._tbl.tr_lst).index(tc.getparent())
+        columns = list(table.columns)[column_index:column_index + cell.span_width]
+        rows = list(table.rows)[row_index:row_index + cell.span_height]
+        width = sum(column.width for column in columns)
+        height = sum(row.height for row in rows)
+        container = cell
+    if not width or not height:
+        return None
+    width -= (container.margin_left or 0) + (container.margin_right or 0)
+    height -= (container.margin_top or 0) + (container.margin_bottom or 0)
+    if width <= 0 or height <= 0:
+        return None
+    return width, height
+
+def run_font(runs):
+    """
+    ランのリストから最初に指定されているフォントサイズとフォント名を取得する
+
+    Args:
+        runs: ランのリスト
+
+    Returns:
+        (フォントサイズ（pt）, フォント名)、指定がない場合はそれぞれNone
+    """
+    size = None
+    name = None
+    for run in runs:
+        if size is None and run.font.size is not None:
+            size = run.font.size.pt
+        if name is None and run.font.name:
+            name = run.font.name
+    return size, name
+
+def adjust_font_size(paragraph, min_size=8, max_size=None, box=None, language=None,
+                     current_size=None, font_name=None):
+    """
+    テキストのフォントサイズを調整する
+
+    テキストフレームの大きさ（box）が分かる場合は、実際のフォントで折り返しを計算して
+    枠に収まる最大のサイズにする。分からない場合はテキストの長さに応じて縮小する
+
+    Args:
+        paragraph: 段落
+        min_size: フォントサイズの下限（pt）
+        max_size: フォントサイズの上限（pt、Noneの場合は現在のサイズ）
+        box: text_frame_boxの戻り値（幅, 高さ）（EMU）
+        language: テキストの言語（代替フォントの選択に使う）
+        current_size: 現在のフォントサイズ（pt、Noneの場合は段落のランから取得する）
+        font_name: フォント名（Noneの場合は段落のランから取得する）
+    """
     
-    # 現在のフォントサイズを取得
-    current_size = None
-    for run in paragraph.runs:
-        if run.font.size is not None:
-            current_size = run.font.size.pt
-            break
+    # 現在のフォントサイズとフォント名を取得（ランを置き換える前の値が渡されていればそれを使う）
+    run_size, run_name = run_font(paragraph.runs)
+    if current_size is None:
+        current_size = run_size
+    if font_name is None:
+        font_name = run_name
     
     # 現在のサイズが取得できなかった場合はデフォルト値を使用
     if current_size is None:
@@ -122,17 +247,24 @@ def adjust_font_size(paragraph, min_size=8, max_size=None):
     if max_size is None:
         max_size = current_size
     
-    # テキストが長すぎる場合はフォントサイズを小さくする
-    text_length = len(paragraph.text)
-    
-    if text_length > 200:  # 非常に長いテキスト
-        new_size = max(min_size, current_size * 0.7)  # 70%に縮小
-    elif text_length > 100:  # 長いテキスト
-        new_size = max(min_size, current_size * 0.8)  # 80%に縮小
-    elif text_length > 50:   # 中程度のテキスト
-        new_size = max(min_size, current_size * 0.9)  # 90%に縮小
+    if box is not None:
+        # 枠に収まる最大のフォントサイズ
+        width, height = box
+        new_size = fit_font_size(paragraph.text, Emu(width).pt, Emu(height).pt,
+                                 max_size=min(max_size, current_size), min_size=min_size,
+                                 font_name=font_name, lang=language)
     else:
-        new_size = min(max_size, current_size)  # 現在のサイズを維持または最大サイズに制限
+        # テキストが長すぎる場合はフォントサイズを小さくする
+        text_length = len(paragraph.text)
+        
+        if text_length > 200:  # 非常に長いテキスト
+            new_size = max(min_size, current_size * 0.7)  # 70%に縮小
+        elif text_length > 100:  # 長いテキスト
+            new_size = max(min_size, current_size * 0.8)  # 80%に縮小
+        elif text_length > 50:   # 中程度のテキスト
+            new_size = max(min_size, current_size * 0.9)  # 90%に縮小
+        else:
+            new_size = min(max_size, current_size)  # 現在のサイズを維持または最大サイズに制限
     
     # すべてのランのフォントサイズを設定
     for run in paragraph.runs:
@@ -143,8 +275,12 @@ def update_slide_text(slide, slide_data):
     if not slide_data.get('texts'):
         return
 
+    # スライド内のテキスト（グループ内・テーブルのセルを含む）の索引を一度だけ作る
+    index = build_shape_index(slide)
+
     for i, text_data in enumerate(slide_data['texts']):
-        original_text = text_data.get('text', '').strip()
+        # 解析時に正規化されたテキストは、正規化前のテキスト（original_text）で照合する
+        original_text = (text_data.get('original_text') or text_data.get('text', '')).strip()
         
         # 翻訳テキストの取得方法を修正
         translation = None
@@ -175,81 +311,84 @@ def update_slide_text(slide, slide_data):
             target_language = detect_language(translation)
             print(f"  - Detected language: {target_language}", file=sys.stderr)
         
-        # スライド内の全シェイプを検索
-        found = False
-        for shape in slide.shapes:
-            if find_matching_shape(shape, original_text):
-                try:
-                    # テキストフレームにアクセス
-                    if not hasattr(shape, 'text_frame'):
-                        print(f"  - Warning: Shape does not have a text frame", file=sys.stderr)
-                        continue
-                    
-                    # テキストフレームを言語に応じて調整
-                    adjust_text_frame_for_language(shape.text_frame, translation, target_language)
-                    
-                    # テキストを更新
-                    # まず既存のテキストを保持
-                    existing_text = shape.text_frame.text
-                    
-                    # テキストを設定
-                    if shape.text_frame.paragraphs:
-                        # 既存の段落のプロパティを保持
-                        p = shape.text_frame.paragraphs[0]
-                        
-                        # フォントの配置情報を保持
-                        alignment = p.alignment
-                        
-                        # 段落のテキストをクリア
-                        for run in list(p.runs):
-                            p._element.remove(run._element)
-                        
-                        # 新しいランを追加
-                        run = p.add_run()
-                        run.text = translation
-                        
-                        # フォントサイズを調整
-                        adjust_font_size(p)
-                        
-                        # 配置を復元
-                        p.alignment = alignment
-                    else:
-                        # 段落がない場合は単純にテキストを設定
-                        shape.text_frame.text = translation
-                    
-                    print(f"  - Text updated successfully", file=sys.stderr)
-                    found = True
-                    break
-                except Exception as e:
-                    print(f"  - Error updating text: {e}", file=sys.stderr)
-                
-        if not found:
+        # 索引から対象のテキストフレームを1回で探す
+        target = find_text_target(index, text_data, original_text)
+        if target is None:
             print(f"  - Warning: No matching shape found for text: {original_text}", file=sys.stderr)
+            continue
+
+        shape, text_frame, _ = target
+        try:
+            # テキストフレームを言語に応じて調整
+            adjust_text_frame_for_language(text_frame, translation, target_language)
+            
+            # テキストを設定
+            if text_frame.paragraphs:
+                # 既存の段落のプロパティを保持
+                p = text_frame.paragraphs[0]
+                
+                # フォントの配置情報を保持
+                alignment = p.alignment
+                
+                # 元のランのフォントサイズ・フォント名・書式（rPr）を削除する前に保持
+                original_runs = list(p.runs)
+                current_size, font_name = run_font(original_runs)
+                run_properties = next((r._r.rPr for r in original_runs if r._r.rPr is not None), None)
+                
+                # 段落のテキストをクリア
+                for run in original_runs:
+                    p._p.remove(run._r)
+                
+                # 新しいランを追加（元の書式を引き継ぐ）
+                run = p.add_run()
+                if run_properties is not None:
+                    if run._r.rPr is not None:
+                        run._r.remove(run._r.rPr)
+                    run._r.insert(0, deepcopy(run_properties))
+                run.text = translation
+                
+                # フォントサイズを調整（テキストフレームの大きさに収める）
+                adjust_font_size(p, box=text_frame_box(shape, text_frame), language=target_language,
+                                 current_size=current_size, font_name=font_name)
+                
+                # 配置を復元
+                p.alignment = alignment
+            else:
+                # 段落がない場合は単純にテキストを設定
+                text_frame.text = translation
+            
+            # 同じテキストが複数ある場合に、次の翻訳が別の対象に適用されるようにする
+            target[2] = True
+            print(f"  - Text updated successfully (shape {shape.shape_id})", file=sys.stderr)
+        except Exception as e:
+            print(f"  - Error updating text: {e}", file=sys.stderr)
 
 def main():
-    if len(sys.argv) != 4:
+    if len(sys.argv) not in (3, 4):
         print(json.dumps({
-            "error": "Usage: python pptx_translator.py input_file output_file slides_data"
+            "error": "Usage: python pptx_translator.py input_file output_file [slides_file | -]"
         }))
         sys.exit(1)
 
     input_file = sys.argv[1]
     output_file = sys.argv[2]
-    slides_data = json.loads(sys.argv[3])
+    # 翻訳データはファイルまたは標準入力（省略時または '-'）から読み込む
+    payload_source = sys.argv[3] if len(sys.argv) == 4 else STDIN_ARGUMENT
 
+    prs = None
     try:
         # デバッグ情報を出力
         print(f"Loading presentation from: {input_file}", file=sys.stderr)
         
-        # 元のプレゼンテーションを読み込む
-        prs = Presentation(input_file)
+        # 元のプレゼンテーションを読み込む（メディアは保存時にのみ読み出す）
+        prs = open_presentation(input_file)
         print(f"Loaded presentation with {len(prs.slides)} slides", file=sys.stderr)
 
-        # スライドデータの構造をデバッグ出力
-        print(f"Slides data structure: {json.dumps(slides_data[0] if slides_data else {}, indent=2)}", file=sys.stderr)
-
-        # 各スライドの翻訳を適用
-        for slide_data in slides_data:
+        # 各スライドの翻訳を読み込んだ順に適用する（NDJSONの場合は1行ずつ読み込む）
+        for position, slide_data in enumerate(iter_slide_payload(payload_source)):
+            if position == 0:
+                # スライドデータの構造をデバッグ出力
+                print(f"Slides data structure: {json.dumps(slide_data, indent=2)}", file=sys.stderr)
             slide_index = slide_data.get('index', 0)
             if slide_index < len(prs.slides):
                 print(f"\nProcessing slide {slide_index}", file=sys.stderr)
@@ -264,6 +403,8 @@ def main():
         print(f"Error: {str(e)}", file=sys.stderr)
         print(json.dumps({"error": str(e)}))
         sys.exit(1)
+    finally:
+        close_presentation(prs)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
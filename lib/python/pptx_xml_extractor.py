@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+lxmlによるテキスト抽出エンジン
+python-pptxのプロキシオブジェクトを経由せず、スライドのXMLを事前コンパイルしたXPathで1回だけ走査して
+pptx_parser.extract_text_from_shape と同じ形式のテキスト情報を生成する
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+from typing import List, Dict, Any, Optional
+from lxml import etree
+from pptx import Presentation
+from pptx.enum.text import PP_ALIGN, MSO_AUTO_SIZE, MSO_UNDERLINE
+from pptx.oxml.simpletypes import (
+    XsdBoolean, ST_TextFontSize, ST_TextIndentLevelType,
+    ST_TextSpacingPercentOrPercentString, ST_TextSpacingPoint
+)
+from pptx.shapes.shapetree import SlideShapeFactory
+from lib.python.coordinate_transform import Affine, IDENTITY, group_child_affine, to_slide_position
+from lib.python.style_resolver import StyleResolver, paragraph_style_summary
+from lib.python.reading_order import is_vertical_text
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('pptx_xml_extractor')
+
+NAMESPACES = {
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+}
+
+EMU_PER_POINT = 12700
+# 項目の指定がない場合はすべて抽出する（pptx_parser.EXTRACTION_PROFILES['full'] と同じ）
+ALL_FIELDS = frozenset(('fonts', 'paragraph_styles', 'bullets', 'resolved_styles',
+                        'shapes', 'shape_styles', 'shape_geometry', 'background'))
+EMU_PER_CENTIPOINT = 127
+
+def _xpath(expression: str) -> etree.XPath:
+    return etree.XPath(expression, namespaces=NAMESPACES)
+
+# 事前コンパイルしたXPath
+XP_SHAPE_TREE = _xpath('./p:cSld/p:spTree')
+XP_SHAPES = _xpath('./p:sp|./p:grpSp|./p:graphicFrame|./p:cxnSp|./p:pic|./p:contentPart')
+XP_SP_OFF = _xpath('./p:spPr/a:xfrm/a:off')
+XP_SP_EXT = _xpath('./p:spPr/a:xfrm/a:ext')
+XP_GRP_OFF = _xpath('./p:grpSpPr/a:xfrm/a:off')
+XP_GRP_EXT = _xpath('./p:grpSpPr/a:xfrm/a:ext')
+XP_FRAME_OFF = _xpath('./p:xfrm/a:off')
+XP_FRAME_EXT = _xpath('./p:xfrm/a:ext')
+XP_SHAPE_ID = _xpath('./p:nvSpPr/p:cNvPr/@id')
+XP_PLACEHOLDER = _xpath('./p:nvSpPr/p:nvPr/p:ph')
+XP_TX_BODY = _xpath('./p:txBody')
+XP_BODY_PR = _xpath('./a:bodyPr')
+XP_TABLE_ROWS = _xpath('./a:graphic/a:graphicData/a:tbl/a:tr')
+XP_TABLE_CELLS = _xpath('./a:tc')
+XP_CELL_TX_BODY = _xpath('./a:txBody')
+XP_PARAGRAPHS = _xpath('./a:p')
+XP_PARAGRAPH_CONTENT = _xpath('./a:r|./a:br|./a:fld')
+XP_PPR = _xpath('./a:pPr')
+XP_LINE_SPACING_POINTS = _xpath('./a:lnSpc/a:spcPts/@val')
+XP_LINE_SPACING_PERCENT = _xpath('./a:lnSpc/a:spcPct/@val')
+XP_SPACE_BEFORE = _xpath('./a:spcBef/a:spcPts/@val')
+XP_SPACE_AFTER = _xpath('./a:spcAft/a:spcPts/@val')
+XP_RUN_PROPERTIES = _xpath('./a:rPr')
+XP_TEXT = _xpath('string(./a:t)')
+XP_LATIN_TYPEFACE = _xpath('./a:latin/@typeface')
+XP_SOLID_RGB = _xpath('./a:solidFill/a:srgbClr/@val')
+
+TAG_SP = etree.QName(NAMESPACES['p'], 'sp').text
+TAG_GRP_SP = etree.QName(NAMESPACES['p'], 'grpSp').text
+TAG_GRAPHIC_FRAME = etree.QName(NAMESPACES['p'], 'graphicFrame').text
+TAG_BR = etree.QName(NAMESPACES['a'], 'br').text
+TAG_R = etree.QName(NAMESPACES['a'], 'r').text
+
+# bodyPrの子要素 -> 自動調整設定（python-pptxのTextFrame.auto_sizeと同じ表記）
+AUTO_SIZE_TAGS = {
+    etree.QName(NAMESPACES['a'], 'noAutofit').text: MSO_AUTO_SIZE.NONE,
+    etree.QName(NAMESPACES['a'], 'spAutoFit').text: MSO_AUTO_SIZE.SHAPE_TO_FIT_TEXT,
+    etree.QName(NAMESPACES['a'], 'normAutofit').text: MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+}
+
+def _first(values: list):
+    return values[0] if values else None
+
+def _emu(value: Optional[str]) -> Optional[int]:
+    return int(value) if value is not None else None
+
+def _centipoints(value: str) -> int:
+    # python-pptxのCentipointsと同じ丸め
+    return int(int(value) * EMU_PER_CENTIPOINT)
+
+def paragraph_text(p) -> str:
+    """段落のテキスト（改行要素は垂直タブ）"""
+    return ''.join('\v' if child.tag == TAG_BR else XP_TEXT(child) for child in XP_PARAGRAPH_CONTENT(p))
+
+def extract_font_info(r) -> Dict[str, Any]:
+    """
+    ランのフォント情報を抽出する（pptx_parser.extract_font_info と同じ形式）
+
+    Args:
+        r: a:r 要素
+
+    Returns:
+        フォント情報
+    """
+    font_info = {}
+    rPr = _first(XP_RUN_PROPERTIES(r))
+    if rPr is None:
+        return font_info
+
+    sz = rPr.get('sz')
+    if sz is not None:
+        size = _centipoints(ST_TextFontSize.from_xml(sz))
+        if size:
+            font_info["size"] = size / EMU_PER_POINT
+
+    name = _first(XP_LATIN_TYPEFACE(rPr))
+    if name:
+        font_info["name"] = name
+
+    for attribute, key in (('b', 'bold'), ('i', 'italic')):
+        value = rPr.get(attribute)
+        if value is not None:
+            font_info[key] = XsdBoolean.from_xml(value)
+
+    underline = rPr.get('u')
+    if underline is not None:
+        underline = MSO_UNDERLINE.from_xml(underline)
+        if underline == MSO_UNDERLINE.NONE:
+            font_info["underline"] = False
+        elif underline == MSO_UNDERLINE.SINGLE_LINE:
+            font_info["underline"] = True
+        else:
+            font_info["underline"] = underline
+
+    rgb = _first(XP_SOLID_RGB(rPr))
+    if rgb:
+        font_info["color"] = f'#{rgb.upper()}'
+
+    return font_info
+
+def extract_text_style(p, fields: frozenset = ALL_FIELDS) -> Dict[str, Any]:
+    """
+    段落のスタイル情報を抽出する（pptx_parser.extract_text_style と同じ形式）
+
+    Args:
+        p: a:p 要素
+        fields: 抽出する項目（paragraph_stylesで配置・行間など、fontsで最初のランのフォント）
+
+    Returns:
+        スタイル情報
+    """
+    style_info = {}
+    pPr = _first(XP_PPR(p))
+    level = 0
+
+    if pPr is not None and 'paragraph_styles' in fields:
+        alignment = pPr.get('algn')
+        if alignment is not None:
+            style_info["alignment"] = str(PP_ALIGN.from_xml(alignment))
+
+        points = _first(XP_LINE_SPACING_POINTS(pPr))
+        if points is not None:
+            line_spacing = int(ST_TextSpacingPoint.from_xml(points))
+        else:
+            percent = _first(XP_LINE_SPACING_PERCENT(pPr))
+            line_spacing = ST_TextSpacingPercentOrPercentString.from_xml(percent) if percent is not None else None
+        if line_spacing:
+            style_info["line_spacing"] = line_spacing
+
+        for xpath, key in ((XP_SPACE_BEFORE, "space_before"), (XP_SPACE_AFTER, "space_after")):
+            value = _first(xpath(pPr))
+            spacing = int(ST_TextSpacingPoint.from_xml(value)) if value is not None else None
+            if spacing:
+                style_info[key] = spacing
+
+    if pPr is not None and pPr.get('lvl') is not None:
+        level = ST_TextIndentLevelType.from_xml(pPr.get('lvl'))
+
+    style_info["level"] = level
+
+    # フォントの基本情報を取得（最初のランから）
+    first_run = next((child for child in p if child.tag == TAG_R), None) if 'fonts' in fields else None
+    if first_run is not None:
+        base_font = extract_font_info(first_run)
+        if base_font.get("name"):
+            style_info["font_name"] = base_font["name"]
+        if base_font.get("size"):
+            style_info["font_size"] = base_font["size"]
+
+    return style_info
+
+def extract_paragraphs(txBody, with_bullets: bool = True, with_index: bool = True,
+                       style_context=None, sp=None, fields: frozenset = ALL_FIELDS) -> List[Dict[str, Any]]:
+    """
+    テキスト本体から段落とランの情報を抽出する
+
+    Args:
+        txBody: p:txBody または a:txBody 要素
+        with_bullets: 箇条書き情報を段落スタイルに加えるか
+        with_index: 段落のインデックスを含めるか
+        style_context: 継承した書式を解決するSlideStyleContext（省略可）
+        sp: テキスト本体を含むp:sp要素（表のセルの場合はNone）
+        fields: 抽出する項目（pptx_parser.EXTRACTION_FIELDS）
+
+    Returns:
+        段落情報のリスト
+    """
+    paragraphs_info = []
+    for p_idx, p in enumerate(XP_PARAGRAPHS(txBody)):
+        text = paragraph_text(p).strip()
+        if not text:
+            continue
+
+        paragraph_style = extract_text_style(p, fields)
+        if with_bullets and 'bullets' in fields and paragraph_style["level"] > 0:
+            paragraph_style["has_bullet"] = True
+        resolved_style = style_context.resolve_paragraph(sp, p, paragraph_style["level"]) if style_context else None
+
+        runs_info = []
+        for r_idx, r in enumerate(child for child in p if child.tag == TAG_R):
+            run_text = XP_TEXT(r).strip()
+            if not run_text:
+                continue
+            run_info = {
+                "text": run_text,
+                "index": r_idx
+            }
+            if 'fonts' in fields:
+                run_info["font"] = extract_font_info(r)
+            if resolved_style:
+                run_info["resolved_font"] = style_context.resolve_run(resolved_style, r)
+            runs_info.append(run_info)
+
+        paragraph_info = {
+            "text": text,
+            "style": paragraph_style,
+            "runs": runs_info
+        }
+        if with_index:
+            paragraph_info["index"] = p_idx
+        if resolved_style:
+            paragraph_info["resolved_style"] = paragraph_style_summary(resolved_style)
+        paragraphs_info.append(paragraph_info)
+    return paragraphs_info
+
+def _text_body_text(txBody) -> str:
+    if txBody is None:
+        return ''
+    return '\n'.join(paragraph_text(p) for p in XP_PARAGRAPHS(txBody))
+
+def _extract_table(frame, z_order: float, parent_transform: Optional[Affine], style_context=None,
+                   fields: frozenset = ALL_FIELDS) -> Optional[Dict[str, Any]]:
+    rows = XP_TABLE_ROWS(frame)
+    off = _first(XP_FRAME_OFF(frame))
+    ext = _first(XP_FRAME_EXT(frame))
+    table_data = {
+        "type": "table",
+        "rows": [],
+        "position": to_slide_position(
+            _emu(off.get('x')) if off is not None else None,
+            _emu(off.get('y')) if off is not None else None,
+            _emu(ext.get('cx')) if ext is not None else None,
+            _emu(ext.get('cy')) if ext is not None else None,
+            parent_transform
+        )
+    }
+    table_data["position"]["z_order"] = z_order
+
+    for i, tr in enumerate(rows):
+        row_data = []
+        for j, tc in enumerate(XP_TABLE_CELLS(tr)):
+            txBody = _first(XP_CELL_TX_BODY(tc))
+            cell_text = _text_body_text(txBody).strip()
+            if not cell_text:
+                row_data.append(None)  # 空のセル
+                continue
+
+            cell_paragraphs = [paragraph for paragraph in extract_paragraphs(txBody, with_bullets=False, with_index=False,
+                                                                             style_context=style_context, fields=fields)
+                               if paragraph["runs"]]
+            row_data.append({
+                "text": cell_text,
+                "paragraphs": cell_paragraphs,
+                "position": {
+                    "row": i,
+                    "column": j
+                }
+            })
+        table_data["rows"].append(row_data)
+
+    return table_data
+
+def _extract_text_shape(sp, slide, z_order: float, parent_transform: Optional[Affine],
+                        style_context=None, fields: frozenset = ALL_FIELDS) -> Optional[Dict[str, Any]]:
+    txBody = _first(XP_TX_BODY(sp))
+    text = _text_body_text(txBody).strip()
+    if not text:
+        return None
+
+    shape_id = _first(XP_SHAPE_ID(sp))
+    off = _first(XP_SP_OFF(sp))
+    ext = _first(XP_SP_EXT(sp))
+    left = _emu(off.get('x')) if off is not None else None
+    top = _emu(off.get('y')) if off is not None else None
+    width = _emu(ext.get('cx')) if ext is not None else None
+    height = _emu(ext.get('cy')) if ext is not None else None
+
+    # 位置を持たないプレースホルダーはレイアウト・マスターから継承する
+    if None in (left, top, width, height) and XP_PLACEHOLDER(sp):
+        if style_context is not None:
+            inherited = style_context.placeholder_geometry(sp) or (None, None, None, None)
+        elif slide is not None:
+            # スタイル解決を使わない場合はpython-pptxで求める
+            proxy = SlideShapeFactory(sp, slide.shapes)
+            inherited = (proxy.left, proxy.top, proxy.width, proxy.height)
+        else:
+            inherited = (None, None, None, None)
+        left = inherited[0] if left is None else left
+        top = inherited[1] if top is None else top
+        width = inherited[2] if width is None else width
+        height = inherited[3] if height is None else height
+
+    # グループ内の場合はスライド座標に変換する
+    text_info = {
+        "text": text,
+        "type": "text",
+        "shape_id": int(shape_id) if shape_id is not None else None,
+        "position": to_slide_position(left, top, width, height, parent_transform)
+    }
+    text_info["position"]["z_order"] = z_order
+
+    bodyPr = _first(XP_BODY_PR(txBody))
+    auto_size = None
+    if bodyPr is not None:
+        auto_size = next((AUTO_SIZE_TAGS[child.tag] for child in bodyPr if child.tag in AUTO_SIZE_TAGS), None)
+    text_info["auto_size"] = str(auto_size)
+    # 縦書きかどうか（読み順の決定に使う）
+    text_info["vertical"] = is_vertical_text(bodyPr)
+
+    paragraphs_info = extract_paragraphs(txBody, style_context=style_context if 'resolved_styles' in fields else None,
+                                         sp=sp, fields=fields)
+    if paragraphs_info:
+        text_info["paragraphs"] = paragraphs_info
+
+    return text_info
+
+def extract_shape_element(element, slide=None, z_order: float = 0,
+                          parent_transform: Optional[Affine] = None, style_context=None,
+                          fields: frozenset = ALL_FIELDS) -> Optional[Dict[str, Any]]:
+    """
+    シェイプ要素からテキストを抽出する（pptx_parser.extract_text_from_shape と同じ形式）
+
+    Args:
+        element: p:sp / p:grpSp / p:graphicFrame などの要素
+        slide: プレースホルダーの位置継承に使うスライド（省略可）
+        z_order: Z順序
+        parent_transform: グループの子座標からスライド座標への変換（グループ内の要素用）
+        style_context: 継承した書式を解決するSlideStyleContext（省略可）
+        fields: 抽出する項目（pptx_parser.EXTRACTION_FIELDS）
+
+    Returns:
+        テキスト情報、またはNone
+    """
+    tag = element.tag
+    if tag == TAG_GRP_SP:
+        off = _first(XP_GRP_OFF(element))
+        ext = _first(XP_GRP_EXT(element))
+        group_position = to_slide_position(
+            _emu(off.get('x')) if off is not None else None,
+            _emu(off.get('y')) if off is not None else None,
+            _emu(ext.get('cx')) if ext is not None else None,
+            _emu(ext.get('cy')) if ext is not None else None,
+            parent_transform
+        )
+        group_position['z_order'] = z_order
+        child_transform = group_child_affine(element, parent_transform or IDENTITY)
+        group_elements = []
+        for i, child in enumerate(XP_SHAPES(element)):
+            # 子要素のZ順序は親のZ順序 + インデックスで計算
+            child_element = extract_shape_element(child, slide, z_order + i / 1000.0, child_transform, style_context, fields)
+            if child_element:
+                group_elements.append(child_element)
+        if group_elements:
+            return {
+                "type": "group",
+                "elements": group_elements,
+                "position": group_position
+            }
+        return None
+
+    if tag == TAG_GRAPHIC_FRAME:
+        table_context = style_context if 'resolved_styles' in fields else None
+        return _extract_table(element, z_order, parent_transform, table_context, fields) if XP_TABLE_ROWS(element) else None
+
+    if tag == TAG_SP:
+        return _extract_text_shape(element, slide, z_order, parent_transform, style_context, fields)
+
+    return None
+
+def extract_text_elements(slide, style_context=None, fields: frozenset = ALL_FIELDS) -> List[Optional[Dict[str, Any]]]:
+    """
+    スライドの各シェイプのテキスト情報を抽出する
+
+    Args:
+        slide: スライドオブジェクト
+        style_context: 継承した書式を解決するSlideStyleContext（省略可）
+        fields: 抽出する項目（pptx_parser.EXTRACTION_FIELDS）
+
+    Returns:
+        シェイプ順（slide.shapesと同じ順序）のテキスト情報のリスト。テキストがないシェイプはNone
+    """
+    results = []
+    for tree in XP_SHAPE_TREE(slide._element):
+        for shape_idx, element in enumerate(XP_SHAPES(tree)):
+            try:
+                results.append(extract_shape_element(element, slide, shape_idx, style_context=style_context, fields=fields))
+            except Exception as e:
+                logger.warning(f"Error extracting text from shape {shape_idx}: {str(e)}")
+                results.append(None)
+    return results
+
+def compare_engines(file_path: str, text_only: bool = True) -> List[str]:
+    """
+    python-pptxエンジンとlxmlエンジンの抽出結果を比較する
+
+    Args:
+        file_path: PPTXファイルのパス
+        text_only: テキスト要素のみを比較するか
+
+    Returns:
+        差異の説明のリスト（一致する場合は空）
+    """
+    from lib.python.pptx_parser import extract_slide
+
+    differences = []
+    presentation = Presentation(file_path)
+    resolver = StyleResolver(presentation)
+    for index, slide in enumerate(presentation.slides):
+        results = {}
+        for engine in ('python-pptx', 'lxml'):
+            slide_data = extract_slide(
+                slide, index, presentation.slide_width, presentation.slide_height,
+                text_only=text_only, engine=engine, style_context=resolver.slide_context(slide)
+            )
+            # 列挙型などはJSONに変換した形で比較する
+            results[engine] = json.loads(json.dumps(slide_data, ensure_ascii=False, default=str))
+        if results['python-pptx'] != results['lxml']:
+            for key in results['python-pptx']:
+                if results['python-pptx'][key] != results['lxml'].get(key):
+                    differences.append(f"slide {index + 1}: '{key}' differs")
+    return differences
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='lxml extraction engine parity check')
+    parser.add_argument('file_paths', nargs='+', help='PPTX files to compare')
+    parser.add_argument('--full', action='store_true', help='Compare all elements, not only text elements')
+    args = parser.parse_args()
+
+    failed = False
+    for file_path in args.file_paths:
+        if not os.path.exists(file_path):
+            print(f"Error: Input file '{file_path}' does not exist", file=sys.stderr)
+            failed = True
+            continue
+        differences = compare_engines(file_path, text_only=not args.full)
+        for difference in differences:
+            print(f"{file_path}: {difference}")
+        if differences:
+            failed = True
+        else:
+            print(f"{file_path}: OK")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+読み順決定モジュール
+スライド上のテキスト要素（テキスト・テーブル・グループ）の矩形をXY-cut法で再帰的に行・段に分割し、
+段組みのレイアウトでも人が読む順序に並べる
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('reading_order')
+
+# 隣り合う行・段の重なりをこの割合（スライドの高さ・幅に対する比）まで許容して分割する
+OVERLAP_TOLERANCE = 0.01
+
+# 縦書きを表す a:bodyPr の vert 属性の値（horz・省略時は横書き）
+VERTICAL_TEXT_TYPES = frozenset(('vert', 'vert270', 'eaVert', 'wordArtVert', 'wordArtVertRtl', 'mongolianVert'))
+
+# 分割に使う軸の定義: (開始座標のインデックス, 長さのインデックス)
+AXIS_Y = (1, 3)
+AXIS_X = (0, 2)
+
+Box = Tuple[float, float, float, float]
+# (矩形, 要素のインデックス)
+Item = Tuple[Box, int]
+
+def is_vertical_text(bodyPr) -> bool:
+    """
+    テキストボックスが縦書きかどうかを判定する（抽出結果の vertical に使う）
+
+    Args:
+        bodyPr: a:bodyPr 要素（Noneの場合は横書き）
+
+    Returns:
+        vert 属性が縦書きの値の場合はTrue
+    """
+    return bodyPr is not None and bodyPr.get('vert') in VERTICAL_TEXT_TYPES
+
+def _element_box(elem: Dict[str, Any]) -> Optional[Box]:
+    position = elem.get('position')
+    if not isinstance(position, dict) or position.get('x') is None or position.get('y') is None:
+        return None
+    return (position['x'], position['y'], position.get('width') or 0, position.get('height') or 0)
+
+def _split(ordered: List[Item], axis: Tuple[int, int],
+           tolerance: float) -> Tuple[List[List[Item]], float]:
+    """
+    矩形を指定した軸への射影の最も広い隙間で分割する（終端の最大値を1回走査する）
+
+    狭い隙間で先に分割すると、段の途中の隙間で別の段の要素と切り離されるため、
+    最も広い隙間（と同じ幅の隙間）でのみ分割し、残りは分割後の領域で改めて判定する
+
+    Args:
+        ordered: 軸の開始座標でソート済みの (矩形, 要素のインデックス) のリスト
+        axis: AXIS_Y（行に分割）または AXIS_X（段に分割）
+        tolerance: 隙間とみなす重なりの許容量
+
+    Returns:
+        (軸の昇順に並んだグループのリスト, 最も広い隙間の幅)（分割できない場合はグループが1つ）
+        各グループはorderedの連続した区間なので、ソート済みのまま次の分割に使える
+    """
+    start, length = axis
+    # (分割位置, 隙間の幅)
+    cuts = []
+    max_end = ordered[0][0][start] + ordered[0][0][length]
+    for position in range(1, len(ordered)):
+        box = ordered[position][0]
+        if box[start] >= max_end - tolerance:
+            cuts.append((position, box[start] - max_end))
+        max_end = max(max_end, box[start] + box[length])
+    if not cuts:
+        return [ordered], float('-inf')
+
+    widest_gap = max(gap for _, gap in cuts)
+    groups = []
+    previous = 0
+    for position, gap in cuts:
+        if gap >= widest_gap - tolerance:
+            groups.append(ordered[previous:position])
+            previous = position
+    groups.append(ordered[previous:])
+    return groups, widest_gap
+
+def _partition(ordered: List[Item], groups: List[List[Item]]) -> List[List[Item]]:
+    # もう一方の軸でソート済みのリストを、順序を保ったまま分割後のグループに振り分ける
+    group_of = {}
+    for number, group in enumerate(groups):
+        for _, index in group:
+            group_of[index] = number
+    partitioned = [[] for _ in groups]
+    for item in ordered:
+        partitioned[group_of[item[1]]].append(item)
+    return partitioned
+
+def order_text_elements(elements: List[Dict[str, Any]], slide_width: float, slide_height: float) -> List[Dict[str, Any]]:
+    """
+    テキスト要素を読み順に並べる
+
+    各領域は行と段のうち隙間の広い方で分割する（同じ幅なら横書きは行、縦書きは段を優先する）。
+    横書きの領域は上の行・左の段から、縦書きが過半数の領域は右の段・上の行から読む。
+    行にも段にも分割できない（重なり合う）要素は、従来どおり位置 (y, x) / (-x, y) の順に並べる。
+    開始座標によるソートは軸ごとに最初の1回だけ行い、分割後の領域にはソート済みの順序のまま振り分けるため、
+    数百個の図形を含むスライドでも O(n log n) 程度で処理できる。
+
+    Args:
+        elements: テキスト要素のリスト（positionにスライド座標のx, y, width, heightを持つ）
+        slide_width: スライドの幅（EMU）
+        slide_height: スライドの高さ（EMU）
+
+    Returns:
+        読み順に並べたテキスト要素のリスト（位置のない要素は元の順序で末尾に置く）
+    """
+    items = []
+    unpositioned = []
+    for index, elem in enumerate(elements):
+        box = _element_box(elem)
+        if box is None:
+            unpositioned.append(elem)
+        else:
+            items.append((box, index))
+    if len(items) <= 1:
+        return [elements[index] for _, index in items] + unpositioned
+
+    row_tolerance = (slide_height or 0) * OVERLAP_TOLERANCE
+    column_tolerance = (slide_width or 0) * OVERLAP_TOLERANCE
+    is_vertical = [elem.get('type') == 'text' and bool(elem.get('vertical')) for elem in elements]
+
+    order = []
+    # 領域は (y, x) 順と (x, y) 順にソート済みの2つのリストで表す
+    by_y = sorted(items, key=lambda item: (item[0][1], item[0][0]))
+    by_x = sorted(items, key=lambda item: (item[0][0], item[0][1]))
+    # 深い入れ子でも再帰の上限に達しないよう、明示的なスタックで領域を処理する
+    stack = [(by_y, by_x)]
+    while stack:
+        by_y, by_x = stack.pop()
+        if len(by_y) == 1:
+            order.append(by_y[0][1])
+            continue
+
+        vertical = sum(is_vertical[index] for _, index in by_y) * 2 > len(by_y)
+        rows, row_gap = _split(by_y, AXIS_Y, row_tolerance)
+        columns, column_gap = _split(by_x, AXIS_X, column_tolerance)
+        if vertical:
+            # 縦書きの段は右から左に読む
+            columns.reverse()
+            use_columns = len(columns) > 1 and (len(rows) == 1 or column_gap >= row_gap)
+        else:
+            use_columns = len(columns) > 1 and (len(rows) == 1 or column_gap > row_gap)
+
+        if use_columns:
+            regions = list(zip(_partition(by_y, columns), columns))
+        elif len(rows) > 1:
+            regions = list(zip(rows, _partition(by_x, rows)))
+        else:
+            regions = None
+        if regions:
+            # 先頭の領域を先に処理するため逆順に積む
+            stack.extend(reversed(regions))
+            continue
+
+        # 分割できない領域は位置の順に並べる（横書きは (y, x) 順のリストをそのまま使う）
+        if vertical:
+            by_y = sorted(by_x, key=lambda item: (-item[0][0], item[0][1]))
+        order.extend(index for _, index in by_y)
+
+    return [elements[index] for index in order] + unpositioned
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+解析結果のシリアライズモジュール
+orjson / msgpack がインストールされていれば使用し、なければ標準ライブラリのjsonで出力する
+"""
+
+import json
+import logging
+from typing import Any
+
+# 高速なエンコーダはオプション（インストールされていない環境では標準ライブラリを使う）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('serializer')
+
+ENCODINGS = ('json', 'msgpack')
+
+def dumps(data: Any, indent: bool = False) -> str:
+    """
+    JSON文字列に変換する（非ASCII文字はエスケープしない）
+
+    Args:
+        data: 変換するデータ
+        indent: 2スペースでインデントするか（Falseの場合は空白なしで出力）
+
+    Returns:
+        JSON文字列
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(data, option=option).decode('utf-8')
+        except TypeError as e:
+            # orjsonが扱えない型（64bitを超える整数など）は標準ライブラリに任せる
+            logger.debug(f"orjson could not encode data, falling back to json: {str(e)}")
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+def encode(data: Any, encoding: str = 'json', indent: bool = False) -> bytes:
+    """
+    指定形式のバイト列に変換する
+
+    Args:
+        data: 変換するデータ
+        encoding: 出力形式 ('json', 'msgpack')
+        indent: JSONの場合に2スペースでインデントするか
+
+    Returns:
+        エンコードされたバイト列
+
+    Raises:
+        ValueError: msgpackが指定されたが、msgpackがインストールされていない場合
+    """
+    if encoding == 'msgpack':
+        # 別の形式で出力すると受け取る側でデコードできないため、JSONに切り替えない
+        if not MSGPACK_AVAILABLE:
+            raise ValueError("msgpack output requires the msgpack package")
+        return msgpack.packb(data, use_bin_type=True)
+    return dumps(data, indent=indent).encode('utf-8')
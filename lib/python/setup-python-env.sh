@@ -37,6 +37,13 @@ pip install python-pptx pdf2image Pillow numpy
 echo "画像処理用パッケージをインストールしています..."
 pip install pillow-heif webp
 
+# LibreOfficeの常駐インスタンスを使うには、unoモジュールをインポートできるPythonが必要
+# （venvからは使えないため、LibreOffice同梱のPythonかpython3-unoを入れたシステムのPythonを使う）
+if ! command -v python3 >/dev/null 2>&1 || ! python3 -c "import uno" >/dev/null 2>&1; then
+    echo "注意: unoモジュールが見つかりません。LibreOfficeを常駐させて変換するには python3-uno をインストールするか"
+    echo "      （例: sudo apt-get install python3-uno）、LIBREOFFICE_PYTHON にLibreOffice同梱のPythonを指定してください。"
+fi
+
 echo "インストールされたパッケージ:"
 pip list
 
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+スタイル継承の解決モジュール
+ラン → 段落 → シェイプ → レイアウトのプレースホルダー → マスター → テーマ の順に書式を辿り、
+実際に表示されるフォント・色・段落書式とプレースホルダーの位置を求める
+
+レイアウト・マスター・テーマから継承する部分はパーツごとにメモ化するため、
+同じテンプレートの大きなデッキでもランごとの処理は辞書の参照と直接指定された書式の上書きだけになる
+"""
+
+import colorsys
+import logging
+from typing import Dict, Any, Optional, Tuple
+from lxml import etree
+from pptx.enum.dml import MSO_THEME_COLOR
+from pptx.enum.text import PP_ALIGN, MSO_UNDERLINE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.simpletypes import (
+    XsdBoolean, ST_TextFontSize, ST_TextSpacingPercentOrPercentString, ST_TextSpacingPoint
+)
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('style_resolver')
+
+NAMESPACES = {
+    'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'
+}
+
+EMU_PER_CENTIPOINT = 127
+# 書式がどこにも指定されていない場合の既定値（ECMA-376の既定値）
+DEFAULT_FONT_SIZE = 18.0
+DEFAULT_ALIGNMENT = PP_ALIGN.LEFT
+
+def _xpath(expression: str) -> etree.XPath:
+    return etree.XPath(expression, namespaces=NAMESPACES)
+
+XP_PH = _xpath('./p:nvSpPr/p:nvPr/p:ph')
+XP_SP_XFRM = _xpath('./p:spPr/a:xfrm')
+XP_LST_STYLE = _xpath('./p:txBody/a:lstStyle')
+XP_PPR = _xpath('./a:pPr')
+XP_RPR = _xpath('./a:rPr')
+XP_CLR_MAP = _xpath('./p:clrMap')
+XP_CLR_MAP_OVERRIDE = _xpath('./p:clrMapOvr/a:overrideClrMapping')
+XP_TX_STYLES = _xpath('./p:txStyles')
+XP_DEFAULT_TEXT_STYLE = _xpath('./p:defaultTextStyle')
+XP_LAYOUT_SHAPES = _xpath('./p:cSld/p:spTree//p:sp')
+XP_COLOR_SCHEME = _xpath('./a:themeElements/a:clrScheme')
+XP_MAJOR_FONT = _xpath('./a:themeElements/a:fontScheme/a:majorFont')
+XP_MINOR_FONT = _xpath('./a:themeElements/a:fontScheme/a:minorFont')
+XP_BACKGROUND = _xpath('./p:cSld/p:bg')
+XP_STYLE = _xpath('./p:style')
+
+TAG_LATIN = etree.QName(NAMESPACES['a'], 'latin').text
+TAG_EA = etree.QName(NAMESPACES['a'], 'ea').text
+TAG_SOLID_FILL = etree.QName(NAMESPACES['a'], 'solidFill').text
+TAG_DEF_RPR = etree.QName(NAMESPACES['a'], 'defRPr').text
+TAG_LN_SPC = etree.QName(NAMESPACES['a'], 'lnSpc').text
+TAG_SPC_BEF = etree.QName(NAMESPACES['a'], 'spcBef').text
+TAG_SPC_AFT = etree.QName(NAMESPACES['a'], 'spcAft').text
+
+# タイトル系のプレースホルダー（マスターのtitleStyleとテーマの見出しフォントを使う）
+TITLE_TYPES = ('title', 'ctrTitle')
+# マスターのotherStyleを使うプレースホルダー
+OTHER_TYPES = ('dt', 'ftr', 'sldNum', 'hdr')
+# レイアウトのプレースホルダーが継承するマスターのプレースホルダーの種類（python-pptxと同じ対応）
+MASTER_TYPE = {'ctrTitle': 'title', 'title': 'title', 'dt': 'dt', 'ftr': 'ftr', 'sldNum': 'sldNum'}
+
+def _placeholder_key(sp) -> Optional[Tuple[str, int]]:
+    ph = next(iter(XP_PH(sp)), None)
+    if ph is None:
+        return None
+    return (ph.get('type', 'obj'), int(ph.get('idx', 0)))
+
+def _level_ppr(container, level: int):
+    """lstStyle・txStylesなどから指定レベルの lvlNpPr を取得する"""
+    if container is None:
+        return None
+    return container.find(f"a:lvl{level + 1}pPr", NAMESPACES)
+
+def _xfrm_box(sp) -> Optional[Tuple[int, int, int, int]]:
+    xfrm = next(iter(XP_SP_XFRM(sp)), None)
+    if xfrm is None:
+        return None
+    off = xfrm.find('a:off', NAMESPACES)
+    ext = xfrm.find('a:ext', NAMESPACES)
+    if off is None or ext is None:
+        return None
+    return (int(off.get('x')), int(off.get('y')), int(ext.get('cx')), int(ext.get('cy')))
+
+def _apply_modifiers(rgb: str, color_element) -> str:
+    # 明るさの調整（lumMod/lumOffはHSLの輝度、tint/shadeは白・黒との混合）
+    red, green, blue = (int(rgb[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    for modifier in color_element:
+        name = etree.QName(modifier).localname
+        value = int(modifier.get('val', 100000)) / 100000
+        if name in ('lumMod', 'lumOff'):
+            hue, lightness, saturation = colorsys.rgb_to_hls(red, green, blue)
+            lightness = lightness * value if name == 'lumMod' else lightness + value
+            red, green, blue = colorsys.hls_to_rgb(hue, min(max(lightness, 0.0), 1.0), saturation)
+        elif name == 'tint':
+            red, green, blue = (c + (1 - c) * (1 - value) for c in (red, green, blue))
+        elif name == 'shade':
+            red, green, blue = (c * value for c in (red, green, blue))
+    return ''.join(f"{round(min(max(c, 0.0), 1.0) * 255):02X}" for c in (red, green, blue))
+
+class ThemeInfo:
+    """テーマの配色とフォント"""
+
+    def __init__(self, theme_element):
+        self.colors: Dict[str, str] = {}
+        scheme = next(iter(XP_COLOR_SCHEME(theme_element)), None) if theme_element is not None else None
+        if scheme is not None:
+            for entry in scheme:
+                value = entry[0] if len(entry) else None
+                if value is None:
+                    continue
+                rgb = value.get('val') if etree.QName(value).localname == 'srgbClr' else value.get('lastClr')
+                if rgb:
+                    self.colors[etree.QName(entry).localname] = rgb.upper()
+
+        self.fonts: Dict[str, str] = {}
+        for prefix, xpath in (('mj', XP_MAJOR_FONT), ('mn', XP_MINOR_FONT)):
+            font = next(iter(xpath(theme_element)), None) if theme_element is not None else None
+            if font is None:
+                continue
+            for tag, suffix in ((TAG_LATIN, 'lt'), (TAG_EA, 'ea')):
+                child = font.find(tag)
+                if child is not None and child.get('typeface'):
+                    self.fonts[f'+{prefix}-{suffix}'] = child.get('typeface')
+
+class MasterStyles:
+    """マスターごとに共通の情報（配色の対応、テーマ、テキストスタイル、プレースホルダー）"""
+
+    def __init__(self, master_part, theme: ThemeInfo):
+        element = master_part._element
+        clr_map = next(iter(XP_CLR_MAP(element)), None)
+        self.color_map: Dict[str, str] = dict(clr_map.attrib) if clr_map is not None else {}
+        self.theme = theme
+        tx_styles = next(iter(XP_TX_STYLES(element)), None)
+        self.text_styles = {
+            'title': tx_styles.find('p:titleStyle', NAMESPACES) if tx_styles is not None else None,
+            'body': tx_styles.find('p:bodyStyle', NAMESPACES) if tx_styles is not None else None,
+            'other': tx_styles.find('p:otherStyle', NAMESPACES) if tx_styles is not None else None
+        }
+        self.placeholders = {}
+        for sp in XP_LAYOUT_SHAPES(element):
+            key = _placeholder_key(sp)
+            if key is not None:
+                self.placeholders.setdefault(key[0], sp)
+        self.background = next(iter(XP_BACKGROUND(element)), None)
+
+class StyleResolver:
+    """デッキ全体で共有するスタイル解決器（パーツごとの結果をメモ化する）"""
+
+    def __init__(self, presentation):
+        """
+        コンストラクタ
+
+        Args:
+            presentation: プレゼンテーションオブジェクト
+        """
+        self._default_text_style = next(iter(XP_DEFAULT_TEXT_STYLE(presentation.part._element)), None)
+        self._themes: Dict[str, ThemeInfo] = {}
+        self._masters: Dict[str, MasterStyles] = {}
+        self._layout_placeholders: Dict[str, Dict[Any, Any]] = {}
+        self._inherited: Dict[Any, Dict[str, Any]] = {}
+        self._geometry: Dict[Any, Optional[Tuple[int, int, int, int]]] = {}
+
+    def _master(self, master_part) -> MasterStyles:
+        partname = str(master_part.partname)
+        if partname not in self._masters:
+            theme_part = master_part.part_related_by(RT.THEME)
+            theme_name = str(theme_part.partname)
+            if theme_name not in self._themes:
+                self._themes[theme_name] = ThemeInfo(etree.fromstring(theme_part.blob))
+            self._masters[partname] = MasterStyles(master_part, self._themes[theme_name])
+        return self._masters[partname]
+
+    def _layout_placeholder(self, layout_part, key: Tuple[str, int]):
+        partname = str(layout_part.partname)
+        if partname not in self._layout_placeholders:
+            by_idx, by_type = {}, {}
+            for sp in XP_LAYOUT_SHAPES(layout_part._element):
+                layout_key = _placeholder_key(sp)
+                if layout_key is not None:
+                    by_idx.setdefault(layout_key[1], sp)
+                    by_type.setdefault(layout_key[0], sp)
+            self._layout_placeholders[partname] = {'idx': by_idx, 'type': by_type}
+        placeholders = self._layout_placeholders[partname]
+        # python-pptxと同様にidxで対応付け、タイトルなどidxのないものは種類で対応付ける
+        return placeholders['idx'].get(key[1]) if key[1] else placeholders['type'].get(key[0])
+
+    def slide_context(self, slide) -> 'SlideStyleContext':
+        """
+        スライド用のコンテキストを作成する
+
+        Args:
+            slide: スライドオブジェクト
+
+        Returns:
+            SlideStyleContext
+        """
+        layout_part = slide.part.slide_layout.part
+        master_part = layout_part.slide_master.part
+        return SlideStyleContext(self, slide, layout_part, self._master(master_part))
+
+class SlideStyleContext:
+    """1枚のスライドのスタイル解決（レイアウト・マスターの結果はStyleResolverでメモ化される）"""
+
+    def __init__(self, resolver: StyleResolver, slide, layout_part, master: MasterStyles):
+        self.resolver = resolver
+        self.slide_element = slide._element
+        self.layout_part = layout_part
+        self.master = master
+        # 配色の対応はレイアウト・スライドの上書きを優先する
+        self.color_map = dict(master.color_map)
+        for element in (layout_part._element, slide._element):
+            override = next(iter(XP_CLR_MAP_OVERRIDE(element)), None)
+            if override is not None:
+                self.color_map.update(override.attrib)
+
+    # 色
+
+    def scheme_color(self, name: str) -> Optional[str]:
+        """
+        テーマカラー名（accent1, tx1 など）をRGB値にする
+
+        Args:
+            name: テーマカラー名
+
+        Returns:
+            '#RRGGBB' 形式の色（解決できない場合はNone）
+        """
+        rgb = self.master.theme.colors.get(self.color_map.get(name, name))
+        return f'#{rgb}' if rgb else None
+
+    def theme_color(self, theme_color, brightness: float = 0) -> Optional[str]:
+        """
+        python-pptxのテーマカラー（MSO_THEME_COLOR）をRGB値にする
+
+        Args:
+            theme_color: ColorFormat.theme_color の値
+            brightness: ColorFormat.brightness の値（-1.0〜1.0）
+
+        Returns:
+            '#RRGGBB' 形式の色（解決できない場合はNone）
+        """
+        try:
+            resolved = self.scheme_color(MSO_THEME_COLOR.to_xml(theme_color))
+        except (KeyError, ValueError):
+            return None
+        if not resolved or not brightness:
+            return resolved
+        red, green, blue = (int(resolved[i:i + 2], 16) / 255 for i in (1, 3, 5))
+        hue, lightness, saturation = colorsys.rgb_to_hls(red, green, blue)
+        # PowerPointの明るさ指定（lumMod/lumOff）と同じ計算
+        lightness = lightness * (1 - brightness) + brightness if brightness > 0 else lightness * (1 + brightness)
+        return '#' + ''.join(f"{round(c * 255):02X}" for c in colorsys.hls_to_rgb(hue, lightness, saturation))
+
+    def resolve_color(self, fill) -> Optional[str]:
+        """
+        a:solidFill 要素の色をRGB値にする（テーマカラーと明るさの調整を含む）
+
+        Args:
+            fill: a:solidFill 要素
+
+        Returns:
+            '#RRGGBB' 形式の色（解決できない場合はNone）
+        """
+        if fill is None or not len(fill):
+            return None
+        color = fill[0]
+        kind = etree.QName(color).localname
+        if kind == 'srgbClr':
+            rgb = color.get('val')
+        elif kind == 'sysClr':
+            rgb = color.get('lastClr')
+        elif kind == 'schemeClr':
+            resolved = self.scheme_color(color.get('val'))
+            rgb = resolved[1:] if resolved else None
+        else:
+            rgb = None
+        if not rgb:
+            return None
+        return f'#{_apply_modifiers(rgb.upper(), color)}'
+
+    def style_color(self, element, reference: str) -> Optional[str]:
+        """
+        シェイプのスタイル（p:style の lnRef・fillRef・fontRef）が参照するテーマカラーをRGB値にする
+        spPrで線や塗りつぶし、ランで文字色が指定されていない場合、PowerPointはこの色で描画する
+
+        Args:
+            element: p:sp などのシェイプ要素
+            reference: 'lnRef'、'fillRef' または 'fontRef'
+
+        Returns:
+            '#RRGGBB' 形式の色（スタイルがない・idx="0"（なし）・解決できない場合はNone）
+        """
+        style = next(iter(XP_STYLE(element)), None)
+        ref = style.find(f'a:{reference}', NAMESPACES) if style is not None else None
+        if ref is None or ref.get('idx', '0') == '0':
+            return None
+        return self.resolve_color(ref)
+
+    def background_color(self) -> Optional[str]:
+        """
+        スライド・レイアウト・マスターの順に背景（p:bg）を探し、単色の場合はその色を返す
+        テーマの背景スタイルの参照（p:bgRef）は参照している色で近似する
+
+        Returns:
+            '#RRGGBB' 形式の色（単色でない・解決できない場合はNone）
+        """
+        background = next(iter(XP_BACKGROUND(self.slide_element)), None)
+        if background is None:
+            background = next(iter(XP_BACKGROUND(self.layout_part._element)), None)
+        if background is None:
+            background = self.master.background
+        if background is None:
+            return None
+        ref = background.find('p:bgRef', NAMESPACES)
+        if ref is not None:
+            return self.resolve_color(ref) if ref.get('idx', '0') != '0' else None
+        properties = background.find('p:bgPr', NAMESPACES)
+        return self.resolve_color(properties.find(TAG_SOLID_FILL)) if properties is not None else None
+
+    # 書式の読み取り
+
+    def _read_run_properties(self, rPr, props: Dict[str, Any]) -> None:
+        # 上位の階層で指定済みの項目は上書きしない
+        if rPr is None:
+            return
+        sz = rPr.get('sz')
+        if sz is not None and 'size' not in props:
+            props['size'] = int(ST_TextFontSize.from_xml(sz) * EMU_PER_CENTIPOINT) / 12700
+        for attribute, key in (('b', 'bold'), ('i', 'italic')):
+            value = rPr.get(attribute)
+            if value is not None and key not in props:
+                props[key] = XsdBoolean.from_xml(value)
+        underline = rPr.get('u')
+        if underline is not None and 'underline' not in props:
+            underline = MSO_UNDERLINE.from_xml(underline)
+            props['underline'] = (False if underline == MSO_UNDERLINE.NONE
+                                  else True if underline == MSO_UNDERLINE.SINGLE_LINE else underline)
+        for tag, key in ((TAG_LATIN, 'name'), (TAG_EA, 'east_asian_name')):
+            child = rPr.find(tag)
+            if child is not None and child.get('typeface') and key not in props:
+                props[key] = child.get('typeface')
+        fill = rPr.find(TAG_SOLID_FILL)
+        if fill is not None and 'color' not in props:
+            color = self.resolve_color(fill)
+            if color:
+                props['color'] = color
+
+    def _read_paragraph_properties(self, pPr, props: Dict[str, Any]) -> None:
+        if pPr is None:
+            return
+        alignment = pPr.get('algn')
+        if alignment is not None and 'alignment' not in props:
+            props['alignment'] = str(PP_ALIGN.from_xml(alignment))
+        for tag, key in ((TAG_LN_SPC, 'line_spacing'), (TAG_SPC_BEF, 'space_before'), (TAG_SPC_AFT, 'space_after')):
+            spacing = pPr.find(tag)
+            if spacing is None or key in props or not len(spacing):
+                continue
+            value = spacing[0].get('val')
+            if etree.QName(spacing[0]).localname == 'spcPts':
+                props[key] = int(ST_TextSpacingPoint.from_xml(value))
+            elif key == 'line_spacing':
+                props[key] = ST_TextSpacingPercentOrPercentString.from_xml(value)
+        self._read_run_properties(pPr.find(TAG_DEF_RPR), props.setdefault('font', {}))
+
+    # 継承
+
+    def _inherited(self, key: Optional[Tuple[str, int]], level: int) -> Dict[str, Any]:
+        """レイアウト・マスター・テーマから継承する書式（レイアウトごとにメモ化）"""
+        memo_key = (str(self.layout_part.partname), key, level)
+        cached = self.resolver._inherited.get(memo_key)
+        if cached is not None:
+            return cached
+
+        props: Dict[str, Any] = {'font': {}}
+        ph_type = key[0] if key else None
+        if key is not None:
+            layout_sp = self.resolver._layout_placeholder(self.layout_part, key)
+            master_sp = self.master.placeholders.get(MASTER_TYPE.get(ph_type, 'body'))
+            for sp in (layout_sp, master_sp):
+                if sp is not None:
+                    self._read_paragraph_properties(_level_ppr(next(iter(XP_LST_STYLE(sp)), None), level), props)
+            category = 'title' if ph_type in TITLE_TYPES else 'other' if ph_type in OTHER_TYPES else 'body'
+            self._read_paragraph_properties(_level_ppr(self.master.text_styles[category], level), props)
+        self._read_paragraph_properties(_level_ppr(self.resolver._default_text_style, level), props)
+
+        # テーマのフォントへの参照（+mj-lt など）と既定値
+        font = props['font']
+        theme = self.master.theme
+        prefix = 'mj' if ph_type in TITLE_TYPES else 'mn'
+        font.setdefault('name', f'+{prefix}-lt')
+        font.setdefault('east_asian_name', f'+{prefix}-ea')
+        for font_key in ('name', 'east_asian_name'):
+            font[font_key] = theme.fonts.get(font[font_key], font[font_key]) if font[font_key].startswith('+') else font[font_key]
+            if font[font_key].startswith('+'):
+                del font[font_key]
+        font.setdefault('size', DEFAULT_FONT_SIZE)
+        font.setdefault('bold', False)
+        font.setdefault('italic', False)
+        font.setdefault('underline', False)
+        if 'color' not in font:
+            color = self.scheme_color('tx1')
+            if color:
+                font['color'] = color
+        props.setdefault('alignment', str(DEFAULT_ALIGNMENT))
+
+        self.resolver._inherited[memo_key] = props
+        return props
+
+    def resolve_paragraph(self, sp, p, level: int) -> Dict[str, Any]:
+        """
+        段落の書式を解決する
+
+        Args:
+            sp: 段落を含むシェイプ要素（p:sp、表のセルの場合はNone）
+            p: a:p 要素
+            level: 段落のレベル
+
+        Returns:
+            {'alignment', 'line_spacing', 'space_before', 'space_after', 'font'}（fontはランの既定書式）
+        """
+        key = _placeholder_key(sp) if sp is not None else None
+        inherited = self._inherited(key, level)
+        # シェイプのスタイル（p:style/a:fontRef）の色は、マスター・既定のテキストスタイルの色より優先される
+        style_color = self.style_color(sp, 'fontRef') if sp is not None else None
+        if style_color and inherited['font'].get('color') != style_color:
+            inherited = {**inherited, 'font': {**inherited['font'], 'color': style_color}}
+        shape_ppr = _level_ppr(next(iter(XP_LST_STYLE(sp)), None), level) if sp is not None else None
+        paragraph_ppr = next(iter(XP_PPR(p)), None)
+        if shape_ppr is None and paragraph_ppr is None:
+            return inherited
+
+        # 段落・シェイプで直接指定された書式を優先し、残りを継承した書式で補う
+        props: Dict[str, Any] = {'font': {}}
+        self._read_paragraph_properties(paragraph_ppr, props)
+        self._read_paragraph_properties(shape_ppr, props)
+        for prop_key, value in inherited.items():
+            if prop_key == 'font':
+                props['font'] = {**value, **props['font']}
+            else:
+                props.setdefault(prop_key, value)
+        return props
+
+    def resolve_run(self, paragraph_props: Dict[str, Any], r) -> Dict[str, Any]:
+        """
+        ランのフォントを解決する
+
+        Args:
+            paragraph_props: resolve_paragraphの戻り値
+            r: a:r 要素
+
+        Returns:
+            {'size', 'name', 'east_asian_name', 'bold', 'italic', 'underline', 'color'}
+        """
+        rPr = next(iter(XP_RPR(r)), None)
+        if rPr is None or not (len(rPr) or rPr.attrib):
+            return dict(paragraph_props['font'])
+        font: Dict[str, Any] = {}
+        self._read_run_properties(rPr, font)
+        for key in ('name', 'east_asian_name'):
+            if key in font and font[key].startswith('+'):
+                font[key] = self.master.theme.fonts.get(font[key], font[key])
+        return {**paragraph_props['font'], **font}
+
+    def placeholder_geometry(self, sp) -> Optional[Tuple[int, int, int, int]]:
+        """
+        位置を持たないプレースホルダーの位置をレイアウト・マスターから求める（レイアウトごとにメモ化）
+
+        Args:
+            sp: p:sp 要素
+
+        Returns:
+            (x, y, width, height)（EMU、プレースホルダーでない場合はNone）
+        """
+        key = _placeholder_key(sp)
+        if key is None:
+            return None
+        memo_key = (str(self.layout_part.partname), key)
+        if memo_key not in self.resolver._geometry:
+            layout_sp = self.resolver._layout_placeholder(self.layout_part, key)
+            box = _xfrm_box(layout_sp) if layout_sp is not None else None
+            if box is None:
+                master_sp = self.master.placeholders.get(MASTER_TYPE.get(key[0], 'body'))
+                box = _xfrm_box(master_sp) if master_sp is not None else None
+            self.resolver._geometry[memo_key] = box
+        return self.resolver._geometry[memo_key]
+
+def paragraph_style_summary(paragraph_props: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    resolve_paragraphの戻り値から段落の書式のみを取り出す（出力用のコピー）
+
+    Args:
+        paragraph_props: resolve_paragraphの戻り値
+
+    Returns:
+        {'alignment', 'line_spacing', 'space_before', 'space_after'}（解決できた項目のみ）
+    """
+    return {key: value for key, value in paragraph_props.items() if key != 'font'}
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+テキスト計測モジュール
+実際のフォント（PillowのImageFontで読み込んだTrueType/OpenTypeフォント）のグリフの送り幅から、
+テキストの幅・折り返し後の行数・高さを計算する
+
+- フォントはフォールバックチェーン（指定したフォント → PPTX_FONT_PATHS → 言語ごとの代替フォント
+  → Pillowの内蔵フォント）の順に、グリフを持つ最初のフォントを使う
+- グリフの送り幅は (フォントチェーン, フォントサイズ) ごとに256文字単位のarray('f')に保持し、
+  各文字のフォントの読み込みと計測は1回だけ行う
+- 段落ごとの折り返し結果はメモ化するため、同じテキストを何度計測しても計算は1回で済む
+- Pillowやフォントが利用できない場合は、文字の幅（全角・半角）からの推定値を使う
+
+長さの単位はすべてポイント（pt）
+"""
+
+import os
+import re
+import sys
+import logging
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Pillowのインポート（利用できない場合は推定値を使う）
+try:
+    from PIL import ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('text_metrics')
+
+# 優先して使うフォントファイル（os.pathsepで区切る）
+FONT_PATHS = [path for path in os.environ.get('PPTX_FONT_PATHS', '').split(os.pathsep) if path]
+# フォントを探すディレクトリ（os.pathsepで区切る。未指定の場合はOSの標準のディレクトリ）
+FONT_DIRS = os.environ.get('PPTX_FONT_DIRS')
+# 折り返し結果をメモ化する段落の数
+LINE_BREAK_CACHE_SIZE = int(os.environ.get('TEXT_METRICS_CACHE_SIZE', 65536))
+# フォントへの問い合わせ結果（文字ごとの送り幅の比）をメモ化する文字の数
+GLYPH_CACHE_SIZE = 65536
+
+# 送り幅の計測に使うフォントサイズ（ピクセル）。送り幅はこのサイズでの値をフォントサイズに比例させて求める
+REFERENCE_SIZE = 1000
+# グリフの有無の判定に使うフォントサイズ（ピクセル）
+COVERAGE_SIZE = 32
+# フォントにない文字（.notdef）の描画に使う文字
+NOTDEF_PROBE = '\U0010ffff'
+# Pillowの内蔵フォント（ラテン文字のみ）を表すフォントチェーンの要素
+BUILTIN_FONT = '<builtin>'
+
+# フォントの行の高さ（ascent + descent）が取得できない場合の行の高さ（フォントサイズに対する比）
+DEFAULT_LINE_SPACING = 1.2
+# フォントがない文字の送り幅（フォントサイズに対する比）
+WIDE_CHAR_ADVANCE = 1.0
+NARROW_CHAR_ADVANCE = 0.55
+
+# 1ページ（送り幅の表の単位）の文字数
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+# 未計測を表す送り幅
+UNMEASURED = -1.0
+
+# フォント名とファイル名（小文字にして空白・記号を除いたもの）の対応。メトリック互換のフォントを代替に含める
+FONT_FILE_ALIASES = {
+    'arial': ['arial', 'liberationsansregular', 'arimoregular'],
+    'helvetica': ['helvetica', 'arial', 'liberationsansregular', 'arimoregular'],
+    'calibri': ['calibri', 'carlitoregular'],
+    'cambria': ['cambria', 'caladearegular'],
+    'timesnewroman': ['times', 'timesnewroman', 'liberationserifregular', 'tinosregular'],
+    'couriernew': ['cour', 'couriernew', 'liberationmonoregular', 'cousineregular'],
+    'メイリオ': ['meiryo'],
+    '游ゴシック': ['yugothr', 'yugothm', 'yugothic'],
+    'yugothic': ['yugothr', 'yugothm', 'yugothic'],
+    'ｍｓゴシック': ['msgothic'],
+    'msゴシック': ['msgothic'],
+    'ｍｓｐゴシック': ['msgothic'],
+    'mspゴシック': ['msgothic'],
+    'ｍｓ明朝': ['msmincho'],
+    'ms明朝': ['msmincho'],
+    'microsoftyahei': ['msyh'],
+    '微软雅黑': ['msyh'],
+    'simsun': ['simsun'],
+    '宋体': ['simsun'],
+    'malgungothic': ['malgun'],
+    '맑은고딕': ['malgun'],
+}
+
+# 言語ごとの代替フォント（ファイル名）
+LANGUAGE_FALLBACK_FONTS = {
+    'ja': ['meiryo', 'yugothr', 'msgothic', 'hiraginosansw3', 'notosanscjkjpregular', 'notosansjpregular',
+           'notosanscjkregular', 'ipagp', 'ipaexg'],
+    'zh': ['msyh', 'simsun', 'pingfang', 'notosanscjkscregular', 'notosansscregular', 'notosanscjkregular',
+           'wqyzenhei', 'wqymicrohei'],
+    'ko': ['malgun', 'applesdgothicneo', 'notosanscjkkrregular', 'notosanskrregular', 'notosanscjkregular',
+           'nanumgothic'],
+}
+# 全言語で使う代替フォント（ファイル名）
+GENERIC_FALLBACK_FONTS = ['arial', 'liberationsansregular', 'arimoregular', 'helvetica', 'dejavusans',
+                          'notosansregular', 'segoeui']
+
+# 行頭に置かない文字（直前で改行しない）と行末に置かない文字（直後で改行しない）
+NO_BREAK_BEFORE = frozenset('、。，．,.）)］]｝}〕〉》」』】〙〗〟’”｠»ゝゞーァィゥェォッャュョヮヵヶぁぃぅぇぉっゃゅょゎゕゖㇰㇱㇲㇳㇴㇵㇶㇷㇸㇹㇺㇻㇼㇽㇾㇿ々〻‐゠–〜～？！?!‼⁇⁈⁉・：；:;/')
+NO_BREAK_AFTER = frozenset('（(［[｛{〔〈《「『【〘〖〝‘“｟«')
+# 全角文字（前後で改行できる文字）の範囲
+WIDE_CHARS = ('\u1100-\u115f\u2e80-\u303e\u3041-\u33ff\u3400-\u4dbf\u4e00-\u9fff\ua000-\ua4cf'
+              '\uac00-\ud7a3\uf900-\ufaff\ufe30-\ufe4f\uff00-\uff60\uffe0-\uffe6\U00020000-\U0003fffd')
+_OPENING = re.escape(''.join(sorted(NO_BREAK_AFTER)))
+_CLOSING = re.escape(''.join(sorted(NO_BREAK_BEFORE)))
+# 改行できる位置で区切った単位（後続の空白を含む）: 全角文字1文字（前後の禁則文字を含む）、
+# 空白・全角文字以外の連続（単語）、または空白のみ
+SEGMENT_PATTERN = re.compile(
+    f"[{_OPENING}]*[{WIDE_CHARS}][{_CLOSING}]*\\s*"
+    f"|[^\\s{WIDE_CHARS}]+[{_CLOSING}]*\\s*"
+    f"|\\s+"
+)
+
+def _default_font_dirs() -> List[str]:
+    if FONT_DIRS:
+        return [path for path in FONT_DIRS.split(os.pathsep) if path]
+    if sys.platform.startswith('win'):
+        windir = os.environ.get('WINDIR', 'C:\\Windows')
+        dirs = [os.path.join(windir, 'Fonts')]
+        local = os.environ.get('LOCALAPPDATA')
+        if local:
+            dirs.append(os.path.join(local, 'Microsoft', 'Windows', 'Fonts'))
+        return dirs
+    if sys.platform == 'darwin':
+        return ['/System/Library/Fonts', '/Library/Fonts', os.path.expanduser('~/Library/Fonts')]
+    return ['/usr/share/fonts', '/usr/local/share/fonts', os.path.expanduser('~/.fonts'),
+            os.path.expanduser('~/.local/share/fonts')]
+
+def _font_key(name: str) -> str:
+    # フォント名・ファイル名の比較用のキー（小文字にして空白・記号を除く）
+    return ''.join(ch for ch in name.lower() if ch.isalnum())
+
+@lru_cache(maxsize=1)
+def _font_file_index() -> Dict[str, str]:
+    """フォントディレクトリ内のフォントファイルの索引（キー -> パス）を作る（最初の1回のみ走査する）"""
+    index = {}
+    for font_dir in _default_font_dirs():
+        if not os.path.isdir(font_dir):
+            continue
+        for root, _, files in os.walk(font_dir):
+            for file_name in files:
+                stem, ext = os.path.splitext(file_name)
+                if ext.lower() in ('.ttf', '.ttc', '.otf', '.otc'):
+                    index.setdefault(_font_key(stem), os.path.join(root, file_name))
+    logger.debug(f"Indexed {len(index)} font files")
+    return index
+
+def _find_font_files(keys: List[str]) -> List[str]:
+    index = _font_file_index()
+    paths = []
+    for key in keys:
+        path = index.get(key) or index.get(key + 'regular')
+        if path and path not in paths:
+            paths.append(path)
+    return paths
+
+@lru_cache(maxsize=256)
+def font_chain(font_name: Optional[str] = None, lang: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    フォントのフォールバックチェーンを作る
+
+    Args:
+        font_name: テキストに指定されたフォント名（Noneの場合は代替フォントのみ）
+        lang: テキストの言語（言語ごとの代替フォントを優先する）
+
+    Returns:
+        フォントファイルのパスのタプル（末尾はPillowの内蔵フォント）
+    """
+    keys = []
+    if font_name:
+        key = _font_key(font_name)
+        keys.extend(FONT_FILE_ALIASES.get(key, [key]))
+    chain = _find_font_files(keys)
+    for path in FONT_PATHS:
+        if os.path.isfile(path) and path not in chain:
+            chain.append(path)
+
+    # 指定された言語の代替フォントを先に、その他の言語の代替フォントを後に置く
+    fallback_keys = []
+    if lang in LANGUAGE_FALLBACK_FONTS:
+        fallback_keys.extend(LANGUAGE_FALLBACK_FONTS[lang])
+    fallback_keys.extend(GENERIC_FALLBACK_FONTS)
+    for fallback_lang, lang_keys in LANGUAGE_FALLBACK_FONTS.items():
+        if fallback_lang != lang:
+            fallback_keys.extend(lang_keys)
+    for path in _find_font_files(fallback_keys):
+        if path not in chain:
+            chain.append(path)
+
+    chain.append(BUILTIN_FONT)
+    return tuple(chain)
+
+@lru_cache(maxsize=64)
+def _load_font(path: str, size: int):
+    """フォントを読み込む（読み込めない場合はNone）"""
+    if not PIL_AVAILABLE:
+        return None
+    try:
+        if path == BUILTIN_FONT:
+            # Pillow 10.1以降はFreeTypeが使える場合、サイズを指定した内蔵フォントを返す
+            font = ImageFont.load_default(size=size)
+            return font if isinstance(font, ImageFont.FreeTypeFont) else None
+        return ImageFont.truetype(path, size=size)
+    except Exception as e:
+        logger.debug(f"Could not load font {path}: {str(e)}")
+        return None
+
+class _FontFace:
+    """1つのフォントファイルのグリフの有無・送り幅・行の高さ"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.font = _load_font(path, REFERENCE_SIZE)
+        self.coverage_font = _load_font(path, COVERAGE_SIZE) if self.font is not None else None
+        self.line_spacing = DEFAULT_LINE_SPACING
+        self._notdef = None
+        if self.font is None or self.coverage_font is None:
+            self.font = None
+            return
+        ascent, descent = self.font.getmetrics()
+        if ascent + descent > 0:
+            self.line_spacing = (ascent + descent) / REFERENCE_SIZE
+        self._notdef = self._glyph_signature(NOTDEF_PROBE)
+
+    def _glyph_signature(self, char: str):
+        mask = self.coverage_font.getmask(char)
+        return mask.size, bytes(mask), self.coverage_font.getlength(char)
+
+    def has_glyph(self, char: str) -> bool:
+        """グリフを持つか（描画結果が.notdefと同じ文字はフォントにないとみなす）"""
+        if self.font is None:
+            return False
+        if char.isspace():
+            return True
+        return self._glyph_signature(char) != self._notdef
+
+    def advance(self, char: str) -> float:
+        """送り幅（フォントサイズに対する比）"""
+        return self.font.getlength(char) / REFERENCE_SIZE
+
+@lru_cache(maxsize=64)
+def _font_face(path: str) -> _FontFace:
+    return _FontFace(path)
+
+def _estimated_advance(char: str) -> float:
+    # フォントがない文字は全角・半角の幅で推定する
+    if unicodedata.east_asian_width(char) in ('W', 'F'):
+        return WIDE_CHAR_ADVANCE
+    return NARROW_CHAR_ADVANCE
+
+class GlyphAdvanceTable:
+    """
+    フォントチェーンとフォントサイズごとのグリフの送り幅の表
+
+    送り幅（pt）を256文字ごとのarray('f')に保持し、未計測の文字のみフォントで計測する
+    """
+
+    def __init__(self, chain: Tuple[str, ...], size: float):
+        """
+        コンストラクタ
+
+        Args:
+            chain: font_chainの戻り値
+            size: フォントサイズ（pt）
+        """
+        self.chain = chain
+        self.size = size
+        self._advances: Dict[int, array] = {}
+        self._segment_widths: Dict[str, float] = {}
+
+    def _page(self, page_number: int) -> array:
+        advances = self._advances.get(page_number)
+        if advances is None:
+            advances = self._advances[page_number] = array('f', [UNMEASURED]) * PAGE_SIZE
+        return advances
+
+    def _measure(self, code: int) -> float:
+        page_number = code >> PAGE_BITS
+        slot = code & PAGE_MASK
+        advances = self._page(page_number)
+        advances[slot] = _glyph_advance(self.chain, chr(code))[0] * self.size
+        return advances[slot]
+
+    def width(self, text: str) -> float:
+        """
+        テキストの幅（各文字の送り幅の和。カーニングは考慮しない）
+
+        Args:
+            text: テキスト
+
+        Returns:
+            幅（pt）
+        """
+        total = 0.0
+        pages = self._advances
+        for char in text:
+            code = ord(char)
+            advances = pages.get(code >> PAGE_BITS)
+            advance = advances[code & PAGE_MASK] if advances is not None else UNMEASURED
+            if advance < 0:
+                advance = self._measure(code)
+            total += advance
+        return total
+
+    def segment_width(self, text: str) -> float:
+        """単語などの幅（同じ文字列の幅は1回だけ計算する）"""
+        width = self._segment_widths.get(text)
+        if width is None:
+            width = self._segment_widths[text] = self.width(text)
+        return width
+
+@lru_cache(maxsize=GLYPH_CACHE_SIZE)
+def _glyph_advance(chain: Tuple[str, ...], char: str) -> Tuple[float, int]:
+    # フォントサイズに依存しない送り幅の比（フォントチェーンごとに1回だけフォントに問い合わせる）
+    for face_index, path in enumerate(chain):
+        face = _font_face(path)
+        if face.has_glyph(char):
+            return face.advance(char), face_index
+    return _estimated_advance(char), -1
+
+@lru_cache(maxsize=1024)
+def advance_table(chain: Tuple[str, ...], size: float) -> GlyphAdvanceTable:
+    """
+    フォントチェーンとフォントサイズの送り幅の表を取得する（同じ組み合わせの表は再利用する）
+
+    Args:
+        chain: font_chainの戻り値
+        size: フォントサイズ（pt）
+
+    Returns:
+        GlyphAdvanceTable
+    """
+    return GlyphAdvanceTable(chain, size)
+
+@lru_cache(maxsize=LINE_BREAK_CACHE_SIZE)
+def _segments(paragraph: str) -> Tuple[Tuple[str, str], ...]:
+    """段落を改行できる位置で (本文, 後続の空白) に分割する（フォントサイズに依存しないためメモ化する）"""
+    segments = []
+    for match in SEGMENT_PATTERN.finditer(paragraph):
+        segment = match.group()
+        body = segment.rstrip()
+        segments.append((body, segment[len(body):]))
+    return tuple(segments) or (('', ''),)
+
+@lru_cache(maxsize=LINE_BREAK_CACHE_SIZE)
+def _paragraph_line_spacing(chain: Tuple[str, ...], paragraph: str) -> float:
+    """段落の行の高さ（フォントサイズに対する比。段落に使われたフォントの最大値）"""
+    face_indexes = {_glyph_advance(chain, char)[1] for char in set(paragraph) if not char.isspace()}
+    spacings = [_font_face(chain[index]).line_spacing for index in face_indexes if index >= 0]
+    if not spacings:
+        spacings = [_font_face(chain[0]).line_spacing if chain else DEFAULT_LINE_SPACING]
+    return max(spacings)
+
+@lru_cache(maxsize=LINE_BREAK_CACHE_SIZE)
+def _break_paragraph(chain: Tuple[str, ...], size: float, paragraph: str,
+                     width: Optional[float]) -> Tuple[Tuple[float, ...], float]:
+    """
+    段落を折り返す（結果はメモ化する）
+
+    Returns:
+        (各行の幅のタプル, 行の高さ（pt）)
+    """
+    table = advance_table(chain, size)
+    if width is None or width <= 0:
+        line_widths = (table.segment_width(paragraph.rstrip()),)
+        return line_widths, _paragraph_line_spacing(chain, paragraph) * size
+
+    line_widths = []
+    line_width = 0.0
+    # 行末の空白は幅に含めない（行末にぶら下げる）
+    pending_space = 0.0
+    line_has_text = False
+    for body, space in _segments(paragraph):
+        body_width = table.segment_width(body)
+        space_width = table.segment_width(space)
+        if line_has_text and line_width + pending_space + body_width > width:
+            line_widths.append(line_width)
+            line_width = 0.0
+            pending_space = 0.0
+            line_has_text = False
+        if body_width > width:
+            # 1語が行に収まらない場合は文字単位で折り返す
+            for char in body:
+                char_width = table.width(char)
+                if line_has_text and line_width + pending_space + char_width > width:
+                    line_widths.append(line_width)
+                    line_width = 0.0
+                    pending_space = 0.0
+                line_width += pending_space + char_width
+                pending_space = 0.0
+                line_has_text = True
+        elif body:
+            line_width += pending_space + body_width
+            pending_space = 0.0
+            line_has_text = True
+        pending_space += space_width
+    line_widths.append(line_width)
+    return tuple(line_widths), _paragraph_line_spacing(chain, paragraph) * size
+
+def measure_text(text: str, font_size: float, width: Optional[float] = None,
+                 font_name: Optional[str] = None, lang: Optional[str] = None,
+                 line_spacing: float = 1.0) -> Dict[str, float]:
+    """
+    テキストを折り返したときの大きさを計測する
+
+    Args:
+        text: テキスト（改行で段落を区切る）
+        font_size: フォントサイズ（pt）
+        width: 折り返す幅（pt、Noneの場合は折り返さない）
+        font_name: フォント名
+        lang: テキストの言語（代替フォントの選択に使う）
+        line_spacing: 行間（1.0 = 1行）
+
+    Returns:
+        {'width': 最も長い行の幅, 'height': 高さ, 'lines': 行数}（幅・高さはpt）
+    """
+    chain = font_chain(font_name, lang)
+    size = round(float(font_size), 2)
+    if width is not None:
+        width = round(float(width), 2)
+    max_width = 0.0
+    height = 0.0
+    lines = 0
+    for paragraph in (text or '').split('\n'):
+        line_widths, line_height = _break_paragraph(chain, size, paragraph, width)
+        max_width = max(max_width, max(line_widths))
+        height += len(line_widths) * line_height * line_spacing
+        lines += len(line_widths)
+    return {'width': max_width, 'height': height, 'lines': lines}
+
+def text_width(text: str, font_size: float, font_name: Optional[str] = None,
+               lang: Optional[str] = None) -> float:
+    """
+    1行のテキストの幅を計測する
+
+    Args:
+        text: テキスト
+        font_size: フォントサイズ（pt）
+        font_name: フォント名
+        lang: テキストの言語
+
+    Returns:
+        幅（pt）
+    """
+    return advance_table(font_chain(font_name, lang), round(float(font_size), 2)).width(text)
+
+def fit_font_size(text: str, width: float, height: float, max_size: float, min_size: float = 8,
+                  font_name: Optional[str] = None, lang: Optional[str] = None,
+                  step: float = 0.5, line_spacing: float = 1.0) -> float:
+    """
+    テキストが指定した大きさに収まる最大のフォントサイズを探す
+
+    Args:
+        text: テキスト
+        width: 折り返す幅（pt）
+        height: 収める高さ（pt）
+        max_size: フォントサイズの上限（pt）
+        min_size: フォントサイズの下限（pt、収まらない場合もこれより小さくしない。max_sizeが下限以下の場合はmax_sizeを返す）
+        font_name: フォント名
+        lang: テキストの言語
+        step: フォントサイズの刻み（pt）
+        line_spacing: 行間（1.0 = 1行）
+
+    Returns:
+        フォントサイズ（pt）
+    """
+    # 元のサイズが下限より小さい場合は拡大しない
+    if max_size <= min_size:
+        return max_size
+
+    def fits(size: float) -> bool:
+        measured = measure_text(text, size, width, font_name, lang, line_spacing)
+        return measured['height'] <= height and measured['width'] <= width
+
+    if fits(max_size):
+        return max_size
+    # 刻みごとのサイズを二分探索する（サイズが小さいほど収まりやすい）
+    low, high = 0, int((max_size - min_size) / step)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(min_size + middle * step):
+            low = middle
+        else:
+            high = middle - 1
+    return min_size + low * step
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+テキスト正規化モジュール
+抽出したテキストにUnicode正規化（NFKC）を1回だけ適用し、正規化前のテキストと位置の対応を保持する
+
+ランごとに正規化し、段落と要素のテキストはランと段落の正規化結果をつなげて作る。
+同じ文字列の正規化結果はメモ化し、ASCIIのみの文字列は正規化しない（NFKCで変化しないため）
+"""
+
+import os
+import bisect
+import logging
+import unicodedata
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('text_normalizer')
+
+NORMALIZATION_FORM = 'NFKC'
+# 正規化結果をメモ化する文字列の数
+CACHE_SIZE = int(os.environ.get('TEXT_NORMALIZER_CACHE_SIZE', 65536))
+
+# 位置の対応表: [正規化後の位置, 正規化前の位置] のリスト（長さが変わる箇所の前後のみ）
+OffsetMap = List[List[int]]
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _normalize(text: str) -> str:
+    return unicodedata.normalize(NORMALIZATION_FORM, text)
+
+def normalize_text(text: str) -> str:
+    """
+    テキストを正規化する（結果はメモ化する）
+
+    Args:
+        text: 正規化するテキスト
+
+    Returns:
+        正規化したテキスト
+    """
+    if not text or text.isascii():
+        return text
+    return _normalize(text)
+
+def _composes_with_previous(char: str) -> bool:
+    # 結合文字と、ハングルの中声・終声の字母（結合クラスは0だが直前の文字と合成される）
+    return unicodedata.combining(char) != 0 or '\u1160' <= char <= '\u11ff'
+
+def _is_combining(char: str) -> bool:
+    # 半角の濁点（U+FF9E）などは正規化すると結合文字になり、直前の文字と合成される
+    normalized = normalize_text(char)
+    return bool(normalized) and _composes_with_previous(normalized[0])
+
+def _joins_cleanly(normalized_parts: List[str]) -> bool:
+    # 結合文字（半角の濁点など）で始まる部分は直前の部分と合成される可能性があるため、つなげた結果は使えない
+    return not any(part and _composes_with_previous(part[0]) for part in normalized_parts[1:])
+
+def build_offset_map(original: str) -> Optional[OffsetMap]:
+    """
+    正規化後のテキストの位置から正規化前の位置への対応表を作る
+
+    Args:
+        original: 正規化前のテキスト
+
+    Returns:
+        対応表（長さの変わる箇所がない場合はNone）
+    """
+    offset_map = []
+    normalized_offset = 0
+    start = 0
+    length = len(original)
+    while start < length:
+        # 基底文字と後続の結合文字を1つの単位として正規化する
+        end = start + 1
+        while end < length and _is_combining(original[end]):
+            end += 1
+        segment_length = len(normalize_text(original[start:end]))
+        if segment_length != end - start:
+            if not offset_map or offset_map[-1] != [normalized_offset, start]:
+                offset_map.append([normalized_offset, start])
+            offset_map.append([normalized_offset + segment_length, end])
+        normalized_offset += segment_length
+        start = end
+    return offset_map or None
+
+def to_original_offset(offset_map: Optional[OffsetMap], offset: int) -> int:
+    """
+    正規化後のテキストの位置を正規化前の位置に変換する
+
+    Args:
+        offset_map: build_offset_mapの戻り値
+        offset: 正規化後のテキストの位置
+
+    Returns:
+        正規化前のテキストの位置（長さの変わった文字の途中の位置は、その文字の範囲内に丸める）
+    """
+    if not offset_map:
+        return offset
+    index = bisect.bisect_right(offset_map, [offset, float('inf')]) - 1
+    if index < 0:
+        return offset
+    normalized_anchor, original_anchor = offset_map[index]
+    original = original_anchor + (offset - normalized_anchor)
+    if index + 1 < len(offset_map):
+        original = min(original, offset_map[index + 1][1])
+    return original
+
+def _set_normalized(item: Dict[str, Any], normalized: str) -> None:
+    original = item['text']
+    if normalized != original:
+        item['original_text'] = original
+        item['text'] = normalized
+
+def normalize_text_element(elem: Dict[str, Any]) -> None:
+    """
+    テキスト要素（段落とランを含む）を正規化する
+
+    各ランを1回だけ正規化し、段落のテキストはランの、要素のテキストは段落の正規化結果をつなげて作る
+    （改行などでつなげた結果と元のテキストが一致しない場合のみ、そのテキストを直接正規化する）。
+    テキストが変わった要素・段落・ランには正規化前のテキストを original_text として残し、
+    長さが変わった要素には位置の対応表 offset_map を追加する
+
+    Args:
+        elem: extract_text_from_shapeなどが返すテキスト要素（その場で書き換える）
+    """
+    paragraph_originals = []
+    paragraph_normalized = []
+    for para in elem.get('paragraphs') or []:
+        run_originals = []
+        run_normalized = []
+        for run in para.get('runs') or []:
+            if 'text' not in run:
+                continue
+            run_originals.append(run['text'])
+            normalized = normalize_text(run['text'])
+            run_normalized.append(normalized)
+            _set_normalized(run, normalized)
+
+        if 'text' not in para:
+            continue
+        original = para['text']
+        if original == ''.join(run_originals) and _joins_cleanly(run_normalized):
+            normalized = ''.join(run_normalized)
+        else:
+            normalized = normalize_text(original)
+        paragraph_originals.append(original)
+        paragraph_normalized.append(normalized)
+        _set_normalized(para, normalized)
+
+    if 'text' not in elem:
+        return
+    original = elem['text']
+    if original == '\n'.join(paragraph_originals) and _joins_cleanly(paragraph_normalized):
+        normalized = '\n'.join(paragraph_normalized)
+    else:
+        normalized = normalize_text(original)
+    _set_normalized(elem, normalized)
+    if len(normalized) != len(original):
+        elem['offset_map'] = build_offset_map(original)
@@ -4,7 +4,11 @@ import json
 import os
 import argparse
 import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+# 非表示スライドの扱い（lib/python/pptx_parser.py と同じ値）
+# skip / placeholder: 非表示スライドのテキストはAPIに送らず原文のまま返す / full: 通常どおり翻訳
+HIDDEN_SLIDE_POLICIES = ('skip', 'placeholder', 'full')
 
 def translate_with_claude(
     texts: List[str],
@@ -100,6 +104,37 @@ def translate_with_claude(
 
     return translated_texts
 
+def split_hidden_texts(
+    items: List[Any],
+    hidden_slides: Set[int],
+    policy: str
+) -> Tuple[List[str], List[int]]:
+    """
+    翻訳対象のテキストと、非表示スライドのため翻訳しないテキストの位置を分ける
+
+    Args:
+        items: テキスト、または {"text", "slide_index", "hidden"} を持つ辞書のリスト
+        hidden_slides: 非表示スライドのインデックス
+        policy: 非表示スライドの扱い ('skip', 'placeholder', 'full')
+
+    Returns:
+        (テキストのリスト, 翻訳しないテキストの位置のリスト)
+    """
+    texts = []
+    skipped = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            texts.append(item if isinstance(item, str) else str(item))
+            continue
+
+        texts.append(item.get("text", ""))
+        slide_index = item.get("slide_index", item.get("slideIndex"))
+        hidden = item.get("hidden", slide_index in hidden_slides)
+        if policy != "full" and hidden:
+            skipped.append(position)
+
+    return texts, skipped
+
 def parse_arguments():
     """コマンドライン引数をパース"""
     parser = argparse.ArgumentParser(description='テキスト翻訳')
@@ -107,6 +142,10 @@ def parse_arguments():
     parser.add_argument('--source-lang', type=str, required=True, help='元の言語コード')
     parser.add_argument('--target-lang', type=str, required=True, help='翻訳先の言語コード')
     parser.add_argument('--model', type=str, required=True, help='使用するモデル')
+    parser.add_argument('--hidden-slides', type=str, default='[]',
+                        help='非表示スライドのインデックス (JSON形式の配列、パーサーのmetadata.hidden_slides)')
+    parser.add_argument('--hidden-slide-policy', choices=HIDDEN_SLIDE_POLICIES, default='full',
+                        help='非表示スライドのテキストの扱い')
     return parser.parse_args()
 
 def main():
@@ -120,14 +159,26 @@ def main():
             texts = [texts]
     except json.JSONDecodeError:
         texts = [args.texts]
+
+    try:
+        hidden_slides = set(json.loads(args.hidden_slides))
+    except (json.JSONDecodeError, TypeError):
+        hidden_slides = set()
+
+    # 非表示スライドのテキストはAPIに送らない
+    texts, skipped = split_hidden_texts(texts, hidden_slides, args.hidden_slide_policy)
+    skipped_set = set(skipped)
+    targets = [text for position, text in enumerate(texts) if position not in skipped_set]
         
     # 翻訳を実行
-    translated_texts = translate_with_claude(
-        texts,
+    translated_targets = iter(translate_with_claude(
+        targets,
         args.source_lang,
         args.target_lang,
         args.model
-    )
+    ))
+    translated_texts = [text if position in skipped_set else next(translated_targets)
+                        for position, text in enumerate(texts)]
     
     # 結果をJSON形式で出力
     result = {
@@ -135,7 +186,9 @@ def main():
         "metadata": {
             "model": args.model,
             "source_lang": args.source_lang,
-            "target_lang": args.target_lang
+            "target_lang": args.target_lang,
+            "hidden_slide_policy": args.hidden_slide_policy,
+            "skipped_hidden": len(skipped)
         }
     }
     
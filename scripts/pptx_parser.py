@@ -196,7 +196,6 @@ def main(pptx_path: str):
             slide_data = {
                 "id": str(uuid.uuid4()),
                 "index": idx,
-                "metadata": metadata,  # 各スライドにメタデータを追加
                 **content
             }
             slides.append(slide_data)
@@ -205,11 +204,11 @@ def main(pptx_path: str):
             "success": True,
             "data": {
                 "slides": slides,
-                "metadata": metadata  # ルートレベルにもメタデータを追加
+                "metadata": metadata  # メタデータはルートレベルにのみ持たせる（スライドごとには複製しない）
             }
         }
         
-        print(json.dumps(result))
+        print(json.dumps(result, ensure_ascii=False, separators=(',', ':')))
         sys.exit(0)
     
     except Exception as e:
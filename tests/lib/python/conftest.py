@@ -0,0 +1,98 @@
+"""
+lib/python のテスト用の共通フィクスチャ
+"""
+
+import os
+import sys
+
+import pytest
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_THEME_COLOR
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.util import Inches, Pt
+
+# lib.python.* の形でインポートできるよう、リポジトリのルートをパスに追加する
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+# pptx_translator.py などのスクリプトは同じディレクトリのモジュールを直接インポートする
+SCRIPTS_DIR = os.path.join(REPO_ROOT, 'lib', 'python')
+for path in (SCRIPTS_DIR, REPO_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+BLANK_LAYOUT = 6
+TITLE_ONLY_LAYOUT = 5
+
+def _add_text_box(shapes, left, top, text, color=None):
+    box = shapes.add_textbox(Inches(left), Inches(top), Inches(3), Inches(1))
+    run = box.text_frame.paragraphs[0].add_run()
+    run.text = text
+    run.font.size = Pt(18)
+    if color is not None:
+        run.font.color.theme_color = color
+    return box
+
+def build_fixture_deck(path: str) -> str:
+    """
+    グループ・表・非表示スライド・テーマカラー・縦書きを含む小さなデッキを作成する
+
+    Args:
+        path: 保存先のパス
+
+    Returns:
+        保存したパス
+    """
+    prs = Presentation()
+
+    # 1枚目: タイトルとテーマカラーの塗りつぶし・文字色、スタイル（p:style）だけのシェイプ
+    slide = prs.slides.add_slide(prs.slide_layouts[TITLE_ONLY_LAYOUT])
+    slide.shapes.title.text = 'テーマカラーのスライド'
+    accent = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(1), Inches(2), Inches(3), Inches(1))
+    accent.name = 'accent fill'
+    accent.fill.solid()
+    accent.fill.fore_color.theme_color = MSO_THEME_COLOR.ACCENT_2
+    accent.text_frame.text = 'Accent 2'
+    styled = slide.shapes.add_shape(MSO_SHAPE.OVAL, Inches(5), Inches(2), Inches(2), Inches(1))
+    styled.name = 'style only'
+    rgb = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, Inches(1), Inches(4), Inches(2), Inches(1))
+    rgb.name = 'rgb fill'
+    rgb.fill.solid()
+    rgb.fill.fore_color.rgb = RGBColor(0x12, 0x34, 0x56)
+    rgb.line.fill.background()
+    _add_text_box(slide.shapes, 5, 4, 'Theme coloured text', MSO_THEME_COLOR.ACCENT_1)
+
+    # 2枚目: 入れ子のグループ
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+    outer = slide.shapes.add_group_shape()
+    _add_text_box(outer.shapes, 1, 1, 'Outer group text')
+    inner = outer.shapes.add_group_shape()
+    _add_text_box(inner.shapes, 2, 3, 'Inner group text')
+    _add_text_box(inner.shapes, 5, 3, 'Second inner text')
+    _add_text_box(slide.shapes, 1, 5, 'Ungrouped text')
+
+    # 3枚目: 表と背景色（テーマカラー）
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+    slide.background.fill.solid()
+    slide.background.fill.fore_color.theme_color = MSO_THEME_COLOR.ACCENT_1
+    table = slide.shapes.add_table(2, 3, Inches(1), Inches(1), Inches(6), Inches(2)).table
+    for row in range(2):
+        for column in range(3):
+            table.cell(row, column).text = f'Cell {row}-{column}'
+
+    # 4枚目: 非表示スライド
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+    _add_text_box(slide.shapes, 1, 1, 'Hidden slide text')
+    slide._element.set('show', '0')
+
+    # 5枚目: 縦書きの2段（右の段から読む）
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+    for left, text in ((1, '左の段'), (6, '右の段')):
+        box = _add_text_box(slide.shapes, left, 1, text)
+        box.text_frame._bodyPr.set('vert', 'eaVert')
+
+    prs.save(path)
+    return path
+
+@pytest.fixture(scope='session')
+def fixture_deck(tmp_path_factory) -> str:
+    return build_fixture_deck(str(tmp_path_factory.mktemp('decks') / 'fixture.pptx'))
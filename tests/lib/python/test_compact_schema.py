@@ -0,0 +1,43 @@
+"""
+コンパクト出力スキーマのテスト
+"""
+
+import json
+
+import pytest
+
+from lib.python import compact_schema, serializer
+from lib.python.pptx_parser import parse_pptx
+
+def _normalized(value):
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+@pytest.fixture(scope='module')
+def parsed(fixture_deck):
+    return parse_pptx(fixture_deck, None, text_only=True, use_cache=False)
+
+def test_compact_result_round_trips(parsed):
+    compacted = compact_schema.compact_result(parsed)
+
+    assert compacted['schema'] == {'name': compact_schema.SCHEMA_NAME, 'version': compact_schema.SCHEMA_VERSION}
+    assert _normalized(compact_schema.expand_result(compacted)) == _normalized(parsed)
+
+def test_compact_result_interns_resolved_styles(parsed):
+    compacted = compact_schema.compact_result(parsed)
+    serialized = json.dumps(compacted['slides'], ensure_ascii=False, default=str)
+
+    # 継承を解決した書式も含め、書式の辞書はスタイルテーブルのインデックスになる
+    for key in compact_schema.INTERNED_KEYS:
+        assert f'"{key}": {{' not in serialized
+    assert '"resolved_font": ' in serialized
+    assert len(serialized) < len(json.dumps(parsed['slides'], ensure_ascii=False, default=str))
+
+def test_compact_slide_does_not_modify_input(parsed):
+    before = _normalized(parsed)
+    compact_schema.compact_slide(parsed['slides'][0], compact_schema.StyleTable())
+    assert _normalized(parsed) == before
+
+@pytest.mark.skipif(serializer.MSGPACK_AVAILABLE, reason='msgpack is installed')
+def test_msgpack_encoding_without_msgpack_raises():
+    with pytest.raises(ValueError):
+        serializer.encode({'a': 1}, 'msgpack')
@@ -0,0 +1,60 @@
+"""
+翻訳データの読み込み（payload_reader）のテスト
+"""
+
+import io
+import json
+import sys
+
+import pytest
+
+from payload_reader import iter_slide_payload
+
+SLIDES = [
+    {'index': 0, 'texts': [{'text': 'こんにちは'}], 'translations': [{'text': 'Hello'}]},
+    {'index': 2, 'texts': [{'text': '世界'}], 'translations': [{'text': 'World'}]},
+]
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+def test_reads_ndjson_file(tmp_path):
+    content = ''.join(json.dumps(slide, ensure_ascii=False) + '\n' for slide in SLIDES)
+    assert list(iter_slide_payload(_write(tmp_path, 'slides.ndjson', content))) == SLIDES
+
+def test_reads_json_array_file(tmp_path):
+    content = '  \n' + json.dumps(SLIDES, ensure_ascii=False)
+    assert list(iter_slide_payload(_write(tmp_path, 'slides.json', content))) == SLIDES
+
+def test_ndjson_skips_blank_lines_and_parser_records(tmp_path):
+    content = '\n'.join([
+        json.dumps({'type': 'header', 'metadata': {}}),
+        json.dumps(SLIDES[0], ensure_ascii=False),
+        '',
+        json.dumps({'type': 'trailer', 'total_slides': 1}),
+    ]) + '\n'
+    assert list(iter_slide_payload(_write(tmp_path, 'parsed.ndjson', content))) == [SLIDES[0]]
+
+def test_ndjson_is_read_one_line_at_a_time(tmp_path):
+    content = json.dumps(SLIDES[0]) + '\n' + '{not json\n'
+    slides = iter_slide_payload(_write(tmp_path, 'broken.ndjson', content))
+
+    # 不正な行の前までのスライドは、不正な行を読む前に取り出せる
+    assert next(slides) == SLIDES[0]
+    with pytest.raises(ValueError, match='line 2'):
+        next(slides)
+
+def test_ndjson_rejects_non_object_lines(tmp_path):
+    with pytest.raises(ValueError, match='not a JSON object'):
+        list(iter_slide_payload(_write(tmp_path, 'list.ndjson', json.dumps(SLIDES[0]) + '\n[1, 2]\n')))
+
+def test_reads_stdin(monkeypatch):
+    content = ''.join(json.dumps(slide, ensure_ascii=False) + '\n' for slide in SLIDES).encode('utf-8')
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(content)))
+    assert list(iter_slide_payload('-')) == SLIDES
+
+def test_inline_json_is_not_accepted():
+    with pytest.raises(OSError):
+        list(iter_slide_payload(json.dumps(SLIDES)))
@@ -0,0 +1,68 @@
+"""
+pptx_parserの抽出のテスト
+"""
+
+import pytest
+from pptx import Presentation
+
+from lib.python.pptx_parser import (
+    extract_background, extract_fill_color, extract_line_color, is_hidden_slide, parse_pptx
+)
+from lib.python.style_resolver import StyleResolver
+
+HIDDEN_INDEX = 3
+# python-pptxの既定テンプレート（Office テーマ）の配色
+ACCENT_1 = '#4F81BD'
+ACCENT_2 = '#C0504D'
+
+def _shapes_by_name(slide):
+    return {shape.name: shape for shape in slide.shapes}
+
+def test_hidden_slide_is_detected(fixture_deck):
+    presentation = Presentation(fixture_deck)
+    assert [is_hidden_slide(slide) for slide in presentation.slides] == [False, False, False, True, False]
+
+@pytest.mark.parametrize('policy, expected_text_elements', [('placeholder', 0), ('full', 1)])
+def test_hidden_slide_policy_keeps_slide(fixture_deck, policy, expected_text_elements):
+    result = parse_pptx(fixture_deck, None, text_only=True, hidden_slides=policy, use_cache=False)
+
+    hidden = [slide for slide in result['slides'] if slide['hidden']]
+    assert [slide['index'] for slide in hidden] == [HIDDEN_INDEX]
+    assert len(hidden[0]['text_elements']) == expected_text_elements
+    assert result['metadata']['hidden_slides'] == [HIDDEN_INDEX]
+
+def test_hidden_slide_policy_skip(fixture_deck):
+    result = parse_pptx(fixture_deck, None, text_only=True, hidden_slides='skip', use_cache=False)
+
+    assert [slide['index'] for slide in result['slides']] == [0, 1, 2, 4]
+
+def test_theme_colour_fills_resolve(fixture_deck):
+    presentation = Presentation(fixture_deck)
+    slide = presentation.slides[0]
+    context = StyleResolver(presentation).slide_context(slide)
+    shapes = _shapes_by_name(slide)
+
+    assert extract_fill_color(shapes['accent fill'], context) == ACCENT_2
+    assert extract_fill_color(shapes['rgb fill'], context) == '#123456'
+    # spPrで指定がない場合はp:styleのfillRef・lnRefの色
+    assert extract_fill_color(shapes['style only'], context) == ACCENT_1
+    assert extract_line_color(shapes['style only'], context) == ACCENT_1
+    assert extract_line_color(shapes['rgb fill'], context) == 'transparent'
+
+def test_backgrounds_resolve_through_theme(fixture_deck):
+    presentation = Presentation(fixture_deck)
+    resolver = StyleResolver(presentation)
+    inherited, solid = presentation.slides[0], presentation.slides[2]
+
+    # マスターの背景（bgRef → bg1）を継承し、スライドのXMLは書き換えない
+    assert extract_background(inherited, resolver.slide_context(inherited))['color'] == '#FFFFFF'
+    assert inherited._element.cSld.bg is None
+    assert extract_background(solid, resolver.slide_context(solid))['color'] == ACCENT_1
+
+def test_master_theme_background_is_inherited(fixture_deck):
+    presentation = Presentation(fixture_deck)
+    background_ref = presentation.slide_master._element.cSld.bg.bgRef
+    background_ref[0].set('val', 'accent2')
+    slide = presentation.slides[1]
+
+    assert extract_background(slide, StyleResolver(presentation).slide_context(slide))['color'] == ACCENT_2
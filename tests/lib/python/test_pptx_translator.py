@@ -0,0 +1,66 @@
+"""
+pptx_translator（翻訳の適用）のテスト
+"""
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+from pptx_translator import build_shape_index, find_text_target, update_slide_text
+
+GROUP_SLIDE = 1
+TABLE_SLIDE = 2
+
+def test_index_finds_grouped_text_by_id_and_text(fixture_deck):
+    slide = Presentation(fixture_deck).slides[GROUP_SLIDE]
+    index = build_shape_index(slide)
+    inner = next(target for target in index['by_text']['Inner group text'])
+
+    by_id = find_text_target(index, {'shape_id': inner[0].shape_id}, 'Inner group text')
+    by_text = find_text_target(index, {}, 'Second inner text')
+
+    assert by_id is inner
+    assert by_text[1].text == 'Second inner text'
+
+def test_index_finds_table_cell_by_frame_id_and_text(fixture_deck):
+    slide = Presentation(fixture_deck).slides[TABLE_SLIDE]
+    index = build_shape_index(slide)
+    frame_id = next(shape.shape_id for shape in slide.shapes if shape.has_table)
+
+    # 表はシェイプIDが1つなので、セルはテキストで絞り込む
+    assert len(index['by_id'][frame_id]) == 6
+    target = find_text_target(index, {'shape_id': frame_id}, 'Cell 1-2')
+    assert target[1].text == 'Cell 1-2'
+
+def test_duplicate_text_is_applied_in_document_order(fixture_deck):
+    slide = Presentation(fixture_deck).slides[TABLE_SLIDE]
+    table = next(shape for shape in slide.shapes if shape.has_table).table
+    table.cell(0, 0).text = 'Same'
+    table.cell(1, 1).text = 'Same'
+
+    update_slide_text(slide, {
+        'texts': [{'text': 'Same'}, {'text': 'Same'}],
+        'translations': [{'text': 'First'}, {'text': 'Second'}],
+        'targetLanguage': 'en'
+    })
+
+    assert (table.cell(0, 0).text, table.cell(1, 1).text) == ('First', 'Second')
+
+def test_font_size_and_name_are_kept_when_the_box_is_large_enough():
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    box = slide.shapes.add_textbox(Inches(1), Inches(1), Inches(8), Inches(3))
+    run = box.text_frame.paragraphs[0].add_run()
+    run.text = 'Title'
+    run.font.size = Pt(32)
+    run.font.name = 'Arial'
+    run.font.bold = True
+
+    update_slide_text(slide, {
+        'texts': [{'text': 'Title', 'shape_id': box.shape_id}],
+        'translations': [{'text': 'Titel'}],
+        'targetLanguage': 'de'
+    })
+
+    runs = box.text_frame.paragraphs[0].runs
+    assert [r.text for r in runs] == ['Titel']
+    assert (runs[0].font.size.pt, runs[0].font.name, runs[0].font.bold) == (32, 'Arial', True)
@@ -0,0 +1,33 @@
+"""
+スタイル継承の解決のテスト
+"""
+
+import pytest
+from pptx import Presentation
+
+from lib.python.pptx_parser import extract_slide
+from lib.python.style_resolver import StyleResolver
+
+def _resolved_fonts(presentation, slide, engine):
+    slide_data = extract_slide(
+        slide, 0, presentation.slide_width, presentation.slide_height,
+        text_only=True, engine=engine, style_context=StyleResolver(presentation).slide_context(slide)
+    )
+    fonts = {}
+    for element in slide_data['text_elements']:
+        for paragraph in element.get('paragraphs', []):
+            for run in paragraph.get('runs', []):
+                fonts[run['text']] = run['resolved_font']
+    return fonts
+
+@pytest.mark.parametrize('engine', ['python-pptx', 'lxml'])
+def test_font_colours_resolve_through_theme(fixture_deck, engine):
+    presentation = Presentation(fixture_deck)
+    fonts = _resolved_fonts(presentation, presentation.slides[0], engine)
+
+    # 色の指定がないオートシェイプのテキストは p:style/a:fontRef の色（lt1）
+    assert fonts['Accent 2']['color'] == '#FFFFFF'
+    # テキストボックスのテーマカラー指定
+    assert fonts['Theme coloured text']['color'] == '#4F81BD'
+    # タイトルはマスターのテキストスタイル（tx1）
+    assert fonts['テーマカラーのスライド']['color'] == '#000000'
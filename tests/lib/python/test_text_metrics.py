@@ -0,0 +1,19 @@
+"""
+text_metrics（テキストの計測とフォントサイズの決定）のテスト
+"""
+
+from lib.python.text_metrics import fit_font_size, measure_text
+
+LONG_TEXT = 'The quick brown fox jumps over the lazy dog. ' * 8
+
+def test_fit_keeps_max_size_when_text_fits():
+    assert fit_font_size('Short', 500, 200, max_size=32) == 32
+
+def test_fit_shrinks_long_text_into_the_box():
+    size = fit_font_size(LONG_TEXT, 300, 100, max_size=32)
+
+    assert 8 <= size < 32
+    assert measure_text(LONG_TEXT, size, 300)['height'] <= 100
+
+def test_fit_does_not_enlarge_text_below_min_size():
+    assert fit_font_size(LONG_TEXT, 10, 10, max_size=6, min_size=8) == 6